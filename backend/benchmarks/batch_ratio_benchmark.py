@@ -0,0 +1,147 @@
+"""Throughput benchmark for batch ratio computation.
+
+Seeds a throwaway SQLite database with synthetic mapped trial balances —
+companies x periods, each over a random subset of the IFRS chart — and times
+batch_ratios over all of them, the same call GET /api/ratios/batch makes.
+Reports per size the end-to-end time and its two halves: the grouped balance
+query (load_period_balances) and the in-memory computation after it
+(statement lines, ratio inputs and evaluation):
+
+    cd backend && python -m benchmarks.batch_ratio_benchmark --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models.company import Company
+from models.upload import Upload
+from models.account import MasterAccount, AccountMapping
+from models.financial_data import TrialBalanceEntry
+import models.user, models.consolidation, models.fx_rate, models.data_version, models.ratio, models.benchmark, models.commentary  # noqa: F401 — register every table
+from services.batch_ratio_service import batch_ratios, load_period_balances, ratio_input_arrays, statement_lines
+from services.master_chart import get_master_chart, load_master_accounts
+from services.ratio_engine import get_ratio_engine
+
+PERIODS_PER_COMPANY = 4
+ACCOUNTS_PER_PERIOD = 40
+
+
+def period_ends(count: int) -> list[date]:
+    """Quarter ends, most recent last."""
+    quarters = [(3, 31), (6, 30), (9, 30), (12, 31)]
+    return [date(2020 + i // 4, *quarters[i % 4]) for i in range(count)]
+
+
+def seed(db, company_periods: int, seed_value: int) -> int:
+    """Insert companies with mapped trial balances totalling company_periods (company, period) pairs."""
+    rng = random.Random(seed_value)
+    load_master_accounts(db)
+    masters = [(m.id, m.code, m.name, m.normal_balance or "debit") for m in db.query(MasterAccount).order_by(MasterAccount.id)]
+    periods = period_ends(PERIODS_PER_COMPANY)
+    companies = -(-company_periods // PERIODS_PER_COMPANY)
+
+    db.execute(insert(Company), [{"id": c, "name": f"Benchmark Co {c}"} for c in range(1, companies + 1)])
+    uploads, mappings, entries = [], [], []
+    remaining = company_periods
+    for company_id in range(1, companies + 1):
+        accounts = rng.sample(masters, min(ACCOUNTS_PER_PERIOD, len(masters)))
+        mappings.extend({
+            "company_id": company_id, "source_code": code, "source_name": name,
+            "master_account_id": master_id, "is_mapped": True, "mapped_by": "auto",
+        } for master_id, code, name, _ in accounts)
+        for period_end in periods[:min(PERIODS_PER_COMPANY, remaining)]:
+            upload_id = len(uploads) + 1
+            uploads.append({"id": upload_id, "company_id": company_id, "filename": "tb.xlsx",
+                            "file_type": "trial_balance", "file_path": "", "status": "completed"})
+            for _, code, name, normal_balance in accounts:
+                amount = round(rng.uniform(1000, 500000), 2)
+                debit, credit = (amount, 0.0) if normal_balance == "debit" else (0.0, amount)
+                entries.append({"company_id": company_id, "upload_id": upload_id, "account_code": code,
+                                "account_name": name, "debit": debit, "credit": credit,
+                                "balance": debit - credit, "period_end": period_end})
+            remaining -= 1
+    db.execute(insert(Upload), uploads)
+    db.execute(insert(AccountMapping), mappings)
+    db.execute(insert(TrialBalanceEntry), entries)
+    db.commit()
+    return len(entries)
+
+
+def compute(df, master_records) -> int:
+    """The in-memory part of batch_ratios: statement lines, ratio inputs and evaluation."""
+    line_of_master, lines = statement_lines(master_records)
+    keys, inputs = ratio_input_arrays(df, line_of_master, lines)
+    get_ratio_engine().evaluate_columns(inputs)
+    return len(keys)
+
+
+def run(sizes: list[int], seed_value: int, repeats: int) -> list[dict]:
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'batch.db')}")
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            try:
+                entries = seed(db, size, seed_value)
+                master_records = get_master_chart(db).records
+
+                timings = {"total": [], "query": [], "compute": []}
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    result = batch_ratios(db)
+                    timings["total"].append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    df = load_period_balances(db)
+                    timings["query"].append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    compute(df, master_records)
+                    timings["compute"].append(time.perf_counter() - start)
+            finally:
+                db.close()
+                engine.dispose()
+        seconds = min(timings["total"])
+        results.append({
+            "company_periods": result["row_count"],
+            "trial_balance_rows": entries,
+            "balance_rows": len(df),
+            "ratios": len(result["columns"]) - 2,
+            "seconds": round(seconds, 3),
+            "query_seconds": round(min(timings["query"]), 3),
+            "compute_seconds": round(min(timings["compute"]), 3),
+            "rows_per_sec": round(result["row_count"] / seconds, 1) if seconds else None,
+        })
+    return results
+
+
+def print_report(results: list[dict]):
+    print(f"{'periods':>8} {'tb rows':>9} {'ratios':>7} {'seconds':>8} {'query':>8} {'compute':>8} {'periods/sec':>12}")
+    for r in results:
+        print(f"{r['company_periods']:>8} {r['trial_balance_rows']:>9} {r['ratios']:>7} {r['seconds']:>8.3f} "
+              f"{r['query_seconds']:>8.3f} {r['compute_seconds']:>8.3f} {r['rows_per_sec']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch ratio computation over synthetic company-periods.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per size; the fastest is reported")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(sorted(args.sizes), args.seed, args.repeats)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
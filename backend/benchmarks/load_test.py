@@ -0,0 +1,122 @@
+"""Event-loop responsiveness under concurrent PDF exports.
+
+Measures /health latency twice against a running server: once idle, then
+while several clients download /api/export/pdf back to back. If blocking
+statement or PDF work ran on the event loop, /health p99 would grow to the
+length of a whole export; with it on the worker pool it should barely move.
+
+    cd backend && uvicorn main:app --port 8000
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000 --exports 8 --duration 20
+
+A fresh user and company are registered and given a trial balance built from
+the mapping corpus. Without AI_API_KEY the server uses rule-based commentary;
+point it at benchmarks.mock_llm to include (cached) AI commentary.
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import time
+import uuid
+import httpx
+import pandas as pd
+from benchmarks.mapping_corpus import generate_corpus
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def trial_balance(accounts: int, seed: int = 7) -> io.BytesIO:
+    rng = random.Random(seed)
+    rows = []
+    for i, account in enumerate(generate_corpus(accounts, seed)):
+        amount = round(rng.uniform(1_000, 500_000), 2)
+        debit = i % 2 == 0
+        rows.append({"Account Code": f"{10000 + i}", "Account Name": account.name,
+                     "Debit": amount if debit else 0, "Credit": 0 if debit else amount})
+    buffer = io.BytesIO()
+    pd.DataFrame(rows).to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+async def setup_company(client: httpx.AsyncClient, accounts: int) -> dict:
+    """Register a throwaway user and company with a mapped trial balance; returns auth headers."""
+    email = f"loadtest-{uuid.uuid4().hex[:10]}@example.com"
+    res = await client.post("/api/auth/register", json={"email": email, "password": "loadtest", "full_name": "Load Test"})
+    res.raise_for_status()
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    res = await client.post("/api/company/", headers=headers, json={"name": "Load Test LLC", "currency": "AED"})
+    res.raise_for_status()
+    files = {"file": ("tb.xlsx", trial_balance(accounts), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+    res = await client.post("/api/upload/trial-balance", headers=headers, files=files)
+    res.raise_for_status()
+    res = await client.post("/api/mapping/auto-map", headers=headers)
+    res.raise_for_status()
+    return headers
+
+
+async def probe_health(client: httpx.AsyncClient, duration: float, rps: float) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        res = await client.get("/health")
+        res.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(max(0.0, 1 / rps - (time.perf_counter() - start)))
+    return latencies
+
+
+async def export_loop(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, durations: list[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        res = await client.get("/api/export/pdf", headers=headers)
+        res.raise_for_status()
+        durations.append((time.perf_counter() - start) * 1000)
+
+
+def summarize(label: str, latencies: list[float]):
+    print(f"  {label:<22} n={len(latencies):<5} p50={percentile(latencies, 0.5):7.1f}ms "
+          f"p95={percentile(latencies, 0.95):7.1f}ms p99={percentile(latencies, 0.99):7.1f}ms "
+          f"max={max(latencies, default=0):7.1f}ms")
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.exports + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=300, limits=limits) as client:
+        headers = await setup_company(client, args.accounts)
+        # Warm the statement and commentary paths once before measuring
+        (await client.get("/api/export/pdf", headers=headers)).raise_for_status()
+
+        idle = await probe_health(client, args.duration / 2, args.health_rps)
+
+        stop = asyncio.Event()
+        durations: list[float] = []
+        exporters = [asyncio.create_task(export_loop(client, headers, stop, durations)) for _ in range(args.exports)]
+        loaded = await probe_health(client, args.duration, args.health_rps)
+        stop.set()
+        await asyncio.gather(*exporters)
+
+    print(f"/health latency, {args.exports} concurrent PDF exports, {args.accounts}-account trial balance")
+    summarize("idle", idle)
+    summarize("during exports", loaded)
+    print(f"  PDF exports completed: {len(durations)} "
+          f"(median {statistics.median(durations) if durations else 0:.0f}ms each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check /health latency while PDF exports run concurrently.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--exports", type=int, default=8, help="concurrent PDF export clients")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load (idle baseline runs half as long)")
+    parser.add_argument("--health-rps", type=float, default=20)
+    parser.add_argument("--accounts", type=int, default=500, help="trial balance accounts for the test company")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
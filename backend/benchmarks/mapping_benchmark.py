@@ -0,0 +1,241 @@
+"""Quality and throughput benchmark for the auto-mapper.
+
+Runs the labeled corpus (see mapping_corpus) through match_accounts, the same
+path auto_map_accounts takes, against the IFRS chart loaded straight from
+data/ — no database or server needed. Reports per corpus size:
+
+- precision: share of auto-mapped accounts mapped to the expected code
+- recall: share of mappable accounts auto-mapped to the expected code
+- calibration: accuracy against mean confidence per confidence band, and the
+  expected calibration error (ECE) over the auto-mapped accounts
+- accounts/sec for the matching itself
+
+    cd backend && python -m benchmarks.mapping_benchmark --sizes 1000 10000 50000
+
+--parity instead checks the TF-IDF candidate retrieval (AccountMatcher)
+against the exhaustive scan it replaced (matcher=None) on one corpus, and
+exits non-zero if retrieval loses more accuracy than the tolerances allow:
+
+    cd backend && python -m benchmarks.mapping_benchmark --parity --sizes 3000
+"""
+import argparse
+import json
+import sys
+import time
+from services.account_matcher import AccountMatcher
+from services.mapping_service import AUTO_MAP_MIN_CONFIDENCE, find_best_match, match_accounts, shutdown_mapping_pool
+from services.master_chart import MasterRecord, _load_chart, ratio_role_index
+from benchmarks.mapping_corpus import generate_corpus
+
+BENCHMARK_COMPANY_ID = 0
+CONFIDENCE_BANDS = [0.0, AUTO_MAP_MIN_CONFIDENCE, 0.5, 0.65, 0.8, 0.95, 1.0]
+# Parity tolerances for TF-IDF retrieval against the exhaustive scan (--parity and tests/test_account_matcher.py)
+MAX_WORSE_RATE = 0.005  # share of accounts retrieval gets wrong that the scan gets right
+MAX_METRIC_DROP = 0.005  # drop in precision or recall
+
+
+def chart_records() -> list[MasterRecord]:
+    """Master records numbered in load order, as load_master_accounts would insert them."""
+    roles = ratio_role_index()
+    return [
+        MasterRecord(i + 1, acc["code"], acc["name"], acc["category"], acc.get("sub_category"), acc.get("fs_line"),
+                     acc.get("normal_balance") or "debit", roles.get(acc["code"], ()))
+        for i, acc in enumerate(_load_chart())
+    ]
+
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def score(corpus: list, matches: dict, codes_by_id: dict) -> dict:
+    """Precision, recall and calibration of matches against the corpus labels."""
+    def summary(accounts):
+        predicted = correct = positives = 0
+        for account in accounts:
+            master_id, confidence = matches[account.code]
+            positives += account.expected_code is not None
+            if master_id is not None and confidence >= AUTO_MAP_MIN_CONFIDENCE:
+                predicted += 1
+                correct += codes_by_id[master_id] == account.expected_code
+        return {
+            "accounts": len(accounts),
+            "precision": _ratio(correct, predicted),
+            "recall": _ratio(correct, positives),
+            "auto_mapped": predicted,
+        }
+
+    groups = {}
+    for account in corpus:
+        groups.setdefault(account.group, []).append(account)
+        groups.setdefault("noisy" if account.noisy else "clean", []).append(account)
+
+    # Confidence can exceed 1.0 (type and code boosts stack on the name ratio); the top band is open-ended
+    bands = [{"band": f"{low:.2f}-{high:.2f}" if high < 1.0 else f"{low:.2f}+", "count": 0, "confidence": 0.0, "correct": 0}
+             for low, high in zip(CONFIDENCE_BANDS, CONFIDENCE_BANDS[1:])]
+    for account in corpus:
+        master_id, confidence = matches[account.code]
+        i = sum(confidence >= edge for edge in CONFIDENCE_BANDS[1:-1])
+        bands[i]["count"] += 1
+        bands[i]["confidence"] += min(confidence, 1.0)
+        bands[i]["correct"] += master_id is not None and codes_by_id[master_id] == account.expected_code
+
+    mapped_count = sum(band["count"] for band in bands[1:])
+    ece = 0.0
+    for i, band in enumerate(bands):
+        if band["count"]:
+            band["confidence"] = round(band["confidence"] / band["count"], 4)
+            band["accuracy"] = round(band.pop("correct") / band["count"], 4)
+            if i and mapped_count:
+                ece += band["count"] / mapped_count * abs(band["accuracy"] - band["confidence"])
+        else:
+            band.pop("correct")
+            band["accuracy"] = None
+
+    return {
+        **summary(corpus),
+        "groups": {name: summary(accounts) for name, accounts in sorted(groups.items())},
+        "calibration": bands,
+        "ece": round(ece, 4),
+    }
+
+
+def run(sizes: list[int], seed: int) -> list[dict]:
+    masters = chart_records()
+    codes_by_id = {m.id: m.code for m in masters}
+    results = []
+    for size in sizes:
+        corpus = generate_corpus(size, seed)
+        accounts = [(a.code, a.name, a.source_type) for a in corpus]
+        start = time.perf_counter()
+        matches = match_accounts(BENCHMARK_COMPANY_ID, accounts, masters)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "size": size,
+            "seconds": round(elapsed, 3),
+            "accounts_per_sec": round(size / elapsed, 1) if elapsed else None,
+            **score(corpus, matches, codes_by_id),
+        })
+    return results
+
+
+def parity(corpus: list) -> dict:
+    """Compare auto-map decisions with and without candidate retrieval on the same corpus.
+
+    A decision is the master an account would be auto-mapped to (None below
+    the confidence threshold). "worse" counts accounts the exhaustive scan
+    gets right and retrieval does not; "better" the reverse.
+    """
+    masters = chart_records()
+    codes_by_id = {m.id: m.code for m in masters}
+    matcher = AccountMatcher(masters)
+    size = len(corpus)
+
+    def decide(account, with_matcher) -> tuple:
+        master, confidence = find_best_match(account.name, account.source_type, masters, matcher if with_matcher else None)
+        return (master.id if master else None), confidence
+
+    timings, matches = {}, {}
+    for mode, with_matcher in (("exhaustive", False), ("retrieval", True)):
+        start = time.perf_counter()
+        matches[mode] = {account.code: decide(account, with_matcher) for account in corpus}
+        timings[mode] = time.perf_counter() - start
+
+    changed = worse = better = 0
+    for account in corpus:
+        decisions = []
+        for mode in ("exhaustive", "retrieval"):
+            master_id, confidence = matches[mode][account.code]
+            decisions.append(master_id if confidence >= AUTO_MAP_MIN_CONFIDENCE else None)
+        correct = [d is not None and codes_by_id[d] == account.expected_code for d in decisions]
+        changed += decisions[0] != decisions[1]
+        worse += correct[0] and not correct[1]
+        better += correct[1] and not correct[0]
+
+    scores = {mode: score(corpus, matches[mode], codes_by_id) for mode in matches}
+    return {
+        "size": size,
+        "changed": changed,
+        "worse": worse,
+        "better": better,
+        "worse_rate": _ratio(worse, size),
+        "precision_delta": round(scores["retrieval"]["precision"] - scores["exhaustive"]["precision"], 4),
+        "recall_delta": round(scores["retrieval"]["recall"] - scores["exhaustive"]["recall"], 4),
+        "speedup": round(timings["exhaustive"] / timings["retrieval"], 1) if timings["retrieval"] else None,
+        **{mode: {"precision": scores[mode]["precision"], "recall": scores[mode]["recall"],
+                  "seconds": round(timings[mode], 3)} for mode in scores},
+    }
+
+
+def check_parity(result: dict, max_worse_rate: float = MAX_WORSE_RATE, max_metric_drop: float = MAX_METRIC_DROP) -> list[str]:
+    """Tolerance violations for a parity result; empty when retrieval is acceptable."""
+    failures = []
+    if result["worse_rate"] > max_worse_rate:
+        failures.append(f"{result['worse']} accounts ({result['worse_rate']:.2%}) got worse, limit {max_worse_rate:.2%}")
+    for metric in ("precision", "recall"):
+        if result[f"{metric}_delta"] < -max_metric_drop:
+            failures.append(f"{metric} dropped by {-result[f'{metric}_delta']:.4f}, limit {max_metric_drop:.4f}")
+    return failures
+
+
+def print_report(results: list[dict]):
+    print(f"{'size':>8} {'precision':>10} {'recall':>8} {'ECE':>7} {'acc/sec':>10} {'seconds':>9}")
+    for r in results:
+        print(f"{r['size']:>8} {r['precision']:>10.3f} {r['recall']:>8.3f} {r['ece']:>7.3f} "
+              f"{r['accounts_per_sec']:>10.1f} {r['seconds']:>9.2f}")
+
+    largest = results[-1]
+    print(f"\nBy group ({largest['size']} accounts)")
+    for name, g in largest["groups"].items():
+        print(f"  {name:<12} n={g['accounts']:<7} auto-mapped={g['auto_mapped']:<7} "
+              f"precision={g['precision']:.3f} recall={g['recall']:.3f}")
+
+    print(f"\nCalibration ({largest['size']} accounts, auto-map threshold {AUTO_MAP_MIN_CONFIDENCE})")
+    for band in largest["calibration"]:
+        accuracy = "-" if band["accuracy"] is None else f"{band['accuracy']:.3f}"
+        print(f"  {band['band']:<10} n={band['count']:<7} confidence={band['confidence']:.3f} accuracy={accuracy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auto-mapping quality and throughput on the labeled corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--parity", action="store_true", help="compare retrieval with the exhaustive scan instead")
+    parser.add_argument("--max-worse-rate", type=float, default=MAX_WORSE_RATE,
+                        help="parity: largest share of accounts retrieval may get wrong that the scan gets right")
+    parser.add_argument("--max-metric-drop", type=float, default=MAX_METRIC_DROP,
+                        help="parity: largest allowed drop in precision or recall")
+    args = parser.parse_args()
+
+    if args.parity:
+        failed = False
+        for size in sorted(args.sizes):
+            result = parity(generate_corpus(size, args.seed))
+            failures = check_parity(result, args.max_worse_rate, args.max_metric_drop)
+            failed = failed or bool(failures)
+            print(f"{size} accounts: {result['changed']} decisions changed, {result['worse']} worse, {result['better']} better; "
+                  f"precision {result['exhaustive']['precision']:.3f} -> {result['retrieval']['precision']:.3f}, "
+                  f"recall {result['exhaustive']['recall']:.3f} -> {result['retrieval']['recall']:.3f}, "
+                  f"{result['speedup']}x faster")
+            for failure in failures:
+                print(f"  ❌ {failure}")
+            if args.json:
+                with open(args.json, "w") as f:
+                    json.dump(result, f, indent=2)
+        print("❌ Retrieval parity outside tolerance" if failed else "✅ Retrieval parity within tolerance")
+        sys.exit(1 if failed else 0)
+
+    try:
+        results = run(sorted(args.sizes), args.seed)
+    finally:
+        shutdown_mapping_pool()
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
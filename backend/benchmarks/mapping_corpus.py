@@ -0,0 +1,146 @@
+"""Labeled source-account corpus for benchmarking the auto-mapper.
+
+data/mapping_corpus.json holds hand-labeled accounts: English and GCC naming,
+terse ERP export names, and names with no sensible master account
+(expected_code null). generate_corpus expands it to any size by adding the
+noise real trial-balance exports carry: account-number prefixes, abbreviations,
+branch and currency suffixes, case changes, typos and column truncation.
+Labels carry over unchanged, and the same seed always gives the same corpus.
+
+    python -m benchmarks.mapping_corpus --size 50000 --out corpus.csv
+"""
+import argparse
+import csv
+import json
+import os
+import random
+from dataclasses import dataclass
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "mapping_corpus.json")
+
+ABBREVIATIONS = {
+    "accounts": ["a/c", "accts"], "account": ["a/c", "acct"], "receivable": ["rec", "recv"],
+    "receivables": ["recs", "rec"], "payable": ["pay", "pybl"], "payables": ["pay"], "expense": ["exp", "exps"],
+    "expenses": ["exps", "exp"], "depreciation": ["depn", "dep"], "accumulated": ["acc", "accum"],
+    "amortization": ["amort"], "amortisation": ["amort"], "and": ["&"], "provision": ["prov", "provn"],
+    "salaries": ["sal", "salary"], "management": ["mgmt"], "equipment": ["equip", "eqpt"],
+    "administrative": ["admin"], "insurance": ["ins"], "revenue": ["rev"], "income": ["inc"],
+    "current": ["curr", "cur"], "long-term": ["lt", "l/t"], "short-term": ["st", "s/t"],
+    "interest": ["int"], "charges": ["chgs"], "professional": ["prof"], "furniture": ["furn"],
+    "vehicles": ["veh"], "inventory": ["inv"], "allowance": ["allow"], "services": ["svcs"],
+}
+SUFFIXES = [
+    "(AED)", "- AED", "- USD", "(SAR)", "- KWD", "- Dubai", "- Abu Dhabi", "- Sharjah", "- Riyadh", "- Jeddah",
+    "- Doha", "- Muscat", "- Bahrain", "- HO", "- Branch 2", "- Jebel Ali", "- DMCC", "- KSA", "2023", "2024",
+    "- Old", "(Do not use)", "- Main", "- Others", "- Staff",
+]
+PREFIX_STYLES = ["{n} · ", "{n} - ", "{n}-", "[{n}] ", "{n} "]
+ERP_COLUMN_WIDTH = 30
+
+
+@dataclass(frozen=True, slots=True)
+class LabeledAccount:
+    """A source account with the master account code a reviewer would map it to."""
+    code: str
+    name: str
+    source_type: str
+    expected_code: str | None
+    group: str  # english, gcc, erp or unmappable
+    noisy: bool
+
+
+def load_seed() -> list[LabeledAccount]:
+    with open(CORPUS_PATH, "r") as f:
+        rows = json.load(f)
+    return [
+        LabeledAccount(f"S{i:05d}", row["name"], row["type"], row["expected_code"], row["group"], False)
+        for i, row in enumerate(rows)
+    ]
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.randrange(3)
+    if edit == 0:
+        return word[:i] + word[i + 1:]
+    if edit == 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + word[i] + word[i:]
+
+
+def add_noise(name: str, rng: random.Random) -> str:
+    """One noisy ERP-export rendering of an account name."""
+    words = name.split()
+    if rng.random() < 0.35:
+        words = [rng.choice(ABBREVIATIONS[w.lower()]) if w.lower() in ABBREVIATIONS and rng.random() < 0.7 else w
+                 for w in words]
+    if rng.random() < 0.2:
+        long_words = [i for i, w in enumerate(words) if len(w) > 4]
+        if long_words:
+            i = rng.choice(long_words)
+            words[i] = _typo(words[i], rng)
+    if rng.random() < 0.35:
+        words.append(rng.choice(SUFFIXES))
+    text = " ".join(words)
+
+    if rng.random() < 0.3:
+        number = str(rng.randrange(1000, 999999)).zfill(rng.choice([4, 6]))
+        text = rng.choice(PREFIX_STYLES).format(n=number) + text
+    case = rng.random()
+    if case < 0.25:
+        text = text.upper()
+    elif case < 0.4:
+        text = text.lower()
+    if rng.random() < 0.1:
+        text = text.replace(" ", "  ", 1) + rng.choice([".", " *", " ", ":"])
+    if rng.random() < 0.1:
+        text = text[:ERP_COLUMN_WIDTH]
+    return text
+
+
+def add_type_noise(source_type: str, rng: random.Random) -> str:
+    draw = rng.random()
+    if draw < 0.3:
+        return ""
+    if draw < 0.4:
+        return source_type.upper()
+    return source_type
+
+
+def generate_corpus(size: int, seed: int = 42) -> list[LabeledAccount]:
+    """The clean seed accounts followed by noisy variants, size accounts in total."""
+    rng = random.Random(seed)
+    base = load_seed()
+    corpus = base[:size]
+    for i in range(len(corpus), size):
+        source = rng.choice(base)
+        corpus.append(LabeledAccount(
+            f"N{i:06d}",
+            add_noise(source.name, rng),
+            add_type_noise(source.source_type, rng),
+            source.expected_code,
+            source.group,
+            True,
+        ))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a labeled mapping benchmark corpus as CSV.")
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="mapping_corpus.csv")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.size, args.seed)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["code", "name", "source_type", "expected_code", "group", "noisy"])
+        for account in corpus:
+            writer.writerow([account.code, account.name, account.source_type, account.expected_code or "",
+                             account.group, int(account.noisy)])
+    print(f"✅ Wrote {len(corpus)} labeled accounts to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
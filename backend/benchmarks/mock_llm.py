@@ -0,0 +1,106 @@
+"""Local stand-in for the provider's OpenAI-compatible chat completions API.
+
+Answers with a fixed, valid commentary JSON after a configurable delay, in
+both plain and streaming (SSE) mode, and can inject 503s and 429s so retries,
+fallbacks, timeouts and concurrency limits can be exercised without a real API key.
+
+    cd backend && uvicorn benchmarks.mock_llm:app --port 9100
+    AI_API_URL=http://127.0.0.1:9100/v1/chat/completions AI_API_KEY=mock uvicorn main:app
+
+Environment:
+    MOCK_LLM_LATENCY_SECONDS   time to produce a full answer (default 2)
+    MOCK_LLM_FAILURE_RATE      share of requests answered 503 (default 0)
+    MOCK_LLM_RATE_LIMIT_RATE   share of requests answered 429 with Retry-After: 1 (default 0)
+    MOCK_LLM_SLOW_RATE         share of requests taking MOCK_LLM_SLOW_SECONDS instead (default 0)
+    MOCK_LLM_SLOW_SECONDS      latency of slow requests (default 60)
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_SECONDS = float(os.getenv("MOCK_LLM_LATENCY_SECONDS", "2"))
+FAILURE_RATE = float(os.getenv("MOCK_LLM_FAILURE_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("MOCK_LLM_RATE_LIMIT_RATE", "0"))
+SLOW_RATE = float(os.getenv("MOCK_LLM_SLOW_RATE", "0"))
+SLOW_SECONDS = float(os.getenv("MOCK_LLM_SLOW_SECONDS", "60"))
+STREAM_CHUNK_CHARS = 16
+
+COMMENTARY = {
+    "executive_summary": "Revenue grew steadily while margins held. Liquidity is comfortable and leverage is moderate.",
+    "revenue_analysis": "Gross margin is in line with GCC peers; operating costs are well contained.",
+    "cash_flow_analysis": "Operations are self-funding; capital expenditure is covered by operating cash flow.",
+    "working_capital_commentary": "Receivable days are above the 60-day GCC norm and should be tightened.",
+    "risk_flags": ["Customer concentration in the top three accounts"],
+    "covenant_warnings": ["No covenant warning indicators detected"],
+    "strategic_observations": ["Plan for the 9% UAE Corporate Tax in the next budget cycle"],
+    "overall_health": "good",
+}
+
+app = FastAPI(title="Mock LLM provider")
+stats = {"requests": 0, "failures": 0, "rate_limited": 0, "slow": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def _completion(body: dict, content: str) -> dict:
+    return {
+        "id": f"mock-{stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def _chunk(body: dict, content: str) -> str:
+    payload = {"object": "chat.completion.chunk", "model": body.get("model", "mock"),
+               "choices": [{"index": 0, "delta": {"content": content}}]}
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    draw = random.random()
+    if draw < FAILURE_RATE:
+        stats["failures"] += 1
+        return JSONResponse({"error": {"message": "mock upstream failure"}}, status_code=503)
+    if draw < FAILURE_RATE + RATE_LIMIT_RATE:
+        stats["rate_limited"] += 1
+        return JSONResponse({"error": {"message": "mock rate limit"}}, status_code=429, headers={"Retry-After": "1"})
+
+    content = json.dumps(COMMENTARY, indent=2)
+    latency = LATENCY_SECONDS
+    if random.random() < SLOW_RATE:
+        stats["slow"] += 1
+        latency = SLOW_SECONDS
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    if not body.get("stream"):
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        return _completion(body, content)
+
+    chunks = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+
+    async def events():
+        try:
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield _chunk(body, chunk)
+            yield "data: [DONE]\n\n"
+        finally:
+            stats["in_flight"] -= 1
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
@@ -19,6 +19,42 @@ class Settings(BaseSettings):
     AI_API_KEY: str = ""
     AI_API_URL: str = "https://api.cerebras.ai/v1/chat/completions"
     AI_MODEL: str = "llama-3.3-70b"
+    AI_TIMEOUT_SECONDS: float = 60
+    AI_COMMENTARY_MODE: str = "single"  # "single": one prompt for all fields; "sections": focused prompts run concurrently
+    # Per section in "sections" mode; a late section falls back to rule-based text. The clock starts once
+    # the section holds one of the AI_MAX_CONCURRENCY slots: each commentary needs 6, so concurrent
+    # commentaries queue for slots rather than timing out while they wait
+    AI_SECTION_TIMEOUT_SECONDS: float = 30
+    # Financial context tokens per prompt; less material rows are dropped first. Counted with tiktoken
+    # when it is installed, otherwise approximated, so leave headroom below the model's limit
+    AI_CONTEXT_TOKEN_BUDGET: int = 1200
+    AI_MAX_CONCURRENCY: int = 8  # in-flight provider calls across the app; also the connection pool size
+    AI_MAX_RETRIES: int = 3  # retries on 429/5xx and connection errors
+    AI_RETRY_BASE_SECONDS: float = 0.5
+    AI_RETRY_MAX_SECONDS: float = 8
+    AI_HTTP2: bool = True  # used when the h2 package (httpx[http2]) is installed
+    COMMENTARY_CACHE_TTL_HOURS: float = 168  # generated commentary is reused for identical financials this long
+    COMMENTARY_CACHE_MAX_ENTRIES: int = 5000  # least recently used entries beyond this are evicted
+    COMMENTARY_PREGEN_WORKERS: int = 1  # background commentary generations at once after ingestion; 0 disables
+    COMMENTARY_PREGEN_MIN_COVERAGE: float = 0.9  # share of trial balance accounts mapped before pre-generating
+    COMMENTARY_PREGEN_DELAY_SECONDS: float = 10  # uploads and remaps within this window share one generation
+    COMMENTARY_PREGEN_QUEUE_SIZE: int = 100
+
+    # Worker threads for blocking statement, commentary and PDF work called from async endpoints
+    BLOCKING_WORKERS: int = 0  # 0 uses one thread per CPU (at least 2)
+
+    # Auto-mapping
+    AUTO_MAP_WORKERS: int = 0  # 0 uses one process per CPU
+    AUTO_MAP_PARALLEL_THRESHOLD: int = 2000  # distinct accounts before matching goes to the process pool
+    # A remembered mapping skips fuzzy matching only once this many manual votes from this many distinct
+    # companies back it, so one tenant cannot steer everyone else's auto-mapping
+    MAPPING_MEMORY_MIN_VOTES: int = 3
+    MAPPING_MEMORY_MIN_COMPANIES: int = 3
+
+    # Peer benchmarks
+    PEER_BENCHMARK_REFRESH_HOURS: float = 24  # 0 disables the scheduled rebuild
+    PEER_BENCHMARK_MIN_PEERS: int = 5
+    PEER_BENCHMARK_MANUAL_REBUILD_MINUTES: float = 15  # minimum gap before a user can trigger another rebuild
 
     # CORS
     FRONTEND_URL: str = "http://localhost:5173"
@@ -1,8 +1,10 @@
+import logging
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Handle SQLite vs PostgreSQL
 if settings.DATABASE_URL.startswith("sqlite"):
@@ -23,3 +25,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def ensure_indexes():
+    """Build declared indexes that are missing on existing tables.
+
+    create_all only creates missing tables, so indexes added to a model after
+    its table exists (e.g. ix_tb_company_account) would never reach a deployed
+    database. Each index is created with a CREATE INDEX only when absent; one
+    that can't be built (a column the old table lacks) is logged and skipped.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                logger.warning("Could not create index %s on %s: %s", index.name, table.name, e)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -7,17 +8,29 @@ sys.path.insert(0, os.path.dirname(__file__))
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import get_settings
-from database import engine, Base
+from database import engine, Base, SessionLocal, ensure_indexes
+from services.benchmark_service import run_benchmark_schedule
+from services.blocking import shutdown_blocking_executor
+from services.commentary_pregen import start_pregeneration_workers, stop_pregeneration_workers
+from services.llm_client import close_llm_client
+from services.mapping_service import shutdown_mapping_pool
+from services.master_chart import get_master_chart
 
 # Import all models to ensure they are registered with SQLAlchemy
 from models.user import User
 from models.company import Company
 from models.upload import Upload
-from models.account import MasterAccount, AccountMapping
+from models.account import MasterAccount, AccountMapping, MappingMemory, MappingMemoryCompany
 from models.financial_data import TrialBalanceEntry, GeneralLedgerEntry
+from models.consolidation import GroupMember, GroupGrant, EliminationRule
+from models.fx_rate import FxRate
+from models.data_version import DataVersion
+from models.ratio import CustomRatio
+from models.benchmark import PeerBenchmark
+from models.commentary import CommentaryCache
 
 # Import routers
-from routers import auth, company, upload, mapping, statements, ratios, ai_commentary, dashboard, export
+from routers import auth, company, upload, mapping, statements, ratios, ai_commentary, dashboard, export, consolidation, fx
 
 settings = get_settings()
 
@@ -34,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -46,6 +60,8 @@ app.include_router(ratios.router)
 app.include_router(ai_commentary.router)
 app.include_router(dashboard.router)
 app.include_router(export.router)
+app.include_router(consolidation.router)
+app.include_router(fx.router)
 
 
 @app.on_event("startup")
@@ -56,9 +72,36 @@ def startup():
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+
+    # Load the master chart into the process-wide cache
+    db = SessionLocal()
+    try:
+        get_master_chart(db)
+    finally:
+        db.close()
     print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} started successfully!")
 
 
+@app.on_event("startup")
+async def start_background_jobs():
+    if settings.PEER_BENCHMARK_REFRESH_HOURS > 0:
+        app.state.benchmark_task = asyncio.create_task(run_benchmark_schedule(settings.PEER_BENCHMARK_REFRESH_HOURS))
+    start_pregeneration_workers()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_mapping_pool()
+    shutdown_blocking_executor()
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await stop_pregeneration_workers()
+    await close_llm_client()
+
+
 @app.get("/")
 def root():
     return {
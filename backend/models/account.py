@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database import Base
@@ -20,6 +20,10 @@ class MasterAccount(Base):
 class AccountMapping(Base):
     """Maps company-specific accounts to IFRS master accounts."""
     __tablename__ = "account_mappings"
+    __table_args__ = (
+        # Serves the per-company TB join and keyset paging in source-code order
+        Index("ix_account_mappings_company_code", "company_id", "source_code", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -28,9 +32,36 @@ class AccountMapping(Base):
     source_type = Column(String, nullable=True)  # Type from uploaded file (Bank, Fixed Asset, etc.)
     master_account_id = Column(Integer, ForeignKey("master_accounts.id"), nullable=True)
     is_mapped = Column(Boolean, default=False)
-    mapped_by = Column(String, default="auto")  # auto or manual
+    mapped_by = Column(String, default="auto")  # auto, memory or manual
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     company = relationship("Company", back_populates="account_mappings")
     master_account = relationship("MasterAccount")
+
+
+class MappingMemory(Base):
+    """Cross-company votes for mapping a normalized source account name and type to a master account."""
+    __tablename__ = "mapping_memory"
+    __table_args__ = (
+        # Conflict target of the vote upsert; a unique index so existing databases get it at startup
+        Index("ux_mapping_memory_key", "name_key", "type_key", "master_account_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name_key = Column(String, nullable=False, index=True)
+    type_key = Column(String, nullable=False, default="")
+    master_account_id = Column(Integer, ForeignKey("master_accounts.id"), nullable=False)
+    votes = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class MappingMemoryCompany(Base):
+    """A company that voted for a mapping memory entry; recall counts distinct companies, not raw votes."""
+    __tablename__ = "mapping_memory_companies"
+    __table_args__ = (Index("ux_mapping_memory_company", "memory_id", "company_id", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    memory_id = Column(Integer, ForeignKey("mapping_memory.id"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
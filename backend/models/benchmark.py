@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from datetime import datetime, timezone
+from database import Base
+
+
+class PeerBenchmark(Base):
+    """Quantile sketch of one ratio across the platform's companies in an industry."""
+    __tablename__ = "peer_benchmarks"
+    __table_args__ = (UniqueConstraint("industry", "ratio_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    industry = Column(String, nullable=False)  # "*" holds the all-industry distribution
+    ratio_key = Column(String, nullable=False)
+    peer_count = Column(Integer, default=0)
+    sketch = Column(Text, nullable=False)  # JSON-serialised TDigest
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
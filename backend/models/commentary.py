@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime, timezone
+from database import Base
+
+
+class CommentaryCache(Base):
+    """AI commentary stored by a hash of the financial context, model and prompt version it was generated from."""
+    __tablename__ = "commentary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False)  # sha256 hex
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    commentary = Column(Text, nullable=False)  # JSON
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    last_used_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
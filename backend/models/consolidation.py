@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from database import Base
+
+
+class GroupMember(Base):
+    """Subsidiary consolidated into a parent company's group."""
+    __tablename__ = "group_members"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parent_company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    subsidiary_company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, unique=True)
+    ownership_pct = Column(Float, default=100.0)  # Share of the subsidiary held by the parent
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    subsidiary = relationship("Company", foreign_keys=[subsidiary_company_id])
+
+
+class GroupGrant(Base):
+    """Consent from a company's own users for a parent company to consolidate it."""
+    __tablename__ = "group_grants"
+    __table_args__ = (UniqueConstraint("subsidiary_company_id", "parent_company_id", name="uq_group_grant"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    subsidiary_company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    parent_company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    granted_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class EliminationRule(Base):
+    """Intercompany balances removed when consolidating a group.
+
+    A rule matches every group balance whose entity, source account code and
+    master account code agree with the fields that are set on the rule.
+    """
+    __tablename__ = "elimination_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parent_company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)  # None = any group entity
+    source_code = Column(String, nullable=True)  # Company-specific account code
+    master_code = Column(String, nullable=True)  # IFRS master account code
+    description = Column(String, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, timezone
+from database import Base
+
+
+class DataVersion(Base):
+    """Version counters bumped whenever data that feeds reports changes."""
+    __tablename__ = "data_versions"
+
+    scope = Column(String, primary_key=True)  # "company:<id>" or "fx"
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from database import Base
@@ -7,6 +7,10 @@ from database import Base
 class TrialBalanceEntry(Base):
     """Individual trial balance line items from uploaded files."""
     __tablename__ = "trial_balance_entries"
+    __table_args__ = (
+        # Company account lookups: the mapping join and auto-map's anti-join on new codes
+        Index("ix_tb_company_account", "company_id", "account_code"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -26,6 +30,10 @@ class TrialBalanceEntry(Base):
 class GeneralLedgerEntry(Base):
     """General ledger entries for detailed transaction data."""
     __tablename__ = "general_ledger_entries"
+    __table_args__ = (
+        # Drill-down reads one account's lines in (date, id) order with keyset pagination
+        Index("ix_gl_company_account_date", "company_id", "account_code", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+from database import Base
+
+
+class FxRate(Base):
+    """Exchange rates used to translate balances into a reporting currency."""
+    __tablename__ = "fx_rates"
+    __table_args__ = (
+        Index("ix_fx_rates_company_pair_date", "company_id", "from_currency", "to_currency", "rate_date", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)  # None = shared rate loaded by the operator
+    from_currency = Column(String(3), nullable=False)
+    to_currency = Column(String(3), nullable=False)
+    rate_date = Column(Date, nullable=False)  # Period end the rates apply to
+    closing_rate = Column(Float, nullable=False)  # Used for balance sheet items
+    average_rate = Column(Float, nullable=False)  # Used for P&L items
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
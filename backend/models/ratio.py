@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime, timezone
+from database import Base
+
+
+class CustomRatio(Base):
+    """Company-defined ratio evaluated by the ratio engine alongside the built-in ratios."""
+    __tablename__ = "custom_ratios"
+    __table_args__ = (UniqueConstraint("company_id", "key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    key = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    category = Column(String, default="custom")
+    expression = Column(String, nullable=False)  # e.g. "(cash + receivables) / total_current_liabilities"
+    unit = Column(String, nullable=True)  # %, days, or None for a multiple
+    benchmark = Column(String, nullable=True)
+    direction = Column(String, default="higher")  # higher or lower is better
+    good_threshold = Column(Float, nullable=True)
+    warning_threshold = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -1,21 +1,67 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from models.user import User
 from models.company import Company
 from services.auth_service import get_current_user
-from services.ai_service import generate_commentary
+from services.ai_service import generate_commentary, stream_commentary
+from services.blocking import run_blocking
+from services.commentary_pregen import get_pregeneration_status
+from services.llm_client import get_llm_metrics
 
 router = APIRouter(prefix="/api/ai", tags=["AI Commentary"])
 
 
+def _company_name(db: Session, company_id: int) -> str:
+    company = db.query(Company).filter(Company.id == company_id).first()
+    return company.name if company else "Company"
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.get("/commentary")
-async def get_ai_commentary(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_ai_commentary(refresh: bool = False, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
 
-    company = db.query(Company).filter(Company.id == current_user.company_id).first()
-    company_name = company.name if company else "Company"
-
-    commentary = await generate_commentary(db, current_user.company_id, company_name)
+    company_name = await run_blocking(_company_name, db, current_user.company_id)
+    commentary = await generate_commentary(db, current_user.company_id, company_name, refresh=refresh)
     return commentary
+
+
+@router.get("/commentary/stream")
+async def stream_ai_commentary(refresh: bool = False, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Server-sent events: start, one section event per completed commentary section, then done."""
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+
+    company_id = current_user.company_id
+    company_name = await run_blocking(_company_name, db, company_id)
+
+    async def events():
+        # The request's get_db session is closed once the endpoint returns, before
+        # the response body is streamed, so the generator owns its own session
+        stream_db = SessionLocal()
+        try:
+            # Flush headers and a first event before the financial context is built
+            yield _sse("start", {})
+            async for event, data in stream_commentary(stream_db, company_id, company_name, refresh=refresh):
+                yield _sse(event, data)
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/metrics")
+def get_ai_metrics(current_user: User = Depends(get_current_user)):
+    """Provider call counts, retries, error kinds and latency percentiles since startup, plus the pre-generation queue."""
+    return {**get_llm_metrics(), "pregeneration": get_pregeneration_status()}
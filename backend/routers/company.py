@@ -5,6 +5,7 @@ from database import get_db
 from models.user import User
 from models.company import Company
 from services.auth_service import get_current_user
+from services.cache_service import bump_company_version
 
 router = APIRouter(prefix="/api/company", tags=["Company"])
 
@@ -66,4 +67,5 @@ def update_company(req: CompanyCreate, db: Session = Depends(get_db), current_us
 
     db.commit()
     db.refresh(company)
+    bump_company_version(db, company.id)
     return company
@@ -0,0 +1,216 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from database import get_db
+from models.user import User
+from models.company import Company
+from models.consolidation import GroupMember, GroupGrant, EliminationRule
+from services.auth_service import get_current_user
+from services.cache_service import bump_company_version
+from services.consolidation_service import consolidate_group, consolidated_ratios
+
+router = APIRouter(prefix="/api/consolidation", tags=["Consolidation"])
+
+
+class GroupMemberRequest(BaseModel):
+    subsidiary_company_id: int
+    ownership_pct: float = 100.0
+
+
+class GroupGrantRequest(BaseModel):
+    parent_company_id: int
+
+
+class EliminationRuleRequest(BaseModel):
+    company_id: int | None = None
+    source_code: str | None = None
+    master_code: str | None = None
+    description: str | None = None
+
+
+def require_company(current_user: User) -> int:
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    return current_user.company_id
+
+
+@router.get("/members")
+def get_group_members(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+    members = db.query(GroupMember).filter(GroupMember.parent_company_id == parent_id).all()
+    return [
+        {
+            "id": m.id,
+            "subsidiary_company_id": m.subsidiary_company_id,
+            "name": m.subsidiary.name if m.subsidiary else None,
+            "ownership_pct": m.ownership_pct,
+        }
+        for m in members
+    ]
+
+
+@router.post("/members")
+def add_group_member(req: GroupMemberRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+
+    if req.subsidiary_company_id == parent_id:
+        raise HTTPException(status_code=400, detail="A company cannot be its own subsidiary")
+    if not 0 < req.ownership_pct <= 100:
+        raise HTTPException(status_code=400, detail="Ownership percentage must be between 0 and 100")
+    if not db.query(Company).filter(Company.id == req.subsidiary_company_id).first():
+        raise HTTPException(status_code=404, detail="Subsidiary company not found")
+    grant = db.query(GroupGrant).filter(
+        GroupGrant.subsidiary_company_id == req.subsidiary_company_id,
+        GroupGrant.parent_company_id == parent_id,
+    ).first()
+    if not grant:
+        raise HTTPException(status_code=403, detail="The subsidiary has not granted your company access to consolidate it")
+
+    member = db.query(GroupMember).filter(GroupMember.subsidiary_company_id == req.subsidiary_company_id).first()
+    if member and member.parent_company_id != parent_id:
+        raise HTTPException(status_code=400, detail="Company already belongs to another group")
+    if db.query(GroupMember).filter(GroupMember.parent_company_id == req.subsidiary_company_id).first():
+        raise HTTPException(status_code=400, detail="Nested groups are not supported")
+
+    if member:
+        member.ownership_pct = req.ownership_pct
+    else:
+        member = GroupMember(
+            parent_company_id=parent_id,
+            subsidiary_company_id=req.subsidiary_company_id,
+            ownership_pct=req.ownership_pct,
+        )
+        db.add(member)
+    db.commit()
+    db.refresh(member)
+    bump_company_version(db, parent_id)
+    return {"status": "success", "member_id": member.id}
+
+
+@router.delete("/members/{subsidiary_company_id}")
+def remove_group_member(subsidiary_company_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+    member = db.query(GroupMember).filter(
+        GroupMember.parent_company_id == parent_id,
+        GroupMember.subsidiary_company_id == subsidiary_company_id,
+    ).first()
+    if not member:
+        raise HTTPException(status_code=404, detail="Group member not found")
+    db.delete(member)
+    db.commit()
+    bump_company_version(db, parent_id)
+    return {"status": "success"}
+
+
+@router.get("/grants")
+def get_group_grants(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Parent companies the caller's company allows to consolidate it."""
+    company_id = require_company(current_user)
+    grants = db.query(GroupGrant).filter(GroupGrant.subsidiary_company_id == company_id).all()
+    return [{"id": g.id, "parent_company_id": g.parent_company_id, "created_at": g.created_at} for g in grants]
+
+
+@router.post("/grants")
+def add_group_grant(req: GroupGrantRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    company_id = require_company(current_user)
+    if req.parent_company_id == company_id:
+        raise HTTPException(status_code=400, detail="A company cannot be its own parent")
+    if not db.query(Company).filter(Company.id == req.parent_company_id).first():
+        raise HTTPException(status_code=404, detail="Parent company not found")
+
+    grant = db.query(GroupGrant).filter(
+        GroupGrant.subsidiary_company_id == company_id,
+        GroupGrant.parent_company_id == req.parent_company_id,
+    ).first()
+    if not grant:
+        grant = GroupGrant(subsidiary_company_id=company_id, parent_company_id=req.parent_company_id, granted_by=current_user.id)
+        db.add(grant)
+        db.commit()
+        db.refresh(grant)
+    return {"status": "success", "grant_id": grant.id}
+
+
+@router.delete("/grants/{parent_company_id}")
+def revoke_group_grant(parent_company_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Withdraw a parent's access and leave its group."""
+    company_id = require_company(current_user)
+    grant = db.query(GroupGrant).filter(
+        GroupGrant.subsidiary_company_id == company_id,
+        GroupGrant.parent_company_id == parent_company_id,
+    ).first()
+    if not grant:
+        raise HTTPException(status_code=404, detail="Grant not found")
+    db.query(GroupMember).filter(
+        GroupMember.subsidiary_company_id == company_id,
+        GroupMember.parent_company_id == parent_company_id,
+    ).delete()
+    db.delete(grant)
+    db.commit()
+    bump_company_version(db, parent_company_id)
+    return {"status": "success"}
+
+
+@router.get("/eliminations")
+def get_elimination_rules(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+    rules = db.query(EliminationRule).filter(EliminationRule.parent_company_id == parent_id).all()
+    return [
+        {
+            "id": r.id,
+            "company_id": r.company_id,
+            "source_code": r.source_code,
+            "master_code": r.master_code,
+            "description": r.description,
+        }
+        for r in rules
+    ]
+
+
+@router.post("/eliminations")
+def add_elimination_rule(req: EliminationRuleRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+    if not req.source_code and not req.master_code:
+        raise HTTPException(status_code=400, detail="An elimination rule needs a source code or a master code")
+
+    rule = EliminationRule(parent_company_id=parent_id, **req.model_dump())
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    bump_company_version(db, parent_id)
+    return {"status": "success", "rule_id": rule.id}
+
+
+@router.delete("/eliminations/{rule_id}")
+def remove_elimination_rule(rule_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    parent_id = require_company(current_user)
+    rule = db.query(EliminationRule).filter(
+        EliminationRule.id == rule_id,
+        EliminationRule.parent_company_id == parent_id,
+    ).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Elimination rule not found")
+    db.delete(rule)
+    db.commit()
+    bump_company_version(db, parent_id)
+    return {"status": "success"}
+
+
+@router.get("/statements")
+def get_consolidated_statements(
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return consolidate_group(db, require_company(current_user), currency, period_end)
+
+
+@router.get("/ratios")
+def get_consolidated_ratios(
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return consolidated_ratios(db, require_company(current_user), currency, period_end)
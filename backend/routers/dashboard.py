@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from models.user import User
@@ -6,12 +6,13 @@ from models.company import Company
 from services.auth_service import get_current_user
 from services.statement_service import generate_profit_and_loss, generate_balance_sheet, generate_cash_flow
 from services.ratio_service import calculate_ratios
+from services.cache_service import report_etag, conditional_response
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
 
 @router.get("/")
-def get_dashboard(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_dashboard(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
         return {
             "has_data": False,
@@ -19,6 +20,10 @@ def get_dashboard(db: Session = Depends(get_db), current_user: User = Depends(ge
             "kpis": {},
         }
 
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+
     company = db.query(Company).filter(Company.id == current_user.company_id).first()
 
     try:
@@ -27,12 +32,7 @@ def get_dashboard(db: Session = Depends(get_db), current_user: User = Depends(ge
         cf = generate_cash_flow(db, current_user.company_id)
         ratios = calculate_ratios(db, current_user.company_id)
 
-        # Extract cash position
-        cash = 0
-        for section in bs["sections"]:
-            for item in section.get("items", []):
-                if "cash" in item["line"].lower():
-                    cash += item["amount"]
+        cash = bs["summary"]["cash"]
 
         # Calculate net debt
         total_debt = bs["summary"]["total_liabilities"]
@@ -74,6 +74,8 @@ def get_dashboard(db: Session = Depends(get_db), current_user: User = Depends(ge
         }
 
     except Exception as e:
+        # Don't let clients revalidate against a failed computation
+        del response.headers["ETag"]
         return {
             "has_data": False,
             "company": {
@@ -7,22 +7,24 @@ from models.company import Company
 from services.auth_service import get_current_user
 from services.export_service import generate_pdf_report, generate_excel_report
 from services.ai_service import generate_commentary
+from services.blocking import run_blocking
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
 
 @router.get("/pdf")
-async def export_pdf(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def export_pdf(currency: str | None = None, refresh: bool = False, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
 
-    company = db.query(Company).filter(Company.id == current_user.company_id).first()
+    # Queries and ReportLab rendering run on the worker pool so the event loop stays responsive
+    company = await run_blocking(lambda: db.query(Company).filter(Company.id == current_user.company_id).first())
     company_name = company.name if company else "Company"
 
     # Get AI commentary
-    commentary = await generate_commentary(db, current_user.company_id, company_name)
+    commentary = await generate_commentary(db, current_user.company_id, company_name, refresh=refresh)
 
-    pdf = generate_pdf_report(db, current_user.company_id, company_name, commentary)
+    pdf = await run_blocking(generate_pdf_report, db, current_user.company_id, company_name, commentary, currency)
 
     return StreamingResponse(
         pdf,
@@ -32,14 +34,14 @@ async def export_pdf(db: Session = Depends(get_db), current_user: User = Depends
 
 
 @router.get("/excel")
-def export_excel(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def export_excel(currency: str | None = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
 
     company = db.query(Company).filter(Company.id == current_user.company_id).first()
     company_name = company.name if company else "Company"
 
-    excel = generate_excel_report(db, current_user.company_id, company_name)
+    excel = generate_excel_report(db, current_user.company_id, company_name, currency)
 
     return StreamingResponse(
         excel,
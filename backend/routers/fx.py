@@ -0,0 +1,62 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from database import get_db
+from models.user import User
+from models.fx_rate import FxRate
+from services.auth_service import get_current_user
+from services.fx_service import upsert_rate
+
+router = APIRouter(prefix="/api/fx", tags=["FX Rates"])
+
+
+class FxRateRequest(BaseModel):
+    from_currency: str
+    to_currency: str
+    rate_date: date
+    closing_rate: float
+    average_rate: float
+
+
+@router.get("/rates")
+def get_fx_rates(
+    from_currency: str | None = None,
+    to_currency: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # The company's own rates plus the shared ones it falls back to
+    query = db.query(FxRate).filter(or_(FxRate.company_id == current_user.company_id, FxRate.company_id.is_(None)))
+    if from_currency:
+        query = query.filter(FxRate.from_currency == from_currency.upper())
+    if to_currency:
+        query = query.filter(FxRate.to_currency == to_currency.upper())
+    rates = query.order_by(FxRate.from_currency, FxRate.to_currency, FxRate.rate_date.desc()).all()
+    return [
+        {
+            "id": r.id,
+            "from_currency": r.from_currency,
+            "to_currency": r.to_currency,
+            "rate_date": r.rate_date.isoformat(),
+            "closing_rate": r.closing_rate,
+            "average_rate": r.average_rate,
+            "shared": r.company_id is None,
+        }
+        for r in rates
+    ]
+
+
+@router.post("/rates")
+def save_fx_rate(req: FxRateRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Save a rate for the caller's company; it overrides the shared rate for that company only."""
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company first")
+    if len(req.from_currency) != 3 or len(req.to_currency) != 3:
+        raise HTTPException(status_code=400, detail="Currencies must be 3-letter ISO codes")
+    if req.closing_rate <= 0 or req.average_rate <= 0:
+        raise HTTPException(status_code=400, detail="Rates must be positive")
+
+    rate = upsert_rate(db, current_user.company_id, req.from_currency, req.to_currency, req.rate_date, req.closing_rate, req.average_rate)
+    return {"status": "success", "rate_id": rate.id}
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from database import get_db
 from models.user import User
-from models.account import MasterAccount
 from services.auth_service import get_current_user
-from services.mapping_service import auto_map_accounts, manual_map_account, get_mappings
+from services.mapping_service import (
+    auto_map_accounts, manual_map_account, batch_manual_map, get_mappings, list_mappings, get_auto_map_progress,
+)
+from services.cache_service import bump_company_version, get_company_version, conditional_response
+from services.master_chart import get_master_chart
+from services.rollup_service import apply_remaps
+from services.commentary_pregen import request_pregeneration
 
 router = APIRouter(prefix="/api/mapping", tags=["Account Mapping"])
 
@@ -15,28 +20,89 @@ class ManualMapRequest(BaseModel):
     master_account_id: int
 
 
+class BatchManualMapRequest(BaseModel):
+    mappings: list[ManualMapRequest]
+
+
+MAX_BATCH_MAPPINGS = 5000
+
+
 @router.post("/auto-map")
 def run_auto_mapping(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company profile first")
 
+    version = get_company_version(db, current_user.company_id)
     result = auto_map_accounts(db, current_user.company_id)
+    bump_company_version(db, current_user.company_id)
+    by_code = get_master_chart(db).by_code
+    apply_remaps(db, current_user.company_id, [
+        (r["source_code"], by_code[r["mapped_code"]].id) for r in result["results"] if r["mapped_to"]
+    ], version)
+    request_pregeneration(db, current_user.company_id)
     return result
 
 
+@router.get("/auto-map/progress")
+def get_auto_mapping_progress(current_user: User = Depends(get_current_user)):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company profile first")
+    progress = get_auto_map_progress(current_user.company_id)
+    if not progress:
+        return {"status": "idle"}
+    return progress
+
+
 @router.post("/manual-map")
 def run_manual_mapping(
     req: ManualMapRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    mapping = manual_map_account(db, req.mapping_id, req.master_account_id)
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company profile first")
+
+    version = get_company_version(db, current_user.company_id)
+    try:
+        mapping = manual_map_account(db, current_user.company_id, req.mapping_id, req.master_account_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not mapping:
         raise HTTPException(status_code=404, detail="Mapping not found")
 
+    bump_company_version(db, current_user.company_id)
+    apply_remaps(db, current_user.company_id, [(mapping.source_code, mapping.master_account_id)], version)
+    request_pregeneration(db, current_user.company_id)
     return {"status": "success", "mapping_id": mapping.id}
 
 
+@router.post("/manual-map/batch")
+def run_batch_manual_mapping(
+    req: BatchManualMapRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company profile first")
+    if not req.mappings:
+        return {"status": "success", "updated": 0}
+    if len(req.mappings) > MAX_BATCH_MAPPINGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_MAPPINGS} mappings per batch")
+
+    version = get_company_version(db, current_user.company_id)
+    try:
+        remaps = batch_manual_map(db, current_user.company_id, [(m.mapping_id, m.master_account_id) for m in req.mappings])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    bump_company_version(db, current_user.company_id)
+    apply_remaps(db, current_user.company_id, remaps, version)
+    request_pregeneration(db, current_user.company_id)
+    return {"status": "success", "updated": len(remaps)}
+
+
 @router.get("/")
 def get_account_mappings(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not current_user.company_id:
@@ -44,16 +110,30 @@ def get_account_mappings(db: Session = Depends(get_db), current_user: User = Dep
     return get_mappings(db, current_user.company_id)
 
 
+@router.get("/page")
+def get_account_mappings_page(
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    status: str | None = Query(None, pattern="^(mapped|unmapped)$"),
+    category: str | None = None,
+    mapped_by: str | None = None,
+    q: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user.company_id:
+        return {"mappings": [], "total": 0, "next_cursor": None}
+    return list_mappings(db, current_user.company_id, cursor, limit, status, category, mapped_by, q)
+
+
 @router.get("/master-accounts")
-def get_master_accounts(db: Session = Depends(get_db)):
-    accounts = db.query(MasterAccount).order_by(MasterAccount.code).all()
-    return [
-        {
-            "id": a.id,
-            "code": a.code,
-            "name": a.name,
-            "category": a.category,
-            "sub_category": a.sub_category,
-        }
-        for a in accounts
-    ]
+def get_master_accounts(request: Request, response: Response, db: Session = Depends(get_db)):
+    chart = get_master_chart(db)
+    not_modified = conditional_response(request, response, chart.etag)
+    if not_modified:
+        return not_modified
+    return Response(
+        content=chart.master_accounts_json,
+        media_type="application/json",
+        headers={"ETag": chart.etag, "Cache-Control": "private, no-cache"},
+    )
@@ -1,15 +1,132 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from pydantic import BaseModel
 from database import get_db
 from models.user import User
+from models.ratio import CustomRatio
 from services.auth_service import get_current_user
-from services.ratio_service import calculate_ratios
+from services.ratio_service import calculate_ratios, validate_custom_ratio, custom_ratio_definition
+from services.ratio_engine import expression_names
+from services.batch_ratio_service import batch_ratios
+from services.consolidation_service import get_group_entities
+from services.benchmark_service import annotate_peer_percentiles, request_peer_benchmark_rebuild, RebuildThrottled
+from services.cache_service import BENCHMARK_SCOPE, report_etag, conditional_response, bump_company_version
 
 router = APIRouter(prefix="/api/ratios", tags=["Financial Ratios"])
 
 
+class CustomRatioRequest(BaseModel):
+    key: str
+    name: str
+    expression: str
+    category: str = "custom"
+    unit: str | None = None
+    benchmark: str | None = None
+    direction: str = "higher"
+    good_threshold: float | None = None
+    warning_threshold: float | None = None
+
+
 @router.get("/")
-def get_ratios(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_ratios(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    etag = report_etag(db, current_user.company_id, request, (BENCHMARK_SCOPE,))
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+    return annotate_peer_percentiles(db, current_user.company_id, calculate_ratios(db, current_user.company_id))
+
+
+@router.get("/batch")
+def get_batch_ratios(
+    period_from: date | None = None,
+    period_to: date | None = None,
+    include_inputs: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
-    return calculate_ratios(db, current_user.company_id)
+    company_ids = list(get_group_entities(db, current_user.company_id))
+    return batch_ratios(db, company_ids, period_from, period_to, include_inputs)
+
+
+@router.post("/benchmarks/rebuild")
+def rebuild_benchmarks(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Recompute industry peer distributions now instead of waiting for the scheduled run (rate-limited)."""
+    try:
+        return request_peer_benchmark_rebuild(db)
+    except RebuildThrottled as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+@router.get("/custom")
+def get_custom_ratios(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user.company_id:
+        return []
+    ratios = db.query(CustomRatio).filter(CustomRatio.company_id == current_user.company_id).order_by(CustomRatio.id).all()
+    return [
+        {
+            "id": r.id,
+            "key": r.key,
+            "name": r.name,
+            "category": r.category,
+            "expression": r.expression,
+            "unit": r.unit,
+            "benchmark": r.benchmark,
+            "direction": r.direction,
+            "good_threshold": r.good_threshold,
+            "warning_threshold": r.warning_threshold,
+        }
+        for r in ratios
+    ]
+
+
+@router.post("/custom")
+def create_custom_ratio(req: CustomRatioRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company profile first")
+    if not req.key.isidentifier():
+        raise HTTPException(status_code=400, detail="Ratio key must be a valid identifier (letters, digits and underscores)")
+
+    # Compile and trial-run against the company's data so errors surface before saving
+    try:
+        validate_custom_ratio(db, current_user.company_id, custom_ratio_definition(
+            req.key, req.category, req.name, req.expression, req.unit, req.benchmark,
+            req.direction, req.good_threshold, req.warning_threshold,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    ratio = CustomRatio(company_id=current_user.company_id, **req.model_dump())
+    db.add(ratio)
+    db.commit()
+    db.refresh(ratio)
+    bump_company_version(db, current_user.company_id)
+    return {"status": "success", "ratio_id": ratio.id}
+
+
+@router.delete("/custom/{ratio_id}")
+def delete_custom_ratio(ratio_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    ratio = db.query(CustomRatio).filter(
+        CustomRatio.id == ratio_id,
+        CustomRatio.company_id == current_user.company_id,
+    ).first()
+    if not ratio:
+        raise HTTPException(status_code=404, detail="Custom ratio not found")
+
+    # Other custom ratios may build on this one
+    remaining = db.query(CustomRatio).filter(
+        CustomRatio.company_id == current_user.company_id,
+        CustomRatio.id != ratio_id,
+    ).all()
+    for other in remaining:
+        if ratio.key in expression_names(other.expression):
+            raise HTTPException(status_code=400, detail=f"Custom ratio '{other.key}' depends on '{ratio.key}'")
+
+    db.delete(ratio)
+    db.commit()
+    bump_company_version(db, current_user.company_id)
+    return {"status": "success"}
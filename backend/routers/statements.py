@@ -1,40 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from models.user import User
 from services.auth_service import get_current_user
-from services.statement_service import generate_profit_and_loss, generate_balance_sheet, generate_cash_flow
+from services.statement_service import (
+    get_mapped_balances, generate_profit_and_loss, generate_balance_sheet, generate_cash_flow,
+    build_profit_and_loss, build_balance_sheet, build_cash_flow,
+)
+from services.drilldown_service import get_line_accounts, get_ledger_lines
+from services.cache_service import report_etag, conditional_response
+from services.rollup_service import rollup_node
 
 router = APIRouter(prefix="/api/statements", tags=["Financial Statements"])
 
 
 @router.get("/profit-loss")
-def get_profit_loss(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_profit_loss(
+    request: Request,
+    response: Response,
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
-    return generate_profit_and_loss(db, current_user.company_id)
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+    return generate_profit_and_loss(db, current_user.company_id, currency, period_end)
 
 
 @router.get("/balance-sheet")
-def get_balance_sheet(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_balance_sheet(
+    request: Request,
+    response: Response,
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
-    return generate_balance_sheet(db, current_user.company_id)
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+    return generate_balance_sheet(db, current_user.company_id, currency, period_end)
 
 
 @router.get("/cash-flow")
-def get_cash_flow(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_cash_flow(
+    request: Request,
+    response: Response,
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
-    return generate_cash_flow(db, current_user.company_id)
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+    return generate_cash_flow(db, current_user.company_id, currency, period_end)
 
 
 @router.get("/all")
-def get_all_statements(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_all_statements(
+    request: Request,
+    response: Response,
+    currency: str | None = None,
+    period_end: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+    balances = get_mapped_balances(db, current_user.company_id, currency, period_end)
+    pnl = build_profit_and_loss(balances)
+    bs = build_balance_sheet(balances)
     return {
-        "profit_loss": generate_profit_and_loss(db, current_user.company_id),
-        "balance_sheet": generate_balance_sheet(db, current_user.company_id),
-        "cash_flow": generate_cash_flow(db, current_user.company_id),
+        "profit_loss": pnl,
+        "balance_sheet": bs,
+        "cash_flow": build_cash_flow(pnl, bs),
     }
+
+
+@router.get("/drilldown")
+def get_statement_line_accounts(fs_line: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    return get_line_accounts(db, current_user.company_id, fs_line)
+
+
+@router.get("/drilldown/ledger")
+def get_account_ledger(
+    account_code: str,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    return get_ledger_lines(db, current_user.company_id, account_code, cursor, limit)
+
+
+@router.get("/tree")
+def get_statement_tree(
+    request: Request,
+    response: Response,
+    node: str = "",
+    depth: int | None = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Please create a company and upload data first")
+    not_modified = conditional_response(request, response, report_etag(db, current_user.company_id, request))
+    if not_modified:
+        return not_modified
+
+    tree_node = rollup_node(db, current_user.company_id, node, depth)
+    if tree_node is None:
+        raise HTTPException(status_code=404, detail=f"Node '{node}' not found")
+    return tree_node
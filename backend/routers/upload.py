@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database import get_db
@@ -6,6 +7,9 @@ from models.user import User
 from models.upload import Upload
 from services.auth_service import get_current_user
 from services.upload_service import validate_trial_balance, parse_trial_balance, save_trial_balance_entries, generate_template
+from services.cache_service import bump_company_version, get_company_version
+from services.commentary_pregen import request_pregeneration
+from services.rollup_service import apply_balance_changes
 import pandas as pd
 import os
 from io import BytesIO
@@ -19,6 +23,8 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 @router.post("/trial-balance")
 async def upload_trial_balance(
     file: UploadFile = File(...),
+    period_start: date | None = Form(None),
+    period_end: date | None = Form(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -64,17 +70,23 @@ async def upload_trial_balance(
 
     # Parse and save entries
     try:
+        version = get_company_version(db, current_user.company_id)
         entries = parse_trial_balance(df, validation["column_mapping"])
-        save_trial_balance_entries(db, entries, current_user.company_id, upload.id)
+        save_trial_balance_entries(db, entries, current_user.company_id, upload.id, period_start, period_end)
         upload.status = "completed"
         upload.row_count = len(entries)
         db.commit()
+        bump_company_version(db, current_user.company_id)
+        apply_balance_changes(db, current_user.company_id, version)
     except Exception as e:
         upload.status = "failed"
         upload.error_message = str(e)
         db.commit()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+    # Have commentary ready by the time the user opens it, if the new data is already mapped
+    request_pregeneration(db, current_user.company_id)
+
     return {
         "status": "success",
         "upload_id": upload.id,
@@ -0,0 +1,100 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+TOP_K = 8
+NGRAM = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _terms(text: str) -> Counter:
+    """Word tokens plus padded character n-grams of each word."""
+    terms = Counter()
+    for word in _WORD.findall(text):
+        terms["w:" + word] += 1
+        padded = f" {word} "
+        for i in range(max(len(padded) - NGRAM + 1, 1)):
+            terms[padded[i:i + NGRAM]] += 1
+    return terms
+
+
+class AccountMatcher:
+    """TF-IDF inverted index over master account names.
+
+    Retrieves the few master accounts that share the most (weighted) words and
+    character n-grams with a source account name, so the fine SequenceMatcher
+    scoring in find_best_match runs on a handful of candidates instead of the
+    whole chart. Candidates are returned as positions in the list the index was
+    built from.
+    """
+
+    def __init__(self, master_accounts: list, top_k: int = TOP_K):
+        self.top_k = top_k
+        self.codes = [m.code for m in master_accounts]
+        self.categories = [(m.category or "").lower() for m in master_accounts]
+        self.sub_categories = [(m.sub_category or "").lower() for m in master_accounts]
+        self.position_of_code = {}
+        for i, code in enumerate(self.codes):
+            self.position_of_code.setdefault(code, i)
+
+        documents = [_terms(m.name.lower()) for m in master_accounts]
+        document_frequency = Counter(term for terms in documents for term in terms)
+        n = len(documents)
+        self.idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        self.postings = defaultdict(list)  # term -> [(position, normalised weight)]
+        for position, terms in enumerate(documents):
+            weights = self._weights(terms)
+            for term, weight in weights.items():
+                self.postings[term].append((position, weight))
+
+        self._type_groups: dict[str, list[int]] = {}
+
+    def _weights(self, terms: Counter) -> dict:
+        weights = {term: (1 + math.log(count)) * self.idf.get(term, 0.0) for term, count in terms.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items() if w}
+
+    def scores(self, name_lower: str) -> dict:
+        """Cosine similarity of a name to every master account sharing a term with it."""
+        scores = defaultdict(float)
+        for term, weight in self._weights(_terms(name_lower)).items():
+            for position, master_weight in self.postings.get(term, ()):
+                scores[position] += weight * master_weight
+        return scores
+
+    def type_group(self, type_lower: str) -> list[int]:
+        """Positions of master accounts whose category matches a source type (boosted by the scorer)."""
+        if type_lower not in self._type_groups:
+            self._type_groups[type_lower] = [
+                i for i, (category, sub_category) in enumerate(zip(self.categories, self.sub_categories))
+                if type_lower in category or type_lower in sub_category
+            ]
+        return self._type_groups[type_lower]
+
+    def candidates(self, name_lower: str, type_lower: str = "", codes: list | None = None) -> list[int]:
+        """Top-k positions by similarity, plus the best type-boosted matches and any keyword-rule codes."""
+        scores = self.scores(name_lower)
+        selected = set(heapq.nlargest(self.top_k, scores, key=scores.get))
+        if type_lower:
+            group = [i for i in self.type_group(type_lower) if i in scores]
+            selected.update(heapq.nlargest(self.top_k, group, key=scores.get))
+        for code in codes or ():
+            if code in self.position_of_code:
+                selected.add(self.position_of_code[code])
+        # Chart order keeps tie-breaking identical to a full scan
+        return sorted(selected)
+
+
+_matcher_cache: dict = {"key": None, "matcher": None}
+
+
+def get_account_matcher(master_accounts: list) -> AccountMatcher:
+    """Matcher for a master chart, rebuilt only when the chart changes."""
+    key = tuple((m.id, m.code, m.name, m.category, m.sub_category) for m in master_accounts)
+    if _matcher_cache["key"] != key:
+        _matcher_cache["matcher"] = AccountMatcher(master_accounts)
+        _matcher_cache["key"] = key
+    return _matcher_cache["matcher"]
@@ -1,63 +1,34 @@
-import httpx
+import asyncio
 import json
 from config import get_settings
 from sqlalchemy.orm import Session
-from services.statement_service import generate_profit_and_loss, generate_balance_sheet, generate_cash_flow
+from services.statement_service import generate_profit_and_loss, generate_balance_sheet
 from services.ratio_service import calculate_ratios
+from services.blocking import run_blocking
+from services.context_builder import build_compact_context
+from services.json_stream import JsonSectionParser
+from services.llm_client import post_completion, stream_completion
+from services.commentary_cache import commentary_cache_key, get_cached_commentary, store_commentary
 
 settings = get_settings()
 
+# Bump whenever the commentary prompt changes so cached commentary is regenerated
+PROMPT_VERSION = "2"
 
-def build_financial_context(db: Session, company_id: int, company_name: str = "Company") -> str:
-    """Build a comprehensive financial context string for the AI."""
-    pnl = generate_profit_and_loss(db, company_id)
-    bs = generate_balance_sheet(db, company_id)
-    cf = generate_cash_flow(db, company_id)
-    ratios = calculate_ratios(db, company_id)
 
-    context = f"""
-FINANCIAL DATA FOR {company_name.upper()}
-
-=== PROFIT & LOSS STATEMENT ===
-Revenue: {pnl['summary']['revenue']:,.2f}
-Cost of Revenue: {pnl['summary']['cogs']:,.2f}
-Gross Profit: {pnl['summary']['gross_profit']:,.2f}
-Operating Expenses: {pnl['summary']['operating_expenses']:,.2f}
-Operating Profit: {pnl['summary']['operating_profit']:,.2f}
-EBITDA: {pnl['summary']['ebitda']:,.2f}
-Net Profit: {pnl['summary']['net_profit']:,.2f}
-
-=== BALANCE SHEET ===
-Total Current Assets: {bs['summary']['total_current_assets']:,.2f}
-Total Non-Current Assets: {bs['summary']['total_non_current_assets']:,.2f}
-Total Assets: {bs['summary']['total_assets']:,.2f}
-Total Current Liabilities: {bs['summary']['total_current_liabilities']:,.2f}
-Total Non-Current Liabilities: {bs['summary']['total_non_current_liabilities']:,.2f}
-Total Liabilities: {bs['summary']['total_liabilities']:,.2f}
-Total Equity: {bs['summary']['total_equity']:,.2f}
-
-=== CASH FLOW STATEMENT ===
-Cash from Operations: {cf['summary']['cash_from_operations']:,.2f}
-Cash from Investing: {cf['summary']['cash_from_investing']:,.2f}
-Cash from Financing: {cf['summary']['cash_from_financing']:,.2f}
-Net Change in Cash: {cf['summary']['net_change']:,.2f}
-
-=== KEY FINANCIAL RATIOS ===
-"""
-    for category, data in ratios.items():
-        context += f"\n{data['title']}:\n"
-        for r in data["ratios"]:
-            unit = r.get("unit", "x")
-            context += f"  - {r['name']}: {r['value']}{unit} (Benchmark: {r['benchmark']}, Status: {r['status']})\n"
+def build_financial_context(db: Session, company_id: int, company_name: str = "Company") -> str:
+    """Compact, token-budgeted financial context for the AI (see context_builder)."""
+    context = build_compact_context(db, company_id, company_name, settings.AI_CONTEXT_TOKEN_BUDGET)
+    omitted = ", ".join(f"{name} {count}" for name, count in context.omitted.items()) or "none"
+    print(f"🧮 Commentary context for company {company_id}: {'' if context.exact else '~'}{context.tokens}/{context.budget} tokens, rows omitted: {omitted}")
+    return context.text
 
-    return context
 
+COMMENTARY_SYSTEM_PROMPT = "You are an expert CFO advisor for GCC region companies. Respond only with valid JSON."
 
-async def generate_commentary(db: Session, company_id: int, company_name: str = "Company") -> dict:
-    """Generate AI-powered financial commentary."""
-    financial_context = build_financial_context(db, company_id, company_name)
 
-    prompt = f"""You are an expert CFO advisor specializing in GCC markets (UAE and KSA). 
+def build_commentary_prompt(financial_context: str) -> str:
+    return f"""You are an expert CFO advisor specializing in GCC markets (UAE and KSA). 
 Analyze the following financial data and provide a comprehensive, board-level financial commentary.
 
 {financial_context}
@@ -81,48 +52,232 @@ Ensure the tone is:
 - Balanced between positive observations and areas of concern
 """
 
-    if not settings.AI_API_KEY or settings.AI_API_KEY == "your-api-key-here":
+
+# Focused prompts for AI_COMMENTARY_MODE="sections": section -> the commentary fields it writes
+COMMENTARY_SECTIONS = {
+    "summary": ["executive_summary", "overall_health"],
+    "revenue": ["revenue_analysis"],
+    "cash_flow": ["cash_flow_analysis"],
+    "working_capital": ["working_capital_commentary"],
+    "risks": ["risk_flags", "strategic_observations"],
+    "covenants": ["covenant_warnings"],
+}
+
+COMMENTARY_FIELD_GUIDE = {
+    "executive_summary": "A 3-4 paragraph executive summary suitable for board presentation",
+    "revenue_analysis": "Analysis of revenue and margin performance with key observations",
+    "cash_flow_analysis": "Cash flow analysis highlighting operational efficiency",
+    "working_capital_commentary": "Working capital management assessment",
+    "risk_flags": ["List of identified risk flags as separate items"],
+    "covenant_warnings": ["Any bank covenant early warning indicators"],
+    "strategic_observations": ["Strategic observations and recommendations for GCC market context"],
+    "overall_health": "good/warning/critical",
+}
+
+
+def build_section_prompt(financial_context: str, fields: list[str]) -> str:
+    shape = json.dumps({field: COMMENTARY_FIELD_GUIDE[field] for field in fields}, indent=4)
+    return f"""You are an expert CFO advisor specializing in GCC markets (UAE and KSA).
+Analyze the following financial data and write only the part of a board-level financial commentary requested below.
+
+{financial_context}
+
+Please provide your analysis in the following JSON format:
+{shape}
+
+Ensure the tone is professional, board-level, GCC market-focused (UAE/KSA context) and actionable.
+"""
+
+
+def sections_mode() -> bool:
+    return settings.AI_COMMENTARY_MODE == "sections"
+
+
+def _prompt_version() -> str:
+    # Section prompts are worded differently, so their answers are cached separately
+    return f"{PROMPT_VERSION}-sections" if sections_mode() else PROMPT_VERSION
+
+
+def ai_configured() -> bool:
+    return bool(settings.AI_API_KEY) and settings.AI_API_KEY != "your-api-key-here"
+
+
+def _completion_request(prompt: str) -> dict:
+    return {
+        "model": settings.AI_MODEL,
+        "messages": [
+            {"role": "system", "content": COMMENTARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.7,
+        "max_tokens": 3000,
+    }
+
+
+def _log_usage(company_id: int, result: dict, label: str = ""):
+    usage = result.get("usage") or {}
+    if usage:
+        print(f"🧮 Commentary tokens for company {company_id}{label}: prompt {usage.get('prompt_tokens')}, "
+              f"completion {usage.get('completion_tokens')}")
+
+
+def parse_commentary(content: str) -> dict:
+    """Parse the model's JSON answer, tolerating a markdown code fence around it."""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Try to extract JSON from markdown code blocks
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
+        return json.loads(content)
+
+
+async def generate_commentary(db: Session, company_id: int, company_name: str = "Company", refresh: bool = False) -> dict:
+    """Generate AI-powered financial commentary.
+
+    AI commentary is cached by a hash of the financial context, model and
+    PROMPT_VERSION, so unchanged financials are answered without an API call.
+    refresh=True skips the cached copy and regenerates it. With
+    AI_COMMENTARY_MODE="sections" each section is a separate concurrent prompt
+    and only the sections that fail fall back to rule-based text.
+    """
+    financial_context = await run_blocking(build_financial_context, db, company_id, company_name)
+    cache_key = commentary_cache_key(financial_context, settings.AI_MODEL, _prompt_version())
+    if not refresh:
+        cached = await run_blocking(get_cached_commentary, db, cache_key)
+        if cached is not None:
+            return cached
+
+    if not ai_configured():
         # Return default commentary when no AI key is configured
-        return generate_default_commentary(db, company_id, company_name)
+        return await run_blocking(generate_default_commentary, db, company_id, company_name)
+
+    if sections_mode():
+        commentary, complete = {}, True
+        async for fields, ok in _commentary_by_section(db, company_id, company_name, financial_context):
+            commentary.update(fields)
+            complete = complete and ok
+        commentary = {key: commentary[key] for key in COMMENTARY_FIELD_GUIDE if key in commentary}
+        if complete:
+            # Partly rule-based commentary is not cached, so the next request retries the failed sections
+            await run_blocking(store_commentary, db, cache_key, company_id, settings.AI_MODEL, _prompt_version(), commentary)
+        return commentary
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(
-                settings.AI_API_URL,
-                headers={
-                    "Authorization": f"Bearer {settings.AI_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.AI_MODEL,
-                    "messages": [
-                        {"role": "system", "content": "You are an expert CFO advisor for GCC region companies. Respond only with valid JSON."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 3000,
-                },
-            )
-            response.raise_for_status()
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-
-            # Parse JSON from response
-            try:
-                commentary = json.loads(content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown code blocks
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0]
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0]
-                commentary = json.loads(content)
-
-            return commentary
+        result = await post_completion(_completion_request(build_commentary_prompt(financial_context)))
+        _log_usage(company_id, result)
+        commentary = parse_commentary(result["choices"][0]["message"]["content"])
+    except Exception as e:
+        print(f"⚠️ AI commentary unavailable, using rule-based commentary: {e}")
+        return await run_blocking(generate_default_commentary, db, company_id, company_name)
+
+    await run_blocking(store_commentary, db, cache_key, company_id, settings.AI_MODEL, _prompt_version(), commentary)
+    return commentary
+
+
+async def stream_commentary(db: Session, company_id: int, company_name: str = "Company", refresh: bool = False):
+    """Yield commentary as ("section", {"key", "value"}) events while the model writes it, then ("done", {"source"}).
 
+    Uses the provider's streaming mode; each top-level JSON member is released
+    as soon as it closes. Cached commentary is replayed at once. If the stream
+    fails, the sections not yet sent come from the rule-based commentary.
+    """
+    financial_context = await run_blocking(build_financial_context, db, company_id, company_name)
+    cache_key = commentary_cache_key(financial_context, settings.AI_MODEL, _prompt_version())
+    cached = None if refresh else await run_blocking(get_cached_commentary, db, cache_key)
+    if cached is not None or not ai_configured():
+        source = "cache" if cached is not None else "default"
+        if cached is None:
+            cached = await run_blocking(generate_default_commentary, db, company_id, company_name)
+        for key, value in cached.items():
+            yield "section", {"key": key, "value": value}
+        yield "done", {"source": source}
+        return
+
+    if sections_mode():
+        commentary, complete, any_ai = {}, True, False
+        async for fields, ok in _commentary_by_section(db, company_id, company_name, financial_context):
+            for key, value in fields.items():
+                yield "section", {"key": key, "value": value}
+            commentary.update(fields)
+            complete, any_ai = complete and ok, any_ai or ok
+        if complete:
+            await run_blocking(store_commentary, db, cache_key, company_id, settings.AI_MODEL, _prompt_version(), commentary)
+        yield "done", {"source": "ai" if complete else "partial" if any_ai else "default"}
+        return
+
+    parser = JsonSectionParser()
+    try:
+        async with stream_completion(_completion_request(build_commentary_prompt(financial_context))) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content") or ""
+                for key, value in parser.feed(delta):
+                    yield "section", {"key": key, "value": value}
+        if not parser.complete:
+            raise ValueError("stream ended before the commentary JSON was complete")
     except Exception as e:
-        print(f"AI API error: {e}")
-        return generate_default_commentary(db, company_id, company_name)
+        print(f"⚠️ AI commentary stream failed, filling in rule-based sections: {e}")
+        default = await run_blocking(generate_default_commentary, db, company_id, company_name)
+        for key, value in default.items():
+            if key not in parser.sections:
+                yield "section", {"key": key, "value": value}
+        yield "done", {"source": "partial" if parser.sections else "default"}
+        return
+
+    await run_blocking(store_commentary, db, cache_key, company_id, settings.AI_MODEL, _prompt_version(), parser.sections)
+    yield "done", {"source": "ai"}
+
+
+async def _generate_section(company_id: int, financial_context: str, name: str) -> dict:
+    fields = COMMENTARY_SECTIONS[name]
+    request = {**_completion_request(build_section_prompt(financial_context, fields)), "max_tokens": 1200}
+    # The timeout starts once the call holds a concurrency slot; see AI_SECTION_TIMEOUT_SECONDS
+    result = await post_completion(request, timeout=settings.AI_SECTION_TIMEOUT_SECONDS)
+    _log_usage(company_id, result, f" ({name})")
+    answer = parse_commentary(result["choices"][0]["message"]["content"])
+    missing = [field for field in fields if field not in answer]
+    if missing:
+        raise ValueError(f"answer is missing {', '.join(missing)}")
+    return {field: answer[field] for field in fields}
+
+
+async def _commentary_by_section(db: Session, company_id: int, company_name: str, financial_context: str):
+    """Yield (fields, from_ai) per commentary section as each focused prompt finishes.
+
+    All sections are requested concurrently, each with its own timeout, so the
+    total wait is that of the slowest section plus any time sections queue for
+    the AI_MAX_CONCURRENCY slots they share with other requests. A section that
+    times out or fails is filled from the rule-based commentary on its own.
+    """
+    async def run(name: str):
+        try:
+            return name, await _generate_section(company_id, financial_context, name)
+        except Exception as e:
+            return name, e
+
+    tasks = [asyncio.create_task(run(name)) for name in COMMENTARY_SECTIONS]
+    default = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            name, result = await next_done
+            if isinstance(result, Exception):
+                print(f"⚠️ AI commentary section '{name}' unavailable, using rule-based text: {result!r}")
+                if default is None:
+                    default = await run_blocking(generate_default_commentary, db, company_id, company_name)
+                yield {field: default[field] for field in COMMENTARY_SECTIONS[name]}, False
+            else:
+                yield result, True
+    finally:
+        # The consumer may stop early (client disconnected); drop the prompts still running
+        for task in tasks:
+            task.cancel()
 
 
 def generate_default_commentary(db: Session, company_id: int, company_name: str) -> dict:
@@ -0,0 +1,156 @@
+import math
+from datetime import date
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.account import AccountMapping
+from models.financial_data import TrialBalanceEntry
+from services.master_chart import get_master_chart, ratio_role_index
+from services.ratio_engine import INPUT_NAMES, get_ratio_engine
+from services.statement_service import statement_bucket, PROFIT_AND_LOSS_BUCKETS, BALANCE_SHEET_BUCKETS
+
+
+# Statement sections (statement_service buckets) -> the summary metric they total into
+SUMMARY_BUCKETS = {
+    **{bucket: bucket for bucket in PROFIT_AND_LOSS_BUCKETS},
+    **{bucket: f"total_{bucket}" for bucket in BALANCE_SHEET_BUCKETS},
+}
+COMPONENTS = ["inventory", "receivables", "payables", "cash", "short_term_debt"]
+
+
+def load_period_balances(db: Session, company_ids: list[int] | None = None,
+                         period_from: date | None = None, period_to: date | None = None) -> pd.DataFrame:
+    """Mapped balances per (company, period, master account) for many companies in one grouped query."""
+    query = db.query(
+        TrialBalanceEntry.company_id,
+        TrialBalanceEntry.period_end,
+        AccountMapping.master_account_id,
+        func.sum(TrialBalanceEntry.debit),
+        func.sum(TrialBalanceEntry.credit),
+        func.sum(TrialBalanceEntry.balance),
+    ).join(
+        AccountMapping,
+        (AccountMapping.source_code == TrialBalanceEntry.account_code) &
+        (AccountMapping.company_id == TrialBalanceEntry.company_id)
+    ).filter(
+        AccountMapping.is_mapped == True,
+        AccountMapping.master_account_id != None,
+    )
+    if company_ids is not None:
+        query = query.filter(TrialBalanceEntry.company_id.in_(company_ids))
+    if period_from:
+        query = query.filter(TrialBalanceEntry.period_end >= period_from)
+    if period_to:
+        query = query.filter(TrialBalanceEntry.period_end <= period_to)
+    rows = query.group_by(
+        TrialBalanceEntry.company_id, TrialBalanceEntry.period_end, AccountMapping.master_account_id
+    ).all()
+
+    df = pd.DataFrame(
+        [tuple(r) for r in rows],
+        columns=["company_id", "period_end", "master_account_id", "debit", "credit", "balance"],
+    )
+    df[["debit", "credit", "balance"]] = df[["debit", "credit", "balance"]].astype(float).fillna(0.0)
+    return df
+
+
+def statement_lines(master_accounts: list) -> tuple[dict, pd.DataFrame]:
+    """Classify each statement line once.
+
+    Returns ({master_account_id: line index}, line table). Lines are split by
+    ratio role so each carries at most one, and a line takes the normal balance
+    of its lowest-coded master account; buckets come from the per-company
+    statements' statement_bucket.
+    """
+    roles_of = ratio_role_index()
+    line_of_master = {}
+    lines = {}
+    for master in sorted(master_accounts, key=lambda m: m.code):
+        key = (master.fs_line or master.name, master.category, master.sub_category, roles_of.get(master.code, ()))
+        if key not in lines:
+            lines[key] = (len(lines), master.normal_balance)
+        line_of_master[master.id] = lines[key][0]
+
+    records = []
+    for (fs_line, category, sub_category, roles), (index, normal_balance) in lines.items():
+        records.append({
+            "line": index,
+            "credit_normal": normal_balance == "credit",
+            "bucket": statement_bucket(category, sub_category),
+            "component": next((role for role in roles if role in COMPONENTS), None),
+            "is_da": "depreciation_amortization" in roles,
+            "is_interest": "interest_expense" in roles,
+        })
+    return line_of_master, pd.DataFrame(records).set_index("line").sort_index()
+
+
+def ratio_input_arrays(df: pd.DataFrame, line_of_master: dict, lines: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """Statement summary metrics and ratio inputs as arrays, one element per (company, period)."""
+    line_index = df["master_account_id"].map(line_of_master)
+    df = df[line_index.notna()]
+    line_index = line_index[line_index.notna()].astype(int).to_numpy()
+
+    # Collapse master accounts onto statement lines per (company, period)
+    key_columns = df[["company_id", "period_end"]]
+    group_index = key_columns.groupby(["company_id", "period_end"], dropna=False, sort=False).ngroup().to_numpy()
+    keys = key_columns.drop_duplicates().reset_index(drop=True)
+    n_groups, n_lines = len(keys), len(lines)
+    cell = group_index * n_lines + line_index
+    size = n_groups * n_lines
+    debit = np.bincount(cell, weights=df["debit"].to_numpy(), minlength=size)
+    credit = np.bincount(cell, weights=df["credit"].to_numpy(), minlength=size)
+    balance = np.bincount(cell, weights=df["balance"].to_numpy(), minlength=size)
+
+    credit_normal = np.tile(lines["credit_normal"].to_numpy(), n_groups)
+    net = np.where(credit_normal, credit - debit, debit - credit)
+    amounts = np.round(np.where((debit != 0) | (credit != 0), net, np.abs(balance)), 2).reshape(n_groups, n_lines)
+
+    def total(mask) -> np.ndarray:
+        return amounts[:, np.asarray(mask, dtype=bool)].sum(axis=1)
+
+    values = {name: total(lines["bucket"] == bucket) for bucket, name in SUMMARY_BUCKETS.items()}
+    values.update({name: total(lines["component"] == name) for name in COMPONENTS})
+    values["gross_profit"] = values["revenue"] - values["cogs"]
+    values["operating_profit"] = values["gross_profit"] - values["operating_expenses"]
+    values["net_profit"] = values["operating_profit"] + values["other_income"] - values["finance"] - values["tax"]
+    values["ebitda"] = values["operating_profit"] + total(lines["is_da"])
+    values["total_assets"] = values["total_current_assets"] + values["total_non_current_assets"]
+    values["total_liabilities"] = values["total_current_liabilities"] + values["total_non_current_liabilities"]
+    values["interest_expense"] = total(lines["is_interest"])
+
+    return keys, {name: values[name] for name in INPUT_NAMES}
+
+
+def _json_column(values) -> list:
+    """Convert a result column to JSON-safe values, with NaN as null."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return np.where(np.isnan(values), None, values).tolist()
+    return [v.isoformat() if isinstance(v, date) else None if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+
+def batch_ratios(db: Session, company_ids: list[int] | None = None,
+                 period_from: date | None = None, period_to: date | None = None,
+                 include_inputs: bool = False) -> dict:
+    """Compute every ratio for many (company, period) pairs as a columnar table.
+
+    Uploads without a period are reported under period_end = null.
+    """
+    df = load_period_balances(db, company_ids, period_from, period_to)
+    line_of_master, lines = statement_lines(get_master_chart(db).records)
+    keys, inputs = ratio_input_arrays(df, line_of_master, lines)
+
+    order = keys.sort_values(["company_id", "period_end"], na_position="first").index.to_numpy()
+    columns = {
+        "company_id": keys["company_id"].to_numpy()[order].tolist(),
+        "period_end": keys["period_end"].to_numpy()[order].tolist(),
+    }
+    inputs = {name: values[order] for name, values in inputs.items()}
+    if include_inputs:
+        columns.update(inputs)
+    columns.update(get_ratio_engine().evaluate_columns(inputs))
+
+    return {
+        "row_count": len(order),
+        "columns": {name: _json_column(values) for name, values in columns.items()},
+    }
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import math
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config import get_settings
+from database import SessionLocal
+from models.benchmark import PeerBenchmark
+from models.company import Company
+from services.batch_ratio_service import load_period_balances, statement_lines, ratio_input_arrays
+from services.cache_service import BENCHMARK_SCOPE, bump_version, get_versions
+from services.master_chart import get_master_chart
+from services.quantile_sketch import TDigest
+from services.ratio_engine import get_ratio_engine
+
+settings = get_settings()
+
+ALL_INDUSTRIES = "*"
+
+# Deserialised sketches, reloaded only when the benchmark version changes
+_digests: dict = {"version": None, "digests": {}}
+_rebuild_lock = threading.Lock()
+
+
+class RebuildThrottled(Exception):
+    """A manual rebuild was asked for too soon after the last one."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Peer benchmarks were rebuilt recently; try again in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+def rebuild_peer_benchmarks(db: Session) -> dict:
+    """Recompute per-industry, per-ratio sketches from every company's latest period."""
+    with _rebuild_lock:
+        return _rebuild_peer_benchmarks(db)
+
+
+def request_peer_benchmark_rebuild(db: Session) -> dict:
+    """Rebuild on a user's request, at most once per PEER_BENCHMARK_MANUAL_REBUILD_MINUTES platform-wide.
+
+    Raises RebuildThrottled while a rebuild is running or the last one is too recent.
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        raise RebuildThrottled(60)
+    try:
+        last = db.query(func.max(PeerBenchmark.updated_at)).scalar()
+        if last is not None:
+            if last.tzinfo is None:
+                last = last.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+            wait = settings.PEER_BENCHMARK_MANUAL_REBUILD_MINUTES * 60 - (datetime.now(timezone.utc) - last).total_seconds()
+            if wait > 0:
+                raise RebuildThrottled(math.ceil(wait))
+        return _rebuild_peer_benchmarks(db)
+    finally:
+        _rebuild_lock.release()
+
+
+def _rebuild_peer_benchmarks(db: Session) -> dict:
+    engine = get_ratio_engine()
+    ratio_keys = [ratio.key for ratio in engine.ratios]
+    sketches: dict = {}
+
+    df = load_period_balances(db)
+    if not df.empty:
+        line_of_master, lines = statement_lines(get_master_chart(db).records)
+        keys, inputs = ratio_input_arrays(df, line_of_master, lines)
+
+        # One observation per company: its latest dated period, or its undated
+        # entries if it never recorded periods (statement_service.period_condition)
+        latest = keys.sort_values(["company_id", "period_end"], na_position="first") \
+            .groupby("company_id").tail(1).index.to_numpy()
+        columns = engine.evaluate_columns({name: values[latest] for name, values in inputs.items()})
+
+        industry_of = dict(db.query(Company.id, Company.industry).all())
+        industries = np.array([industry_of.get(cid) or "" for cid in keys["company_id"].to_numpy()[latest]], dtype=object)
+
+        # Every company is in the all-industry distribution, including those without an
+        # industry, since annotate_peer_percentiles ranks them against it
+        groups = [(ALL_INDUSTRIES, np.ones(len(industries), dtype=bool))]
+        groups += [(industry, industries == industry) for industry in sorted(set(industries) - {""})]
+        for group, mask in groups:
+            for key in ratio_keys:
+                values = columns[key][mask]
+                values = values[np.isfinite(values)]
+                if len(values):
+                    digest = TDigest()
+                    digest.add_many(values)
+                    sketches[(group, key)] = digest
+
+    db.query(PeerBenchmark).delete(synchronize_session=False)
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        PeerBenchmark(industry=industry, ratio_key=key, peer_count=digest.count,
+                      sketch=json.dumps(digest.to_dict()), updated_at=now)
+        for (industry, key), digest in sketches.items()
+    ])
+    db.commit()
+    bump_version(db, BENCHMARK_SCOPE)
+
+    return {
+        "industries": len({industry for industry, _ in sketches} - {ALL_INDUSTRIES}),
+        "sketches": len(sketches),
+        "updated_at": now.isoformat(),
+    }
+
+
+def get_peer_digests(db: Session) -> dict:
+    """{(industry, ratio_key): (TDigest, peer_count)}, cached until the next rebuild."""
+    version = get_versions(db, [BENCHMARK_SCOPE])[BENCHMARK_SCOPE]
+    if _digests["version"] != version:
+        rows = db.query(PeerBenchmark).all()
+        _digests["digests"] = {
+            (r.industry, r.ratio_key): (TDigest.from_dict(json.loads(r.sketch)), r.peer_count)
+            for r in rows
+        }
+        _digests["version"] = version
+    return _digests["digests"]
+
+
+def annotate_peer_percentiles(db: Session, company_id: int, ratios: dict) -> dict:
+    """Add peer_percentile, peer_count and peer_group to each ratio that has a peer distribution.
+
+    Falls back to the all-industry distribution when the company's industry has
+    too few peers to be meaningful (or to avoid exposing individual companies).
+    """
+    digests = get_peer_digests(db)
+    if not digests:
+        return ratios
+    company = db.query(Company).filter(Company.id == company_id).first()
+    industry = company.industry if company else None
+
+    for category in ratios.values():
+        for ratio in category["ratios"]:
+            value = ratio.get("value")
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            for group in (industry, ALL_INDUSTRIES):
+                entry = digests.get((group, ratio["key"]))
+                if entry and entry[1] >= settings.PEER_BENCHMARK_MIN_PEERS:
+                    digest, count = entry
+                    ratio["peer_percentile"] = round(digest.cdf(value) * 100, 1)
+                    ratio["peer_count"] = count
+                    ratio["peer_group"] = "all" if group == ALL_INDUSTRIES else group
+                    break
+    return ratios
+
+
+def _rebuild_in_new_session() -> dict:
+    db = SessionLocal()
+    try:
+        return rebuild_peer_benchmarks(db)
+    finally:
+        db.close()
+
+
+async def run_benchmark_schedule(interval_hours: float):
+    """Rebuild peer benchmarks now and then every interval, off the event loop."""
+    while True:
+        try:
+            result = await asyncio.to_thread(_rebuild_in_new_session)
+            print(f"📊 Peer benchmarks rebuilt: {result['sketches']} sketches across {result['industries']} industries")
+        except Exception as e:
+            print(f"⚠️ Peer benchmark rebuild failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
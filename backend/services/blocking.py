@@ -0,0 +1,35 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from config import get_settings
+
+settings = get_settings()
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        workers = settings.BLOCKING_WORKERS or max(2, os.cpu_count() or 1)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blocking")
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run DB- or CPU-bound work from an async endpoint on the bounded worker pool, keeping the event loop free.
+
+    At most BLOCKING_WORKERS calls run at once and further calls queue, so a
+    burst of exports cannot starve the loop of the GIL. A Session
+    passed in must not be used concurrently by the caller while this runs.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_blocking_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
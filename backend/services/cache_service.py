@@ -0,0 +1,69 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from config import get_settings
+from models.data_version import DataVersion
+
+settings = get_settings()
+
+FX_SCOPE = "fx"  # shared FX rates; company rates bump the company scope
+BENCHMARK_SCOPE = "peer_benchmarks"
+MASTER_CHART_SCOPE = "master_chart"
+
+
+def company_scope(company_id: int) -> str:
+    return f"company:{company_id}"
+
+
+def get_versions(db: Session, scopes: list[str]) -> dict:
+    """Return {scope: version} for the given scopes (0 when never bumped)."""
+    rows = db.query(DataVersion.scope, DataVersion.version).filter(DataVersion.scope.in_(scopes)).all()
+    versions = {scope: 0 for scope in scopes}
+    versions.update({scope: version for scope, version in rows})
+    return versions
+
+
+def get_company_version(db: Session, company_id: int) -> int:
+    return get_versions(db, [company_scope(company_id)])[company_scope(company_id)]
+
+
+def bump_version(db: Session, scope: str) -> None:
+    """Atomically increment a data version, creating it on first use."""
+    updated = db.query(DataVersion).filter(DataVersion.scope == scope).update(
+        {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.add(DataVersion(scope=scope, version=1))
+    db.commit()
+
+
+def bump_company_version(db: Session, company_id: int) -> None:
+    """Mark a company's reports stale after its uploads, mappings or profile change."""
+    bump_version(db, company_scope(company_id))
+
+
+def report_etag(db: Session, company_id: int, request: Request, extra_scopes: tuple = ()) -> str:
+    """Strong ETag for a company report, derived from the data versions it depends on."""
+    scopes = [company_scope(company_id), FX_SCOPE, *extra_scopes]
+    versions = get_versions(db, scopes)
+    key = "|".join([
+        settings.APP_VERSION,
+        request.url.path,
+        str(sorted(request.query_params.multi_items())),
+        str(company_id),
+        *(str(versions[scope]) for scope in scopes),
+    ])
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Response | None:
+    """Attach validators to the response, returning a 304 if the client's copy is current."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in candidates or etag in candidates:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
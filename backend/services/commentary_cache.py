@@ -0,0 +1,68 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import get_settings
+from models.commentary import CommentaryCache
+
+settings = get_settings()
+
+
+def commentary_cache_key(financial_context: str, model: str, prompt_version: str) -> str:
+    """Identical financials, model and prompt produce the same key."""
+    return hashlib.sha256("\x1f".join([model, prompt_version, financial_context]).encode()).hexdigest()
+
+
+def _cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=settings.COMMENTARY_CACHE_TTL_HOURS)
+
+
+def get_cached_commentary(db: Session, cache_key: str) -> dict | None:
+    """Return unexpired commentary for a key, marking it recently used."""
+    entry = db.query(CommentaryCache).filter(
+        CommentaryCache.cache_key == cache_key,
+        CommentaryCache.created_at >= _cutoff(),
+    ).first()
+    if not entry:
+        return None
+
+    entry.hits = (entry.hits or 0) + 1
+    entry.last_used_at = datetime.now(timezone.utc)
+    db.commit()
+    return json.loads(entry.commentary)
+
+
+def store_commentary(db: Session, cache_key: str, company_id: int, model: str, prompt_version: str, commentary: dict):
+    """Save generated commentary under its key, replacing any earlier entry, then evict."""
+    now = datetime.now(timezone.utc)
+    payload = json.dumps(commentary, ensure_ascii=False)
+    values = {"commentary": payload, "created_at": now, "last_used_at": now}
+
+    updated = db.query(CommentaryCache).filter(CommentaryCache.cache_key == cache_key).update(
+        values, synchronize_session=False
+    )
+    if not updated:
+        db.add(CommentaryCache(cache_key=cache_key, company_id=company_id, model=model,
+                               prompt_version=prompt_version, hits=0, **values))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored the same commentary first
+        db.rollback()
+        return
+    evict_commentary(db)
+
+
+def evict_commentary(db: Session) -> int:
+    """Drop expired entries, then the least recently used beyond COMMENTARY_CACHE_MAX_ENTRIES."""
+    removed = db.query(CommentaryCache).filter(CommentaryCache.created_at < _cutoff()).delete(synchronize_session=False)
+
+    overflow = db.query(CommentaryCache.id).order_by(
+        CommentaryCache.last_used_at.desc(), CommentaryCache.id.desc()
+    ).offset(settings.COMMENTARY_CACHE_MAX_ENTRIES).subquery()
+    removed += db.query(CommentaryCache).filter(CommentaryCache.id.in_(overflow.select())).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    return removed
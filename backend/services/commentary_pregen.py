@@ -0,0 +1,119 @@
+import asyncio
+from sqlalchemy.orm import Session
+from config import get_settings
+from database import SessionLocal
+from models.company import Company
+from services.ai_service import ai_configured, generate_commentary
+from services.blocking import run_blocking
+from services.mapping_service import mapping_coverage
+
+settings = get_settings()
+
+_loop: asyncio.AbstractEventLoop | None = None
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+_queued: set[int] = set()  # waiting for a worker
+_running: set[int] = set()
+_rerun: set[int] = set()  # data changed while generating: run once more afterwards
+_stats = {"enqueued": 0, "deduplicated": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+
+def start_pregeneration_workers():
+    """Start the background workers on the running event loop (app startup)."""
+    global _loop, _queue
+    if settings.COMMENTARY_PREGEN_WORKERS <= 0:
+        return
+    _loop = asyncio.get_running_loop()
+    _queue = asyncio.Queue(maxsize=settings.COMMENTARY_PREGEN_QUEUE_SIZE)
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(settings.COMMENTARY_PREGEN_WORKERS))
+
+
+async def stop_pregeneration_workers():
+    global _loop
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _loop = None
+
+
+def request_pregeneration(db: Session, company_id: int) -> bool:
+    """Queue commentary generation for a company whose data just changed, if enough of it is mapped.
+
+    Safe to call from sync endpoints (worker threads) and async ones. Returns
+    whether the company was handed to the queue.
+    """
+    if _loop is None or not ai_configured():
+        return False
+    if mapping_coverage(db, company_id) < settings.COMMENTARY_PREGEN_MIN_COVERAGE:
+        return False
+    _loop.call_soon_threadsafe(_enqueue, company_id)
+    return True
+
+
+def _enqueue(company_id: int):
+    # Runs on the event loop thread, so the bookkeeping sets need no lock
+    if company_id in _queued:
+        _stats["deduplicated"] += 1
+        return
+    if company_id in _running:
+        _rerun.add(company_id)
+        _stats["deduplicated"] += 1
+        return
+    try:
+        _queue.put_nowait((_loop.time() + settings.COMMENTARY_PREGEN_DELAY_SECONDS, company_id))
+    except asyncio.QueueFull:
+        _stats["dropped"] += 1
+        return
+    _queued.add(company_id)
+    _stats["enqueued"] += 1
+
+
+async def _worker():
+    while True:
+        due, company_id = await _queue.get()
+        try:
+            # Uploads and remaps arriving before the due time fold into this run
+            await asyncio.sleep(max(0.0, due - _loop.time()))
+            _queued.discard(company_id)
+            _running.add(company_id)
+            await _pregenerate(company_id)
+            _stats["completed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _stats["failed"] += 1
+            print(f"⚠️ Commentary pre-generation failed for company {company_id}: {e}")
+        finally:
+            _queued.discard(company_id)
+            _running.discard(company_id)
+            _queue.task_done()
+            if company_id in _rerun:
+                _rerun.discard(company_id)
+                _enqueue(company_id)
+
+
+def _company_name(db: Session, company_id: int) -> str | None:
+    company = db.query(Company).filter(Company.id == company_id).first()
+    return company.name if company else None
+
+
+async def _pregenerate(company_id: int):
+    db = SessionLocal()
+    try:
+        company_name = await run_blocking(_company_name, db, company_id)
+        if company_name is None:
+            return
+        # A cache hit makes this a no-op; otherwise the result is stored for the user's first visit
+        await generate_commentary(db, company_id, company_name)
+    finally:
+        db.close()
+
+
+def get_pregeneration_status() -> dict:
+    return {
+        **_stats,
+        "workers": len(_workers),
+        "queued": len(_queued),
+        "running": len(_running),
+    }
@@ -0,0 +1,254 @@
+from datetime import date
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.company import Company
+from models.account import AccountMapping, MasterAccount
+from models.financial_data import TrialBalanceEntry
+from models.consolidation import GroupMember, GroupGrant, EliminationRule
+from services.statement_service import (
+    accumulate_balance, build_profit_and_loss, build_balance_sheet, build_cash_flow, statement_bucket,
+)
+from services.ratio_service import compute_ratios
+from services.fx_service import translate_frame, reporting_date, latest_period
+
+
+BALANCE_COLUMNS = [
+    "company_id", "source_code", "code", "name", "category", "sub_category",
+    "fs_line", "normal_balance", "debit", "credit", "balance",
+]
+AMOUNT_COLUMNS = ["debit", "credit", "balance"]
+MASTER_COLUMNS = ["code", "name", "category", "sub_category", "fs_line", "normal_balance"]
+NCI_CODE = "5400"
+NCI_LINE = "Non-controlling Interests"
+
+
+def get_group_entities(db: Session, parent_company_id: int) -> dict:
+    """Return {company_id: ownership_pct} for a parent company and its subsidiaries."""
+    entities = {parent_company_id: 100.0}
+    # Only subsidiaries that still grant the parent access are consolidated
+    members = db.query(GroupMember).join(
+        GroupGrant,
+        (GroupGrant.subsidiary_company_id == GroupMember.subsidiary_company_id) &
+        (GroupGrant.parent_company_id == GroupMember.parent_company_id)
+    ).filter(GroupMember.parent_company_id == parent_company_id).all()
+    for member in members:
+        entities[member.subsidiary_company_id] = member.ownership_pct if member.ownership_pct is not None else 100.0
+    return entities
+
+
+def _period_filter(period_end: date | None):
+    return TrialBalanceEntry.period_end == period_end if period_end else TrialBalanceEntry.period_end.is_(None)
+
+
+def entities_with_period(db: Session, company_ids: list[int], period_end: date | None) -> set[int]:
+    """The group entities that have a trial balance for the period (undated entries when period_end is None)."""
+    return {company_id for (company_id,) in db.query(TrialBalanceEntry.company_id).filter(
+        TrialBalanceEntry.company_id.in_(company_ids),
+        _period_filter(period_end),
+    ).distinct()}
+
+
+def load_group_balances(db: Session, company_ids: list[int], period_end: date | None = None) -> pd.DataFrame:
+    """Load mapped balances for every group entity in a single grouped query.
+
+    Every entity contributes its trial balance for the same period (undated
+    entries when period_end is None), so the group never adds one entity's
+    January balances to another's June balances.
+    """
+    master_columns = [
+        MasterAccount.code, MasterAccount.name, MasterAccount.category,
+        MasterAccount.sub_category, MasterAccount.fs_line, MasterAccount.normal_balance,
+    ]
+    rows = db.query(
+        TrialBalanceEntry.company_id,
+        TrialBalanceEntry.account_code,
+        *master_columns,
+        func.sum(TrialBalanceEntry.debit),
+        func.sum(TrialBalanceEntry.credit),
+        func.sum(TrialBalanceEntry.balance),
+    ).join(
+        AccountMapping,
+        (AccountMapping.source_code == TrialBalanceEntry.account_code) &
+        (AccountMapping.company_id == TrialBalanceEntry.company_id)
+    ).join(
+        MasterAccount,
+        MasterAccount.id == AccountMapping.master_account_id
+    ).filter(
+        TrialBalanceEntry.company_id.in_(company_ids),
+        _period_filter(period_end),
+        AccountMapping.is_mapped == True
+    ).group_by(
+        TrialBalanceEntry.company_id,
+        TrialBalanceEntry.account_code,
+        *master_columns,
+    ).all()
+
+    df = pd.DataFrame([tuple(r) for r in rows], columns=BALANCE_COLUMNS)
+    df[AMOUNT_COLUMNS] = df[AMOUNT_COLUMNS].astype(float).fillna(0.0)
+    return df
+
+
+def elimination_mask(df: pd.DataFrame, rules: list[EliminationRule]) -> pd.Series:
+    """Flag the group balances matched by any intercompany elimination rule."""
+    mask = pd.Series(False, index=df.index)
+    for rule in rules:
+        matched = pd.Series(True, index=df.index)
+        if rule.company_id is not None:
+            matched &= df["company_id"] == rule.company_id
+        if rule.source_code:
+            matched &= df["source_code"] == rule.source_code
+        if rule.master_code:
+            matched &= df["code"] == rule.master_code
+        mask |= matched
+    return mask
+
+
+def attribute_non_controlling_interests(df: pd.DataFrame, entities: dict) -> pd.DataFrame:
+    """Move the non-controlling share of each partly owned subsidiary's equity to a Non-controlling Interests line.
+
+    Subsidiaries are consolidated in full; only the split of their equity
+    changes, so the balance sheet still balances. Elimination rules then see
+    the parent's share of the subsidiary's equity, as an investment
+    elimination expects.
+    """
+    nci_shares = {company_id: 1 - pct / 100.0 for company_id, pct in entities.items() if pct < 100}
+    if df.empty or not nci_shares:
+        return df
+    shares = df["company_id"].map(nci_shares).fillna(0.0)
+    is_equity = pd.Series(
+        [statement_bucket(category, sub_category) == "equity" for category, sub_category in zip(df["category"], df["sub_category"])],
+        index=df.index,
+    )
+    moved = df.loc[is_equity, AMOUNT_COLUMNS].mul(shares[is_equity], axis=0)
+    df = df.copy()
+    df.loc[is_equity, AMOUNT_COLUMNS] -= moved
+    nci = moved["balance"].groupby(df.loc[is_equity, "company_id"]).sum()
+    rows = pd.DataFrame([
+        {
+            "company_id": company_id, "source_code": None, "code": NCI_CODE, "name": NCI_LINE,
+            "category": "Equity", "sub_category": "Equity", "fs_line": NCI_LINE, "normal_balance": "credit",
+            "debit": max(balance, 0.0), "credit": max(-balance, 0.0), "balance": balance,
+        }
+        for company_id, balance in nci.items() if round(balance, 2)
+    ], columns=BALANCE_COLUMNS)
+    return pd.concat([df, rows], ignore_index=True) if not rows.empty else df
+
+
+def frame_to_balances(df: pd.DataFrame) -> dict:
+    """Aggregate a group balance frame into the shape returned by get_mapped_balances."""
+    aggregated = {}
+    if df.empty:
+        return aggregated
+    by_master = df.groupby(MASTER_COLUMNS, dropna=False, sort=True)[AMOUNT_COLUMNS].sum().reset_index()
+    for row in by_master.itertuples(index=False):
+        accumulate_balance(aggregated, row, row.debit, row.credit, row.balance)
+    return aggregated
+
+
+def consolidate_group(db: Session, parent_company_id: int, currency: str | None = None,
+                      period_end: date | None = None) -> dict:
+    """Generate consolidated statements for a parent company and its subsidiaries.
+
+    The group reports on one period: the requested one, else the parent's
+    latest. Entities without a trial balance for it are left out and listed
+    under "excluded_entities". Entity balances are translated into the group
+    currency (the parent's currency unless one is given) at that period's
+    rates, and consolidated in full: subsidiaries the parent owns less than
+    100% of contribute all their lines, with the outside owners' share of
+    their equity shown as Non-controlling Interests and of their profit as
+    profit attributable to non-controlling interests. Intercompany elimination
+    rules are applied last.
+    """
+    period_end = period_end or latest_period(db, parent_company_id)
+    group = get_group_entities(db, parent_company_id)
+    companies = {c.id: c for c in db.query(Company).filter(Company.id.in_(list(group))).all()}
+    reported = entities_with_period(db, list(group), period_end)
+    entities = {company_id: pct for company_id, pct in group.items() if company_id in reported}
+    excluded = [
+        {
+            "company_id": company_id,
+            "name": companies[company_id].name if company_id in companies else None,
+            "reason": f"No trial balance for period {period_end}" if period_end else "No undated trial balance",
+        }
+        for company_id in group if company_id not in reported
+    ]
+    rules = db.query(EliminationRule).filter(EliminationRule.parent_company_id == parent_company_id).all()
+
+    parent = companies.get(parent_company_id)
+    group_currency = (currency or (parent.currency if parent else None) or "AED").upper()
+    currencies = {company_id: (c.currency or group_currency) for company_id, c in companies.items()}
+
+    df = load_group_balances(db, list(entities), period_end)
+    df = translate_frame(db, df, currencies, group_currency, reporting_date(db, parent_company_id, period_end), parent_company_id)
+    df = attribute_non_controlling_interests(df, entities)
+
+    eliminated = elimination_mask(df, rules)
+    kept = df[~eliminated]
+
+    balances = frame_to_balances(kept)
+    pnl = build_profit_and_loss(balances)
+    bs = build_balance_sheet(balances)
+    cf = build_cash_flow(pnl, bs)
+
+    # Per-entity contributions from the same frame, one groupby instead of one query per subsidiary
+    frames = dict(tuple(kept.groupby("company_id")))
+    contributions = []
+    nci_profit = 0.0
+    for company_id, ownership_pct in entities.items():
+        entity_balances = frame_to_balances(frames.get(company_id, kept.iloc[0:0]))
+        entity_pnl = build_profit_and_loss(entity_balances)
+        entity_bs = build_balance_sheet(entity_balances)
+        company = companies.get(company_id)
+        nci_profit += entity_pnl["summary"]["net_profit"] * (1 - ownership_pct / 100.0)
+        contributions.append({
+            "company_id": company_id,
+            "name": company.name if company else None,
+            "currency": company.currency if company else None,
+            "ownership_pct": ownership_pct,
+            "nci_pct": round(100.0 - ownership_pct, 4),
+            "is_parent": company_id == parent_company_id,
+            "revenue": entity_pnl["summary"]["revenue"],
+            "net_profit": entity_pnl["summary"]["net_profit"],
+            "total_assets": entity_bs["summary"]["total_assets"],
+            "total_liabilities": entity_bs["summary"]["total_liabilities"],
+            "total_equity": entity_bs["summary"]["total_equity"],
+        })
+
+    net_profit = pnl["summary"]["net_profit"]
+    pnl["sections"] += [
+        {"name": "Attributable to Owners of the Parent", "items": [], "total": round(net_profit - nci_profit, 2), "is_subtotal": True},
+        {"name": "Attributable to Non-controlling Interests", "items": [], "total": round(nci_profit, 2), "is_subtotal": True},
+    ]
+    pnl["summary"]["profit_attributable_to_owners"] = round(net_profit - nci_profit, 2)
+    pnl["summary"]["profit_attributable_to_nci"] = round(nci_profit, 2)
+    nci_equity = sum(item["amount"] for section in bs["sections"] if section["name"] == "Equity"
+                     for item in section["items"] if item["line"] == NCI_LINE)
+    bs["summary"]["non_controlling_interests"] = round(nci_equity, 2)
+    bs["summary"]["equity_attributable_to_owners"] = round(bs["summary"]["total_equity"] - nci_equity, 2)
+
+    return {
+        "parent_company_id": parent_company_id,
+        "method": "full",  # subsidiaries at 100% with non-controlling interests, not proportionate
+        "currency": group_currency,
+        "period_end": period_end.isoformat() if period_end else None,
+        "entity_count": len(entities),
+        "entities": contributions,
+        "excluded_entities": excluded,
+        "eliminations": {
+            "rules": len(rules),
+            "balances_eliminated": int(eliminated.sum()),
+            "debit": round(float(df.loc[eliminated, "debit"].sum()), 2),
+            "credit": round(float(df.loc[eliminated, "credit"].sum()), 2),
+        },
+        "profit_loss": pnl,
+        "balance_sheet": bs,
+        "cash_flow": cf,
+    }
+
+
+def consolidated_ratios(db: Session, parent_company_id: int, currency: str | None = None,
+                        period_end: date | None = None) -> dict:
+    """Calculate financial ratios on consolidated group statements."""
+    group = consolidate_group(db, parent_company_id, currency, period_end)
+    return compute_ratios(group["profit_loss"], group["balance_sheet"])
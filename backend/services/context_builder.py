@@ -0,0 +1,172 @@
+import math
+import re
+from dataclasses import dataclass, field
+from sqlalchemy.orm import Session
+from services.fx_service import company_currency, reporting_date
+from services.statement_service import generate_profit_and_loss, generate_balance_sheet, generate_cash_flow
+from services.ratio_service import calculate_ratios
+
+# Approximates a BPE tokenizer: words in ~6-character pieces, digits in groups
+# of three, each punctuation mark and each line break one token, and spaces
+# merged into the following word. tiktoken is optional and not in
+# requirements.txt (its encodings are downloaded on first use), so by default
+# token counts, and therefore the context budget, are approximate.
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|\n+|[^\sA-Za-z\d]")
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoding = None
+_encoding_unavailable = tiktoken is None  # set once loading the encoding fails, e.g. offline
+
+STATUS_PRIORITY = {"danger": 0, "warning": 1, "good": 2}
+OMISSION_NOTE_TOKENS = 12  # kept free in optional tables for the "rows omitted" note
+
+
+def _get_encoding():
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding_unavailable = True  # encoding files can't be downloaded
+    return _encoding
+
+
+def token_counts_exact() -> bool:
+    """Whether count_tokens uses tiktoken rather than the approximation."""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text, exact with tiktoken and its encoding available and a local approximation otherwise."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(math.ceil(len(t) / 6) if t[0].isalpha() else 1 for t in _TOKEN_PATTERN.findall(text))
+
+
+@dataclass
+class FinancialContext:
+    """The rendered context plus what it cost and what had to be left out to fit the budget."""
+    text: str
+    tokens: int
+    budget: int
+    omitted: dict = field(default_factory=dict)  # section -> rows dropped
+    exact: bool = False  # False when tokens is the approximation (no tiktoken)
+
+
+@dataclass
+class _Table:
+    name: str
+    columns: list[str]
+    rows: list[list]  # most material first
+    required: bool = False
+
+
+def _amount(value: float) -> str:
+    return f"{value:.0f}"
+
+
+def _share(value: float, base: float) -> str:
+    return f"{value / base * 100:.1f}" if base else "-"
+
+
+def _ratio_value(ratio: dict) -> str:
+    unit = ratio.get("unit", "x")
+    return f"{ratio['value']}{' ' if len(unit) > 1 else ''}{unit}"
+
+
+def _tables(db: Session, company_id: int) -> list[_Table]:
+    pnl = generate_profit_and_loss(db, company_id)
+    bs = generate_balance_sheet(db, company_id)
+    cf = generate_cash_flow(db, company_id)
+    ratios = calculate_ratios(db, company_id)
+    p, b, c = pnl["summary"], bs["summary"], cf["summary"]
+
+    summary = _Table("summary", ["metric", "amount"], [
+        ["revenue", _amount(p["revenue"])],
+        ["cost_of_revenue", _amount(p["cogs"])],
+        ["gross_profit", _amount(p["gross_profit"])],
+        ["operating_expenses", _amount(p["operating_expenses"])],
+        ["operating_profit", _amount(p["operating_profit"])],
+        ["ebitda", _amount(p["ebitda"])],
+        ["net_profit", _amount(p["net_profit"])],
+        ["current_assets", _amount(b["total_current_assets"])],
+        ["non_current_assets", _amount(b["total_non_current_assets"])],
+        ["total_assets", _amount(b["total_assets"])],
+        ["current_liabilities", _amount(b["total_current_liabilities"])],
+        ["non_current_liabilities", _amount(b["total_non_current_liabilities"])],
+        ["total_liabilities", _amount(b["total_liabilities"])],
+        ["total_equity", _amount(b["total_equity"])],
+        ["cash_from_operations", _amount(c["cash_from_operations"])],
+        ["cash_from_investing", _amount(c["cash_from_investing"])],
+        ["cash_from_financing", _amount(c["cash_from_financing"])],
+        ["net_change_in_cash", _amount(c["net_change"])],
+    ], required=True)
+
+    # Ratios off benchmark matter most to the commentary
+    ratio_rows = sorted(
+        (r for data in ratios.values() for r in data["ratios"]),
+        key=lambda r: STATUS_PRIORITY.get(r["status"], 3),
+    )
+    ratio_table = _Table("ratios", ["ratio", "value", "benchmark", "status"], [
+        [r["name"], _ratio_value(r), r["benchmark"], r["status"]] for r in ratio_rows
+    ])
+
+    # Statement lines by size relative to revenue (P&L) or total assets (balance sheet)
+    line_items = []
+    for statement, report, base in (("pnl", pnl, p["revenue"]), ("bs", bs, b["total_assets"])):
+        for section in report["sections"]:
+            for item in section["items"]:
+                weight = abs(item["amount"]) / abs(base) if base else abs(item["amount"])
+                line_items.append((weight, [statement, section["name"], item["line"], _amount(item["amount"]),
+                                            _share(item["amount"], base)]))
+    line_items.sort(key=lambda entry: -entry[0])
+    lines_table = _Table("line_items", ["statement", "section", "line", "amount", "pct_of_base"],
+                         [row for _, row in line_items])
+
+    return [summary, ratio_table, lines_table]
+
+
+def build_compact_context(db: Session, company_id: int, company_name: str, budget: int) -> FinancialContext:
+    """Financial data as compact pipe-separated tables, fitted to a token budget.
+
+    The header and summary table are always included. Ratios (off-benchmark
+    first) and statement lines (largest first) are then added row by row
+    while they fit; the rest are counted in omitted and noted in the text.
+    """
+    currency = company_currency(db, company_id)
+    header = (
+        f"company|{company_name}\ncurrency|{currency}\nperiod_end|{reporting_date(db, company_id).isoformat()}\n"
+        f"Tables are pipe-separated; amounts in {currency}; pct_of_base is % of revenue (pnl) or total assets (bs).\n"
+    )
+    parts = [header]
+    used = count_tokens(header)
+    omitted = {}
+
+    for table in _tables(db, company_id):
+        heading = f"\n## {table.name}\n{'|'.join(table.columns)}\n"
+        cost = count_tokens(heading)
+        if not table.required and used + cost > budget:
+            omitted[table.name] = len(table.rows)
+            continue
+        parts.append(heading)
+        used += cost
+        for i, row in enumerate(table.rows):
+            line = "|".join(str(value) for value in row) + "\n"
+            cost = count_tokens(line)
+            reserve = OMISSION_NOTE_TOKENS if i < len(table.rows) - 1 else 0
+            if not table.required and used + cost + reserve > budget:
+                omitted[table.name] = len(table.rows) - i
+                note = f"(+{omitted[table.name]} less material rows omitted)\n"
+                parts.append(note)
+                used += count_tokens(note)
+                break
+            parts.append(line)
+            used += cost
+
+    text = "".join(parts)
+    return FinancialContext(text=text, tokens=count_tokens(text), budget=budget, omitted=omitted, exact=token_counts_exact())
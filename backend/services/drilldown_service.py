@@ -0,0 +1,75 @@
+from datetime import date
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from models.financial_data import GeneralLedgerEntry
+from services.statement_service import get_drilldown_index
+
+
+def get_line_accounts(db: Session, company_id: int, fs_line: str) -> dict:
+    """List the source accounts contributing to a financial statement line."""
+    index = get_drilldown_index(db, company_id)
+    if fs_line not in index:
+        raise HTTPException(status_code=404, detail=f"No mapped accounts found for '{fs_line}'")
+
+    accounts = sorted(index[fs_line].values(), key=lambda a: abs(a["balance"]), reverse=True)
+    return {
+        "fs_line": fs_line,
+        "accounts": [
+            {**a, "debit": round(a["debit"], 2), "credit": round(a["credit"], 2), "balance": round(a["balance"], 2)}
+            for a in accounts
+        ],
+        "total_balance": round(sum(a["balance"] for a in accounts), 2),
+    }
+
+
+def encode_cursor(entry: GeneralLedgerEntry) -> str:
+    return f"{entry.date.isoformat()}_{entry.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        entry_date, entry_id = cursor.split("_", 1)
+        return date.fromisoformat(entry_date), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_ledger_lines(db: Session, company_id: int, account_code: str, cursor: str | None = None, limit: int = 100) -> dict:
+    """Page through an account's general ledger lines in date order.
+
+    Uses keyset pagination on (date, id) so each page is an index range scan
+    on (company_id, account_code, date) regardless of how deep the page is.
+    """
+    query = db.query(GeneralLedgerEntry).filter(
+        GeneralLedgerEntry.company_id == company_id,
+        GeneralLedgerEntry.account_code == account_code,
+    )
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            GeneralLedgerEntry.date > after_date,
+            and_(GeneralLedgerEntry.date == after_date, GeneralLedgerEntry.id > after_id),
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    entries = query.order_by(GeneralLedgerEntry.date, GeneralLedgerEntry.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    return {
+        "account_code": account_code,
+        "lines": [
+            {
+                "id": e.id,
+                "date": e.date.isoformat(),
+                "description": e.description,
+                "reference": e.reference,
+                "debit": e.debit,
+                "credit": e.credit,
+                "balance": e.balance,
+            }
+            for e in entries
+        ],
+        "next_cursor": encode_cursor(entries[-1]) if has_more else None,
+    }
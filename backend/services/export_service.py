@@ -6,11 +6,11 @@ from reportlab.lib.units import inch, mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable
 import xlsxwriter
 from sqlalchemy.orm import Session
-from services.statement_service import generate_profit_and_loss, generate_balance_sheet, generate_cash_flow
-from services.ratio_service import calculate_ratios
+from services.statement_service import get_mapped_balances, build_profit_and_loss, build_balance_sheet, build_cash_flow
+from services.ratio_service import compute_ratios
 
 
-def generate_pdf_report(db: Session, company_id: int, company_name: str, commentary: dict = None) -> BytesIO:
+def generate_pdf_report(db: Session, company_id: int, company_name: str, commentary: dict = None, currency: str | None = None) -> BytesIO:
     """Generate a board-ready PDF report."""
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30*mm, bottomMargin=20*mm)
@@ -34,10 +34,11 @@ def generate_pdf_report(db: Session, company_id: int, company_name: str, comment
     elements.append(Spacer(1, 20))
 
     # Financial Statements
-    pnl = generate_profit_and_loss(db, company_id)
-    bs = generate_balance_sheet(db, company_id)
-    cf = generate_cash_flow(db, company_id)
-    ratios = calculate_ratios(db, company_id)
+    balances = get_mapped_balances(db, company_id, currency)
+    pnl = build_profit_and_loss(balances)
+    bs = build_balance_sheet(balances)
+    cf = build_cash_flow(pnl, bs)
+    ratios = compute_ratios(pnl, bs)
 
     # P&L Section
     elements.append(Paragraph("Profit & Loss Statement", heading_style))
@@ -147,7 +148,7 @@ def generate_pdf_report(db: Session, company_id: int, company_name: str, comment
     return buffer
 
 
-def generate_excel_report(db: Session, company_id: int, company_name: str) -> BytesIO:
+def generate_excel_report(db: Session, company_id: int, company_name: str, currency: str | None = None) -> BytesIO:
     """Generate Excel report with all financial data."""
     output = BytesIO()
     workbook = xlsxwriter.Workbook(output, {"in_memory": True})
@@ -168,10 +169,11 @@ def generate_excel_report(db: Session, company_id: int, company_name: str) -> By
     cell_fmt = workbook.add_format({"border": 1, "font_size": 10})
     money_fmt = workbook.add_format({"border": 1, "font_size": 10, "num_format": "#,##0.00"})
 
-    pnl = generate_profit_and_loss(db, company_id)
-    bs = generate_balance_sheet(db, company_id)
-    cf = generate_cash_flow(db, company_id)
-    ratios = calculate_ratios(db, company_id)
+    balances = get_mapped_balances(db, company_id, currency)
+    pnl = build_profit_and_loss(balances)
+    bs = build_balance_sheet(balances)
+    cf = build_cash_flow(pnl, bs)
+    ratios = compute_ratios(pnl, bs)
 
     # P&L Sheet
     ws = workbook.add_worksheet("Profit & Loss")
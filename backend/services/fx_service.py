@@ -0,0 +1,220 @@
+import calendar
+from datetime import date
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.company import Company
+from models.financial_data import TrialBalanceEntry
+from models.fx_rate import FxRate
+from services.cache_service import FX_SCOPE, bump_company_version, bump_version, company_scope, get_versions
+
+
+# P&L items are translated at the average rate, everything else at the closing rate
+PNL_CATEGORIES = ["Revenue", "Expense"]
+
+# Equity line absorbing the difference between the two rates (IAS 21 translation reserve)
+TRANSLATION_RESERVE_CODE = "5220"
+TRANSLATION_RESERVE_LINE = "Foreign Currency Translation Reserve"
+
+# company_id -> (data versions, {(from_currency, to_currency, "YYYY-MM"): (closing_rate, average_rate)}).
+# Keyed on the FX and company data versions, so a rate saved through any worker
+# invalidates every worker's copy on its next read.
+_rate_cache: dict[int | None, tuple[tuple, dict]] = {}
+
+
+def _cached_rates(db: Session, company_id: int | None) -> dict:
+    """The rates cached for a company, emptied when shared rates or the company's data change."""
+    scopes = [FX_SCOPE] + ([company_scope(company_id)] if company_id is not None else [])
+    versions = get_versions(db, scopes)
+    key = tuple(versions[scope] for scope in scopes)
+    entry = _rate_cache.get(company_id)
+    if entry is None or entry[0] != key:
+        entry = _rate_cache[company_id] = (key, {})
+    return entry[1]
+
+
+def period_end(as_of: date) -> date:
+    """Last day of the calendar month containing as_of."""
+    return date(as_of.year, as_of.month, calendar.monthrange(as_of.year, as_of.month)[1])
+
+
+def latest_period(db: Session, company_id: int) -> date | None:
+    """End date of a company's latest trial balance period, or None if no upload recorded one."""
+    return db.query(func.max(TrialBalanceEntry.period_end)).filter(
+        TrialBalanceEntry.company_id == company_id
+    ).scalar()
+
+
+def reporting_date(db: Session, company_id: int, period_end: date | None = None) -> date:
+    """The period being reported on: the requested one, else the latest, else today if periods are not recorded."""
+    return period_end or latest_period(db, company_id) or date.today()
+
+
+def _latest_rate(db: Session, company_id: int | None, from_ccy: str, to_ccy: str, on_or_before: date) -> FxRate | None:
+    """The company's own rate for the pair if it has one, otherwise the shared rate."""
+    for owner in ([company_id] if company_id is not None else []) + [None]:
+        rate = db.query(FxRate).filter(
+            FxRate.company_id.is_(None) if owner is None else FxRate.company_id == owner,
+            FxRate.from_currency == from_ccy,
+            FxRate.to_currency == to_ccy,
+            FxRate.rate_date <= on_or_before,
+        ).order_by(FxRate.rate_date.desc()).first()
+        if rate:
+            return rate
+    return None
+
+
+def get_rates(db: Session, from_ccy: str, to_ccy: str, as_of: date | None = None,
+              company_id: int | None = None) -> tuple[float, float]:
+    """Return (closing_rate, average_rate) for a currency pair from a company's rate table, cached per period."""
+    from_ccy = (from_ccy or "").upper()
+    to_ccy = (to_ccy or "").upper()
+    if not from_ccy or not to_ccy or from_ccy == to_ccy:
+        return 1.0, 1.0
+
+    as_of = as_of or date.today()
+    cache = _cached_rates(db, company_id)
+    key = (from_ccy, to_ccy, as_of.strftime("%Y-%m"))
+    if key in cache:
+        return cache[key]
+
+    end = period_end(as_of)
+    rate = _latest_rate(db, company_id, from_ccy, to_ccy, end)
+    if rate:
+        rates = (rate.closing_rate, rate.average_rate)
+    else:
+        inverse = _latest_rate(db, company_id, to_ccy, from_ccy, end)
+        if not inverse or not inverse.closing_rate or not inverse.average_rate:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No FX rate available for {from_ccy}/{to_ccy} on or before {end.isoformat()}",
+            )
+        rates = (1 / inverse.closing_rate, 1 / inverse.average_rate)
+
+    cache[key] = rates
+    return rates
+
+
+def _net_amounts(debit, credit, balance):
+    """Debit-positive amounts, taken from the balance column where no debit/credit was given."""
+    return np.where((debit != 0) | (credit != 0), debit - credit, balance)
+
+
+def translate_balances(balances: dict, closing_rate: float, average_rate: float) -> dict:
+    """Translate an aggregated balances dict, converting all amounts as one array.
+
+    P&L lines at the average rate and the rest at the closing rate no longer
+    net to the closing-rate total; the difference goes to a translation
+    reserve line in equity so the translated trial balance still balances.
+    """
+    if not balances or (closing_rate == 1.0 and average_rate == 1.0):
+        return balances
+
+    keys = list(balances)
+    categories = np.array([balances[k]["category"] for k in keys])
+    amounts = np.array([[balances[k]["debit"], balances[k]["credit"], balances[k]["balance"]] for k in keys], dtype=float)
+    rates = np.where(np.isin(categories, PNL_CATEGORIES), average_rate, closing_rate)
+    translated = amounts * rates[:, None]
+
+    result = {}
+    for i, key in enumerate(keys):
+        result[key] = {
+            **balances[key],
+            "debit": float(translated[i, 0]),
+            "credit": float(translated[i, 1]),
+            "balance": float(translated[i, 2]),
+            "roles": {
+                role: {name: value * float(rates[i]) for name, value in amounts.items()}
+                for role, amounts in balances[key].get("roles", {}).items()
+            },
+        }
+
+    is_pnl = np.isin(categories, PNL_CATEGORIES)
+    net = _net_amounts(amounts[:, 0], amounts[:, 1], amounts[:, 2])
+    reserve = float((net[is_pnl] * (closing_rate - average_rate)).sum())
+    if round(reserve, 2):
+        line = result.setdefault(TRANSLATION_RESERVE_LINE, {
+            "fs_line": TRANSLATION_RESERVE_LINE, "category": "Equity", "sub_category": "Equity",
+            "normal_balance": "credit", "debit": 0.0, "credit": 0.0, "balance": 0.0, "roles": {},
+        })
+        line["debit"] += max(reserve, 0.0)
+        line["credit"] += max(-reserve, 0.0)
+        line["balance"] += reserve
+    return result
+
+
+def translate_frame(db: Session, df: pd.DataFrame, currencies: dict, to_ccy: str, as_of: date | None = None,
+                    rates_company_id: int | None = None) -> pd.DataFrame:
+    """Translate a multi-entity balance frame into one currency.
+
+    currencies maps company_id -> functional currency. Rates come from
+    rates_company_id's table (the reporting entity), are looked up once per
+    currency and joined onto the frame, so amounts are converted column-wise.
+    Each entity gets a translation reserve row, as in translate_balances.
+    """
+    if df.empty:
+        return df
+
+    rate_rows = [
+        (company_id, *get_rates(db, ccy, to_ccy, as_of, rates_company_id))
+        for company_id, ccy in currencies.items()
+    ]
+    rates = pd.DataFrame(rate_rows, columns=["company_id", "closing_rate", "average_rate"])
+    joined = df.merge(rates, on="company_id", how="left")
+    rate = np.where(
+        joined["category"].isin(PNL_CATEGORIES),
+        joined["average_rate"].fillna(1.0),
+        joined["closing_rate"].fillna(1.0),
+    )
+    net = _net_amounts(joined["debit"], joined["credit"], joined["balance"])
+    spread = joined["closing_rate"].fillna(1.0) - joined["average_rate"].fillna(1.0)
+    reserves = (net * spread).where(joined["category"].isin(PNL_CATEGORIES), 0.0).groupby(joined["company_id"]).sum()
+
+    amount_columns = ["debit", "credit", "balance"]
+    joined[amount_columns] = joined[amount_columns].mul(rate, axis=0)
+    joined = joined.drop(columns=["closing_rate", "average_rate"])
+
+    reserve_rows = [
+        {
+            "company_id": company_id, "source_code": None, "code": TRANSLATION_RESERVE_CODE,
+            "name": TRANSLATION_RESERVE_LINE, "category": "Equity", "sub_category": "Equity",
+            "fs_line": TRANSLATION_RESERVE_LINE, "normal_balance": "credit",
+            "debit": max(reserve, 0.0), "credit": max(-reserve, 0.0), "balance": reserve,
+        }
+        for company_id, reserve in reserves.items() if round(reserve, 2)
+    ]
+    if reserve_rows:
+        joined = pd.concat([joined, pd.DataFrame(reserve_rows).reindex(columns=joined.columns)], ignore_index=True)
+    return joined
+
+
+def company_currency(db: Session, company_id: int) -> str:
+    company = db.query(Company).filter(Company.id == company_id).first()
+    return company.currency if company and company.currency else "AED"
+
+
+def upsert_rate(db: Session, company_id: int | None, from_ccy: str, to_ccy: str, rate_date: date,
+                closing_rate: float, average_rate: float) -> FxRate:
+    """Create or update a company's rates (shared rates when company_id is None) for a currency pair and period."""
+    from_ccy = from_ccy.upper()
+    to_ccy = to_ccy.upper()
+    rate = db.query(FxRate).filter(
+        FxRate.company_id.is_(None) if company_id is None else FxRate.company_id == company_id,
+        FxRate.from_currency == from_ccy,
+        FxRate.to_currency == to_ccy,
+        FxRate.rate_date == rate_date,
+    ).first()
+    if not rate:
+        rate = FxRate(company_id=company_id, from_currency=from_ccy, to_currency=to_ccy, rate_date=rate_date)
+        db.add(rate)
+    rate.closing_rate = closing_rate
+    rate.average_rate = average_rate
+    db.commit()
+    db.refresh(rate)
+    if company_id is None:
+        bump_version(db, FX_SCOPE)  # every company's reports may use it
+    else:
+        bump_company_version(db, company_id)
+    return rate
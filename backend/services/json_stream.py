@@ -0,0 +1,93 @@
+import json
+
+
+class JsonSectionParser:
+    """Incrementally parse a streamed JSON object, releasing each top-level member as soon as its value is complete.
+
+    Text before the opening brace (a markdown fence, a preamble) is ignored.
+    Feed chunks as they arrive; feed() returns the (key, value) pairs
+    completed by that chunk. sections holds everything parsed so far.
+    """
+
+    def __init__(self):
+        self.sections: dict = {}
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key, colon, value or comma, for the top-level object
+        self._key = None
+        self._token_start = None
+
+    def feed(self, text: str) -> list[tuple[str, object]]:
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            if self.complete:
+                break
+            ch = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == "key":
+                            self._key = json.loads(buffer[self._token_start:i + 1])
+                            self._token_start = None
+                            self._expect = "colon"
+                        elif self._expect == "value":
+                            self._finish(buffer[self._token_start:i + 1], completed)
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect in ("key", "value"):
+                    self._token_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._token_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._token_start is not None:
+                    self._finish(buffer[self._token_start:i + 1], completed)
+                elif self._depth == 0:
+                    if self._token_start is not None:
+                        self._finish(buffer[self._token_start:i], completed)
+                    self.complete = True
+            elif self._depth == 1:
+                if ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif ch == ",":
+                    if self._token_start is not None:
+                        self._finish(buffer[self._token_start:i], completed)
+                    self._expect = "key"
+                elif not ch.isspace() and self._expect == "value" and self._token_start is None:
+                    self._token_start = i  # number, true, false or null
+
+        self._pos = len(buffer)
+        return completed
+
+    def _finish(self, raw: str, completed: list):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = None
+        else:
+            self.sections[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+        self._token_start = None
+        self._expect = "comma"
@@ -0,0 +1,56 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed keyword list.
+
+    Finds every occurrence of every keyword in one pass over the text, however
+    many keywords there are. Keywords are identified by their index in the
+    list the automaton was built from.
+    """
+    __slots__ = ("keywords", "_goto", "_fail", "_output")
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = list(keywords)
+        self._goto: list[dict] = [{}]
+        self._output: list[list[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(index)
+
+        # Breadth-first failure links; each state also emits its fallback's keywords
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find_all(self, text: str) -> list[tuple[int, int]]:
+        """All (keyword index, start position) matches in text."""
+        matches = []
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                matches.append((index, position - len(self.keywords[index]) + 1))
+        return matches
+
+    def matched(self, text: str) -> set[int]:
+        """Indexes of the keywords occurring anywhere in text."""
+        return {index for index, _ in self.find_all(text)}
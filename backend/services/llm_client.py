@@ -0,0 +1,175 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+import httpx
+from config import get_settings
+from services.quantile_sketch import TDigest
+
+settings = get_settings()
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client: httpx.AsyncClient | None = None
+_semaphore: asyncio.Semaphore | None = None
+_metrics = {
+    "requests": 0,
+    "succeeded": 0,
+    "failed": 0,
+    "retries": 0,
+    "in_flight": 0,
+    "errors": {},  # "status:429", "ReadTimeout", ... -> count
+}
+_latency = TDigest()
+
+
+class LLMError(Exception):
+    """The provider could not be reached or kept failing after retries."""
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    """The application-lifetime provider client: pooled keep-alive connections, HTTP/2 when h2 is installed."""
+    global _client, _semaphore
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=settings.AI_HTTP2 and HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(settings.AI_TIMEOUT_SECONDS, connect=10),
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.AI_MAX_CONCURRENCY,
+                keepalive_expiry=60,
+            ),
+            headers={
+                "Authorization": f"Bearer {settings.AI_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _backoff(attempt: int, response: httpx.Response | None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After."""
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), settings.AI_RETRY_MAX_SECONDS)
+    return random.uniform(0, min(settings.AI_RETRY_MAX_SECONDS, settings.AI_RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _record_error(kind: str):
+    _metrics["errors"][kind] = _metrics["errors"].get(kind, 0) + 1
+
+
+@asynccontextmanager
+async def _send(body: dict, stream: bool):
+    """Send one completion request under the concurrency limit, retrying 429/5xx and transport errors.
+
+    Yields the open response with a 2xx status. Only the connection attempt is
+    retried; a response that fails after it has been handed out is not.
+    """
+    get_llm_client()
+    async with _semaphore:
+        async with _send_acquired(body, stream) as response:
+            yield response
+
+
+@asynccontextmanager
+async def _send_acquired(body: dict, stream: bool):
+    """_send for a caller that already holds a concurrency slot."""
+    client = get_llm_client()
+    _metrics["requests"] += 1
+    _metrics["in_flight"] += 1
+    start = time.perf_counter()
+    try:
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            response = None
+            try:
+                request = client.build_request("POST", settings.AI_API_URL, json=body)
+                response = await client.send(request, stream=stream)
+                if response.status_code < 400:
+                    break
+                kind = f"status:{response.status_code}"
+                retryable = response.status_code in RETRY_STATUSES
+                await response.aclose()
+            except httpx.TransportError as e:
+                kind, retryable = type(e).__name__, True
+            _record_error(kind)
+            if not retryable or attempt == settings.AI_MAX_RETRIES:
+                _metrics["failed"] += 1
+                raise LLMError(f"LLM request failed after {attempt + 1} attempt(s): {kind}")
+            _metrics["retries"] += 1
+            await asyncio.sleep(_backoff(attempt, response))
+
+        try:
+            yield response
+        except Exception:
+            _metrics["failed"] += 1
+            raise
+        else:
+            _metrics["succeeded"] += 1
+            _latency.add((time.perf_counter() - start) * 1000)
+        finally:
+            await response.aclose()
+    finally:
+        _metrics["in_flight"] -= 1
+
+
+async def _read_completion(body: dict) -> dict:
+    async with _send_acquired(body, stream=False) as response:
+        await response.aread()
+        return response.json()
+
+
+async def post_completion(body: dict, timeout: float | None = None) -> dict:
+    """POST a chat completion and return the decoded JSON response.
+
+    timeout bounds the call (retries included) from when it gets one of the
+    AI_MAX_CONCURRENCY slots, so time spent queued behind other calls doesn't
+    count against it. Raises asyncio.TimeoutError when it runs out.
+    """
+    get_llm_client()
+    async with _semaphore:
+        try:
+            return await asyncio.wait_for(_read_completion(body), timeout)
+        except asyncio.TimeoutError:
+            _record_error("timeout")
+            _metrics["failed"] += 1
+            raise
+
+
+@asynccontextmanager
+async def stream_completion(body: dict):
+    """Open a streaming chat completion; the caller reads the SSE lines from the yielded response."""
+    async with _send({**body, "stream": True}, stream=True) as response:
+        yield response
+
+
+def get_llm_metrics() -> dict:
+    """Request counts, error kinds and latency percentiles (ms) for provider calls since startup."""
+    count = _latency.count
+    return {
+        **_metrics,
+        "errors": dict(_metrics["errors"]),
+        "max_concurrency": settings.AI_MAX_CONCURRENCY,
+        "http2": settings.AI_HTTP2 and HTTP2_AVAILABLE,
+        "latency_ms": {
+            "count": count,
+            "p50": round(_latency.quantile(0.5), 1) if count else None,
+            "p95": round(_latency.quantile(0.95), 1) if count else None,
+            "p99": round(_latency.quantile(0.99), 1) if count else None,
+        },
+    }
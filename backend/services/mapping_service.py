@@ -1,12 +1,29 @@
-import json
+import math
+import multiprocessing
 import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 from difflib import SequenceMatcher
+from fastapi import HTTPException
+from sqlalchemy import Integer, and_, case, column, delete, exists, func, or_, select, tuple_, update, values
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from models.account import MasterAccount, AccountMapping
+from models.account import AccountMapping, MappingMemory, MappingMemoryCompany
 from models.financial_data import TrialBalanceEntry
+from services.account_matcher import AccountMatcher, get_account_matcher
+from services.keyword_automaton import KeywordAutomaton
+from services.master_chart import MasterRecord, get_master_chart
+from config import get_settings
 
+settings = get_settings()
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+AUTO_MAP_MIN_CHUNK = 250
+AUTO_MAP_MIN_CONFIDENCE = 0.35  # matches below this are left unmapped for review
+MEMORY_LOOKUP_BATCH = 500
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
 
 # Keyword-based mapping rules for auto-mapping
 TYPE_TO_CATEGORY = {
@@ -61,24 +78,16 @@ TYPE_TO_CATEGORY = {
     "expense": {"category": "Expense", "sub_category": "Operating Expense", "codes": ["8100"]},
 }
 
+KEYWORD_AUTOMATON = KeywordAutomaton(list(TYPE_TO_CATEGORY))
 
-def load_master_accounts(db: Session):
-    """Load IFRS master chart of accounts into database if not already loaded."""
-    existing = db.query(MasterAccount).count()
-    if existing > 0:
-        return
-
-    json_path = os.path.join(DATA_DIR, "ifrs_chart_of_accounts.json")
-    with open(json_path, "r") as f:
-        accounts = json.load(f)
-
-    for acc in accounts:
-        db.add(MasterAccount(**acc))
-    db.commit()
 
+def find_best_match(name: str, source_type: str, master_accounts: list[MasterRecord],
+                    matcher: AccountMatcher | None = None) -> tuple:
+    """Find the best matching master account using fuzzy matching and type hints.
 
-def find_best_match(name: str, source_type: str, master_accounts: list[MasterAccount]) -> tuple:
-    """Find the best matching master account using fuzzy matching and type hints."""
+    With a matcher only its retrieved candidates are fuzzy-scored; without one
+    every master account is (the exhaustive reference behaviour).
+    """
     name_lower = name.lower().strip()
     type_lower = (source_type or "").lower().strip()
 
@@ -86,19 +95,26 @@ def find_best_match(name: str, source_type: str, master_accounts: list[MasterAcc
     best_codes = None
     best_score = 0.0
 
-    # Check type-based mapping first
-    for keyword, mapping in TYPE_TO_CATEGORY.items():
-        if keyword in type_lower or keyword in name_lower:
-            score = len(keyword) / max(len(name_lower), len(type_lower), 1)
-            if score > best_score or (keyword in type_lower and score >= best_score * 0.8):
-                best_codes = mapping["codes"]
-                best_score = max(score, 0.5)
+    # Check type-based mapping first. One automaton pass per text finds every
+    # keyword; they are then scored in rule order exactly as a full scan would.
+    in_type = KEYWORD_AUTOMATON.matched(type_lower) if type_lower else set()
+    for index in sorted(in_type | KEYWORD_AUTOMATON.matched(name_lower)):
+        keyword = KEYWORD_AUTOMATON.keywords[index]
+        score = len(keyword) / max(len(name_lower), len(type_lower), 1)
+        if score > best_score or (index in in_type and score >= best_score * 0.8):
+            best_codes = TYPE_TO_CATEGORY[keyword]["codes"]
+            best_score = max(score, 0.5)
 
     # Step 2: Fuzzy name matching against master accounts
     best_master = None
     best_fuzzy = 0.0
 
-    for master in master_accounts:
+    # With a matcher, only fine-score the retrieved candidates instead of the whole chart
+    candidates = master_accounts
+    if matcher is not None:
+        candidates = [master_accounts[i] for i in matcher.candidates(name_lower, type_lower, best_codes)]
+
+    for master in candidates:
         # Direct name similarity
         ratio = SequenceMatcher(None, name_lower, master.name.lower()).ratio()
 
@@ -127,56 +143,87 @@ def find_best_match(name: str, source_type: str, master_accounts: list[MasterAcc
 
 
 def auto_map_accounts(db: Session, company_id: int) -> dict:
-    """Auto-map uploaded company accounts to IFRS master chart."""
-    load_master_accounts(db)
-
-    master_accounts = db.query(MasterAccount).all()
-
-    # Get unique accounts from trial balance
-    tb_entries = db.query(
+    """Auto-map uploaded company accounts to IFRS master chart.
+
+    Only new source codes and previously unmatched ones are processed. Large
+    batches are matched across a process pool (see match_accounts) and the
+    results written back as one bulk insert plus one bulk update.
+    """
+    chart = get_master_chart(db)
+    master_accounts = list(chart.records)
+    masters_by_id = chart.by_id
+
+    # Only codes never seen before need reading from the trial balance: an
+    # anti-join against account_mappings (every processed code has a row,
+    # mapped or not) keeps re-runs proportional to the new accounts.
+    new_accounts = db.query(
         TrialBalanceEntry.account_code,
-        TrialBalanceEntry.account_name
+        func.min(TrialBalanceEntry.account_name),
     ).filter(
-        TrialBalanceEntry.company_id == company_id
-    ).distinct().all()
-
-    # Also check existing mappings
+        TrialBalanceEntry.company_id == company_id,
+        ~exists().where(
+            (AccountMapping.company_id == TrialBalanceEntry.company_id) &
+            (AccountMapping.source_code == TrialBalanceEntry.account_code)
+        ),
+    ).group_by(TrialBalanceEntry.account_code).order_by(TrialBalanceEntry.account_code).all()
+
+    # Codes processed before but left unmapped are retried (the chart, matcher or memory may have improved)
     existing_mappings = {
         m.source_code: m for m in
-        db.query(AccountMapping).filter(AccountMapping.company_id == company_id).all()
+        db.query(AccountMapping).filter(
+            AccountMapping.company_id == company_id,
+            or_(AccountMapping.is_mapped == False, AccountMapping.is_mapped == None),
+        ).order_by(AccountMapping.source_code).all()
     }
-
-    mapped = 0
+    mapped_before = db.query(func.count(AccountMapping.id)).filter(
+        AccountMapping.company_id == company_id,
+        AccountMapping.is_mapped == True,
+    ).scalar()
+
+    pending = [(code, m.source_name, m.source_type or "") for code, m in existing_mappings.items()]
+    pending += [(code, name, "") for code, name in new_accounts]
+
+    # Names already mapped by hand (at any company) skip fuzzy matching
+    remembered = {
+        key: master_id
+        for key, master_id in recall_mappings(db, [(name, source_type) for _, name, source_type in pending]).items()
+        if master_id in masters_by_id
+    }
+    novel = [row for row in pending if (row[1], row[2]) not in remembered]
+    matches = match_accounts(company_id, novel, master_accounts)
+    matches.update({
+        code: (remembered[(name, source_type)], 1.0)
+        for code, name, source_type in pending if (name, source_type) in remembered
+    })
+
+    mapped = mapped_before
     unmapped = 0
     results = []
-
-    for code, name in tb_entries:
-        if code in existing_mappings and existing_mappings[code].is_mapped:
-            mapped += 1
-            continue
-
-        # Get source type from existing mapping if available
-        source_type = existing_mappings[code].source_type if code in existing_mappings else ""
-
-        best_master, confidence = find_best_match(name, source_type, master_accounts)
-
-        if best_master and confidence >= 0.35:
+    new_rows = []
+    updated_rows = []
+
+    for code, name, source_type in pending:
+        master_id, confidence = matches[code]
+        mapped_by = "memory" if (name, source_type) in remembered else "auto"
+        if master_id is not None and confidence >= AUTO_MAP_MIN_CONFIDENCE:
+            best_master = masters_by_id[master_id]
             if code in existing_mappings:
-                mapping = existing_mappings[code]
-                mapping.master_account_id = best_master.id
-                mapping.is_mapped = True
-                mapping.mapped_by = "auto"
+                updated_rows.append({
+                    "id": existing_mappings[code].id,
+                    "master_account_id": master_id,
+                    "is_mapped": True,
+                    "mapped_by": mapped_by,
+                })
             else:
-                mapping = AccountMapping(
-                    company_id=company_id,
-                    source_code=code,
-                    source_name=name,
-                    source_type=source_type,
-                    master_account_id=best_master.id,
-                    is_mapped=True,
-                    mapped_by="auto",
-                )
-                db.add(mapping)
+                new_rows.append({
+                    "company_id": company_id,
+                    "source_code": code,
+                    "source_name": name,
+                    "source_type": source_type,
+                    "master_account_id": master_id,
+                    "is_mapped": True,
+                    "mapped_by": mapped_by,
+                })
             mapped += 1
             results.append({
                 "source_code": code,
@@ -187,14 +234,13 @@ def auto_map_accounts(db: Session, company_id: int) -> dict:
             })
         else:
             if code not in existing_mappings:
-                mapping = AccountMapping(
-                    company_id=company_id,
-                    source_code=code,
-                    source_name=name,
-                    source_type=source_type,
-                    is_mapped=False,
-                )
-                db.add(mapping)
+                new_rows.append({
+                    "company_id": company_id,
+                    "source_code": code,
+                    "source_name": name,
+                    "source_type": source_type,
+                    "is_mapped": False,
+                })
             unmapped += 1
             results.append({
                 "source_code": code,
@@ -203,56 +249,436 @@ def auto_map_accounts(db: Session, company_id: int) -> dict:
                 "confidence": 0,
             })
 
+    if new_rows:
+        db.bulk_insert_mappings(AccountMapping, new_rows)
+    if updated_rows:
+        db.bulk_update_mappings(AccountMapping, updated_rows)
     db.commit()
 
     return {
-        "total": len(tb_entries),
+        "total": mapped_before + len(pending),
         "mapped": mapped,
         "unmapped": unmapped,
         "results": results,
     }
 
 
-def manual_map_account(db: Session, mapping_id: int, master_account_id: int) -> AccountMapping:
-    """Manually map an account to a master account."""
-    mapping = db.query(AccountMapping).filter(AccountMapping.id == mapping_id).first()
+# Parallel matching. Worker processes are spawned once per master chart and
+# keep its immutable records with an AccountMatcher between runs.
+_pool: dict = {"key": None, "executor": None}
+_pool_lock = threading.Lock()
+_worker: dict = {}
+_progress: dict[int, dict] = {}
+
+
+def _init_worker(master_accounts: list):
+    _worker["masters"] = master_accounts
+    _worker["matcher"] = AccountMatcher(master_accounts)
+
+
+def _match_chunk(chunk: list, master_accounts: list | None = None, matcher: AccountMatcher | None = None) -> list:
+    """Match (code, name, source_type) rows, returning (code, master_id, confidence)."""
+    master_accounts = master_accounts or _worker["masters"]
+    matcher = matcher or _worker["matcher"]
+    matches = []
+    for code, name, source_type in chunk:
+        master, confidence = find_best_match(name, source_type, master_accounts, matcher)
+        matches.append((code, master.id if master else None, confidence))
+    return matches
+
+
+def _get_pool(master_accounts: list, workers: int) -> ProcessPoolExecutor:
+    key = (tuple(master_accounts), workers)
+    with _pool_lock:
+        if _pool["key"] != key:
+            if _pool["executor"]:
+                _pool["executor"].shutdown(wait=False, cancel_futures=True)
+            _pool["executor"] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(master_accounts,),
+            )
+            _pool["key"] = key
+        return _pool["executor"]
+
+
+def shutdown_mapping_pool():
+    with _pool_lock:
+        if _pool["executor"]:
+            _pool["executor"].shutdown(wait=False, cancel_futures=True)
+        _pool["key"] = _pool["executor"] = None
+
+
+def match_accounts(company_id: int, accounts: list, master_accounts: list) -> dict:
+    """Find the best master account for each (code, name, source_type).
+
+    Returns {code: (master_id or None, confidence)}. Charts with at least
+    AUTO_MAP_PARALLEL_THRESHOLD accounts are partitioned across a process pool;
+    smaller ones are matched in-process. Progress is published for get_auto_map_progress.
+    """
+    workers = settings.AUTO_MAP_WORKERS or os.cpu_count() or 1
+    parallel = workers > 1 and len(accounts) >= settings.AUTO_MAP_PARALLEL_THRESHOLD
+    chunk_size = max(AUTO_MAP_MIN_CHUNK, math.ceil(len(accounts) / (workers * 4))) if parallel else AUTO_MAP_MIN_CHUNK
+    chunks = [accounts[i:i + chunk_size] for i in range(0, len(accounts), chunk_size)]
+
+    progress = _progress[company_id] = {
+        "status": "running",
+        "total": len(accounts),
+        "processed": 0,
+        "workers": workers if parallel else 1,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "finished_at": None,
+    }
+    matches = {}
+    try:
+        if parallel:
+            pool = _get_pool(master_accounts, workers)
+            for future in as_completed([pool.submit(_match_chunk, chunk) for chunk in chunks]):
+                part = future.result()
+                matches.update((code, (master_id, confidence)) for code, master_id, confidence in part)
+                progress["processed"] += len(part)
+        else:
+            matcher = get_account_matcher(master_accounts)
+            for chunk in chunks:
+                part = _match_chunk(chunk, master_accounts, matcher)
+                matches.update((code, (master_id, confidence)) for code, master_id, confidence in part)
+                progress["processed"] += len(part)
+    except Exception:
+        progress["status"] = "failed"
+        raise
+    finally:
+        progress["finished_at"] = datetime.now(timezone.utc).isoformat()
+
+    progress["status"] = "completed"
+    return matches
+
+
+def get_auto_map_progress(company_id: int) -> dict | None:
+    """Progress of the company's latest auto-map run in this process, if any."""
+    return _progress.get(company_id)
+
+
+def manual_map_account(db: Session, company_id: int, mapping_id: int, master_account_id: int) -> AccountMapping:
+    """Manually map one of a company's accounts to a master account, teaching the shared mapping memory.
+
+    Raises ValueError for an unknown master account; returns None when the
+    mapping doesn't belong to the company.
+    """
+    if master_account_id not in get_master_chart(db).by_id:
+        raise ValueError(f"Unknown master account id: {master_account_id}")
+    mapping = db.query(AccountMapping).filter(
+        AccountMapping.id == mapping_id,
+        AccountMapping.company_id == company_id,
+    ).first()
     if not mapping:
         return None
 
+    previous = (mapping.master_account_id, mapping.mapped_by)
     mapping.master_account_id = master_account_id
     mapping.is_mapped = True
     mapping.mapped_by = "manual"
+    db.flush()
+    update_mapping_votes(db, company_id, [(mapping.source_name, mapping.source_type, *previous, master_account_id)])
     db.commit()
     db.refresh(mapping)
     return mapping
 
 
+def batch_manual_map(db: Session, company_id: int, pairs: list[tuple[int, int]]) -> list[tuple[str, int]]:
+    """Manually map many of a company's accounts in one transaction.
+
+    pairs are (mapping_id, master_account_id); a repeated mapping_id keeps its
+    last master. Raises ValueError for unknown master accounts and LookupError
+    for mappings that don't belong to the company. Returns the applied
+    (source_code, master_account_id) remaps.
+    """
+    assignments = dict(pairs)
+    masters = get_master_chart(db).by_id
+    unknown_masters = sorted({m for m in assignments.values() if m not in masters})
+    if unknown_masters:
+        raise ValueError(f"Unknown master account id(s): {', '.join(map(str, unknown_masters))}")
+
+    mappings = db.query(
+        AccountMapping.id, AccountMapping.source_code, AccountMapping.source_name, AccountMapping.source_type,
+        AccountMapping.master_account_id, AccountMapping.mapped_by,
+    ).filter(
+        AccountMapping.company_id == company_id,
+        AccountMapping.id.in_(list(assignments)),
+    ).all()
+    missing = sorted(set(assignments) - {m.id for m in mappings})
+    if missing:
+        raise LookupError(f"Mapping(s) not found: {', '.join(map(str, missing))}")
+
+    now = datetime.now(timezone.utc)
+    if db.get_bind().dialect.name == "postgresql":
+        # One UPDATE ... FROM (VALUES ...) statement joining the new masters by id
+        rows = values(column("id", Integer), column("master_account_id", Integer), name="v").data(list(assignments.items()))
+        db.execute(
+            update(AccountMapping)
+            .where(AccountMapping.id == rows.c.id, AccountMapping.company_id == company_id)
+            .values(master_account_id=rows.c.master_account_id, is_mapped=True, mapped_by="manual", updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        db.execute(update(AccountMapping), [
+            {"id": mapping_id, "master_account_id": master_id, "is_mapped": True, "mapped_by": "manual", "updated_at": now}
+            for mapping_id, master_id in assignments.items()
+        ])
+
+    update_mapping_votes(db, company_id, [
+        (m.source_name, m.source_type, m.master_account_id, m.mapped_by, assignments[m.id]) for m in mappings
+    ])
+    db.commit()
+    return [(m.source_code, assignments[m.id]) for m in mappings]
+
+
+def memory_key(name: str | None, source_type: str | None) -> tuple[str, str]:
+    """Normalize a source account name and type for the mapping memory (case, punctuation, spacing)."""
+    return (
+        _NON_ALNUM.sub(" ", (name or "").lower()).strip(),
+        _NON_ALNUM.sub(" ", (source_type or "").lower()).strip(),
+    )
+
+
+def _upsert(db: Session):
+    """The dialect's INSERT with ON CONFLICT support (PostgreSQL in production, SQLite locally)."""
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _vote_counts(votes) -> dict[tuple[str, str, int], int]:
+    counts: dict[tuple[str, str, int], int] = {}
+    for name, source_type, master_account_id in votes:
+        name_key, type_key = memory_key(name, source_type)
+        if name_key:
+            key = (name_key, type_key, master_account_id)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def update_mapping_votes(db: Session, company_id: int, changes: list[tuple]):
+    """Move a company's memory votes after manual mappings change.
+
+    changes are (name, source_type, previous_master_id, previous_mapped_by,
+    new_master_id), read before the mappings were updated. A vote the company
+    cast for a previous manual mapping is retracted; re-confirming the same
+    master casts no new vote. The caller has flushed the new mappings and commits.
+    """
+    retracted = [(name, source_type, old) for name, source_type, old, mapped_by, new in changes
+                 if mapped_by == "manual" and old is not None and old != new]
+    cast = [(name, source_type, new) for name, source_type, old, mapped_by, new in changes
+            if not (mapped_by == "manual" and old == new)]
+    retract_mapping_votes(db, company_id, retracted)
+    record_mapping_votes(db, company_id, cast)
+
+
+def record_mapping_votes(db: Session, company_id: int, votes: list[tuple[str, str | None, int]]):
+    """Add one vote per (name, source_type, master_account_id) from a company. The caller commits.
+
+    Votes are added with one INSERT ... ON CONFLICT DO UPDATE SET votes = votes + n,
+    so concurrent auto-maps and manual mappings neither lose votes nor create
+    duplicate entries. The company is recorded against each entry once
+    (ON CONFLICT DO NOTHING), however often it votes.
+    """
+    counts = _vote_counts(votes)
+    if not counts:
+        return
+
+    insert = _upsert(db)
+    memory = MappingMemory.__table__
+    now = datetime.now(timezone.utc)
+    statement = insert(memory).values([
+        {"name_key": name_key, "type_key": type_key, "master_account_id": master_id, "votes": count, "updated_at": now}
+        for (name_key, type_key, master_id), count in counts.items()
+    ])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["name_key", "type_key", "master_account_id"],
+        set_={"votes": func.coalesce(memory.c.votes, 0) + statement.excluded.votes, "updated_at": now},
+    ))
+
+    memory_ids = [memory_id for (memory_id,) in db.query(MappingMemory.id).filter(
+        tuple_(MappingMemory.name_key, MappingMemory.type_key, MappingMemory.master_account_id).in_(list(counts))
+    )]
+    statement = insert(MappingMemoryCompany.__table__).values([
+        {"memory_id": memory_id, "company_id": company_id, "created_at": now} for memory_id in memory_ids
+    ])
+    db.execute(statement.on_conflict_do_nothing(index_elements=["memory_id", "company_id"]))
+
+
+def retract_mapping_votes(db: Session, company_id: int, votes: list[tuple[str, str | None, int]]):
+    """Take back a company's votes for masters its accounts were manually moved away from. The caller commits.
+
+    Each vote is decremented atomically (never below zero). The company stays
+    associated with an entry only while another of its manual mappings still
+    backs it.
+    """
+    counts = _vote_counts(votes)
+    if not counts:
+        return
+
+    memory = MappingMemory.__table__
+    for (name_key, type_key, master_id), count in counts.items():
+        db.execute(update(memory).where(
+            memory.c.name_key == name_key, memory.c.type_key == type_key, memory.c.master_account_id == master_id,
+        ).values(votes=case((memory.c.votes > count, memory.c.votes - count), else_=0)))
+
+    # Keys the company's remaining manual mappings still vote for
+    still_backed = set(_vote_counts(db.query(
+        AccountMapping.source_name, AccountMapping.source_type, AccountMapping.master_account_id,
+    ).filter(
+        AccountMapping.company_id == company_id,
+        AccountMapping.mapped_by == "manual",
+        AccountMapping.master_account_id.in_({master_id for _, _, master_id in counts}),
+    )))
+    dropped = [key for key in counts if key not in still_backed]
+    if dropped:
+        memory_ids = select(MappingMemory.id).where(
+            tuple_(MappingMemory.name_key, MappingMemory.type_key, MappingMemory.master_account_id).in_(dropped)
+        )
+        db.execute(delete(MappingMemoryCompany).where(
+            MappingMemoryCompany.company_id == company_id,
+            MappingMemoryCompany.memory_id.in_(memory_ids),
+        ))
+
+
+def recall_mappings(db: Session, accounts: list[tuple[str, str]]) -> dict:
+    """{(name, source_type): master_account_id} for accounts the memory has a clear winner for.
+
+    Votes are fetched for all keys in a few IN queries and resolved in a dict,
+    so each account costs one hash lookup. A key is only recalled when its top
+    master is backed by at least MAPPING_MEMORY_MIN_COMPANIES distinct companies
+    and MAPPING_MEMORY_MIN_VOTES votes, and by more companies than any other
+    master; masters are ranked by companies so one company's repeated votes
+    can't outweigh several others.
+    """
+    keys = {account: memory_key(*account) for account in accounts}
+    name_keys = sorted({name_key for name_key, _ in keys.values() if name_key})
+
+    votes: dict[tuple[str, str], list] = {}
+    for i in range(0, len(name_keys), MEMORY_LOOKUP_BATCH):
+        rows = db.query(
+            MappingMemory.name_key, MappingMemory.type_key, MappingMemory.master_account_id, MappingMemory.votes,
+            func.count(MappingMemoryCompany.id),
+        ).outerjoin(
+            MappingMemoryCompany, MappingMemoryCompany.memory_id == MappingMemory.id,
+        ).filter(
+            MappingMemory.name_key.in_(name_keys[i:i + MEMORY_LOOKUP_BATCH]),
+        ).group_by(MappingMemory.id).all()
+        for name_key, type_key, master_account_id, count, companies in rows:
+            votes.setdefault((name_key, type_key), []).append((companies, count or 0, master_account_id))
+
+    winners = {}
+    for key, candidates in votes.items():
+        candidates.sort(reverse=True)
+        top_companies, top_votes, master_account_id = candidates[0]
+        runner_up = candidates[1][0] if len(candidates) > 1 else 0
+        if (
+            top_companies >= settings.MAPPING_MEMORY_MIN_COMPANIES
+            and top_votes >= settings.MAPPING_MEMORY_MIN_VOTES
+            and top_companies > runner_up
+        ):
+            winners[key] = master_account_id
+
+    return {account: winners[key] for account, key in keys.items() if key in winners}
+
+
+def mapping_coverage(db: Session, company_id: int) -> float:
+    """Share of the company's distinct trial balance accounts that are mapped (0 when there are none)."""
+    codes = db.query(TrialBalanceEntry.account_code).filter(
+        TrialBalanceEntry.company_id == company_id
+    ).distinct().subquery()
+    total, mapped = db.query(
+        func.count(codes.c.account_code),
+        func.count(AccountMapping.id),
+    ).select_from(codes).outerjoin(
+        AccountMapping,
+        (AccountMapping.company_id == company_id) &
+        (AccountMapping.source_code == codes.c.account_code) &
+        (AccountMapping.is_mapped == True),
+    ).one()
+    return mapped / total if total else 0.0
+
+
 def get_mappings(db: Session, company_id: int) -> list:
     """Get all account mappings for a company."""
     mappings = db.query(AccountMapping).filter(
         AccountMapping.company_id == company_id
     ).all()
 
-    result = []
-    for m in mappings:
-        master_name = None
-        master_code = None
-        master_category = None
-        if m.master_account:
-            master_name = m.master_account.name
-            master_code = m.master_account.code
-            master_category = m.master_account.category
-
-        result.append({
-            "id": m.id,
-            "source_code": m.source_code,
-            "source_name": m.source_name,
-            "source_type": m.source_type,
-            "master_code": master_code,
-            "master_name": master_name,
-            "master_category": master_category,
-            "is_mapped": m.is_mapped,
-            "mapped_by": m.mapped_by,
-        })
-
-    return result
+    masters = get_master_chart(db).by_id
+    return [_mapping_row(m, masters) for m in mappings]
+
+
+def _mapping_row(m: AccountMapping, masters) -> dict:
+    master = masters.get(m.master_account_id)
+    return {
+        "id": m.id,
+        "source_code": m.source_code,
+        "source_name": m.source_name,
+        "source_type": m.source_type,
+        "master_code": master.code if master else None,
+        "master_name": master.name if master else None,
+        "master_category": master.category if master else None,
+        "is_mapped": m.is_mapped,
+        "mapped_by": m.mapped_by,
+    }
+
+
+def encode_mapping_cursor(m: AccountMapping) -> str:
+    return f"{m.id}_{m.source_code}"
+
+
+def decode_mapping_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        mapping_id, source_code = cursor.split("_", 1)
+        return source_code, int(mapping_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def list_mappings(db: Session, company_id: int, cursor: str | None = None, limit: int = 100,
+                  status: str | None = None, category: str | None = None,
+                  mapped_by: str | None = None, search: str | None = None) -> dict:
+    """Page through a company's mappings in source-code order with server-side filters.
+
+    Uses keyset pagination on (source_code, id). Master account details and the
+    category filter come from the cached master chart, so each page is one
+    query. The filtered total is only counted for the first page.
+    """
+    query = db.query(AccountMapping).filter(AccountMapping.company_id == company_id)
+    if status == "mapped":
+        query = query.filter(AccountMapping.is_mapped == True)
+    elif status == "unmapped":
+        query = query.filter(or_(AccountMapping.is_mapped == False, AccountMapping.is_mapped == None))
+    if category:
+        master_ids = [m.id for m in get_master_chart(db).by_category.get(category, ())]
+        query = query.filter(AccountMapping.is_mapped == True, AccountMapping.master_account_id.in_(master_ids))
+    if mapped_by:
+        query = query.filter(AccountMapping.mapped_by == mapped_by)
+    if search:
+        query = query.filter(or_(
+            AccountMapping.source_code.icontains(search, autoescape=True),
+            AccountMapping.source_name.icontains(search, autoescape=True),
+        ))
+
+    total = None
+    if not cursor:
+        total = query.with_entities(func.count(AccountMapping.id)).scalar()
+    else:
+        after_code, after_id = decode_mapping_cursor(cursor)
+        query = query.filter(or_(
+            AccountMapping.source_code > after_code,
+            and_(AccountMapping.source_code == after_code, AccountMapping.id > after_id),
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    mappings = query.order_by(AccountMapping.source_code, AccountMapping.id).limit(limit + 1).all()
+    has_more = len(mappings) > limit
+    mappings = mappings[:limit]
+
+    masters = get_master_chart(db).by_id
+    return {
+        "mappings": [_mapping_row(m, masters) for m in mappings],
+        "total": total,
+        "next_cursor": encode_mapping_cursor(mappings[-1]) if has_more else None,
+    }
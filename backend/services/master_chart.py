@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from sqlalchemy.orm import Session
+from models.account import MasterAccount
+from services.cache_service import MASTER_CHART_SCOPE, bump_version, get_versions
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+@dataclass(frozen=True, slots=True)
+class MasterRecord:
+    """Immutable copy of a master account, safe to share across requests and worker processes."""
+    id: int
+    code: str
+    name: str
+    category: str
+    sub_category: str | None
+    fs_line: str | None
+    normal_balance: str
+    ratio_roles: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class MasterChart:
+    """The master chart with lookup indexes and the serialized /master-accounts response."""
+    version: int
+    records: tuple  # ordered by id
+    by_id: MappingProxyType
+    by_code: MappingProxyType
+    by_category: MappingProxyType  # category -> tuple of records
+    by_fs_line: MappingProxyType  # fs_line (or name) -> tuple of records
+    master_accounts_json: bytes
+    etag: str
+
+
+_chart: MasterChart | None = None
+_chart_lock = threading.Lock()
+
+
+def _load_chart() -> list[dict]:
+    json_path = os.path.join(DATA_DIR, "ifrs_chart_of_accounts.json")
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def ratio_role_index() -> dict:
+    """{master account code: tuple of ratio roles} from the IFRS chart.
+
+    Roles name the ratio inputs an account feeds (cash, receivables, inventory,
+    payables, short_term_debt, interest_expense, depreciation_amortization).
+    """
+    return {acc["code"]: tuple(acc["ratio_roles"]) for acc in _load_chart() if acc.get("ratio_roles")}
+
+
+def load_master_accounts(db: Session):
+    """Load IFRS master chart of accounts into database if not already loaded."""
+    existing = db.query(MasterAccount).count()
+    if existing > 0:
+        return
+
+    for acc in _load_chart():
+        db.add(MasterAccount(**{k: v for k, v in acc.items() if k != "ratio_roles"}))
+    db.commit()
+    bump_version(db, MASTER_CHART_SCOPE)
+
+
+def _group(records, key) -> MappingProxyType:
+    groups: dict = {}
+    for record in records:
+        groups.setdefault(key(record), []).append(record)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+def build_master_chart(db: Session, version: int) -> MasterChart:
+    roles = ratio_role_index()
+    records = tuple(
+        MasterRecord(m.id, m.code, m.name, m.category, m.sub_category, m.fs_line, m.normal_balance or "debit",
+                     roles.get(m.code, ()))
+        for m in db.query(MasterAccount).order_by(MasterAccount.id).all()
+    )
+    payload = json.dumps(
+        [
+            {"id": r.id, "code": r.code, "name": r.name, "category": r.category, "sub_category": r.sub_category}
+            for r in sorted(records, key=lambda r: r.code)
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+    return MasterChart(
+        version=version,
+        records=records,
+        by_id=MappingProxyType({r.id: r for r in records}),
+        by_code=MappingProxyType({r.code: r for r in records}),
+        by_category=_group(records, lambda r: r.category),
+        by_fs_line=_group(records, lambda r: r.fs_line or r.name),
+        master_accounts_json=payload,
+        etag='"' + hashlib.sha256(payload).hexdigest()[:32] + '"',
+    )
+
+
+def get_master_chart(db: Session) -> MasterChart:
+    """The process-wide master chart, loading it on first use and rebuilding when its version changes."""
+    global _chart
+    version = get_versions(db, [MASTER_CHART_SCOPE])[MASTER_CHART_SCOPE]
+    chart = _chart
+    if chart is not None and chart.version == version:
+        return chart
+
+    with _chart_lock:
+        if _chart is None or _chart.version != version:
+            load_master_accounts(db)
+            version = get_versions(db, [MASTER_CHART_SCOPE])[MASTER_CHART_SCOPE]
+            _chart = build_master_chart(db, version)
+        return _chart
@@ -0,0 +1,142 @@
+import math
+
+
+class TDigest:
+    """Mergeable quantile sketch (merging t-digest).
+
+    Keeps at most a few times `compression` centroids regardless of how many
+    values are added, and answers quantile and CDF queries with highest
+    accuracy at the tails. Two digests can be merged without the raw data.
+    """
+    __slots__ = ("compression", "means", "weights", "total", "min", "max", "_buffer")
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[tuple[float, float]] = []
+
+    def add(self, value: float, weight: float = 1.0):
+        if value is None or math.isnan(value):
+            return
+        self._buffer.append((value, weight))
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def add_many(self, values):
+        for value in values:
+            self.add(float(value))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self._compress()
+        return self
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(w for _, w in points)
+        self.min = min(self.min, points[0][0])
+        self.max = max(self.max, points[-1][0])
+
+        means, weights = [], []
+        cumulative = 0.0
+        mean, weight = points[0]
+        for value, w in points[1:]:
+            q = (cumulative + (weight + w) / 2) / total
+            limit = max(1.0, 4 * total * q * (1 - q) / self.compression)
+            if weight + w <= limit:
+                mean += (value - mean) * w / (weight + w)
+                weight += w
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cumulative += weight
+                mean, weight = value, w
+        means.append(mean)
+        weights.append(weight)
+
+        self.means, self.weights, self.total = means, weights, total
+
+    @property
+    def count(self) -> int:
+        self._compress()
+        return int(round(self.total))
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0-1)."""
+        self._compress()
+        if not self.means:
+            return math.nan
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        target = q * self.total
+        cumulative = 0.0
+        for i, (mean, weight) in enumerate(zip(self.means, self.weights)):
+            if cumulative + weight >= target:
+                # Interpolate within the centroid towards its neighbours
+                lower = self.means[i - 1] if i > 0 else self.min
+                upper = self.means[i + 1] if i + 1 < len(self.means) else self.max
+                fraction = (target - cumulative) / weight
+                if fraction < 0.5:
+                    return mean - (mean - lower) * (0.5 - fraction) if i > 0 else lower + (mean - lower) * fraction * 2
+                return mean + (upper - mean) * (fraction - 0.5) if i + 1 < len(self.means) else mean + (upper - mean) * (fraction - 0.5) * 2
+            cumulative += weight
+        return self.max
+
+    def cdf(self, value: float) -> float:
+        """Estimated fraction of values at or below value."""
+        self._compress()
+        if not self.means:
+            return math.nan
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+
+        means, weights = self.means, self.weights
+        if value < means[0]:
+            span = means[0] - self.min
+            return (weights[0] / 2) * ((value - self.min) / span if span else 1.0) / self.total
+
+        cumulative = 0.0
+        for i in range(len(means) - 1):
+            if value < means[i + 1]:
+                span = means[i + 1] - means[i]
+                fraction = (value - means[i]) / span if span else 0.5
+                return (cumulative + weights[i] / 2 + fraction * (weights[i] + weights[i + 1]) / 2) / self.total
+            cumulative += weights[i]
+
+        span = self.max - means[-1]
+        fraction = (value - means[-1]) / span if span else 1.0
+        return (cumulative + weights[-1] / 2 + fraction * weights[-1] / 2) / self.total
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "min": self.min if self.means else None,
+            "max": self.max if self.means else None,
+            "centroids": [[round(m, 6), w] for m, w in zip(self.means, self.weights)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        digest = cls(data.get("compression", 100))
+        centroids = data.get("centroids") or []
+        digest.means = [m for m, _ in centroids]
+        digest.weights = [w for _, w in centroids]
+        digest.total = sum(digest.weights)
+        if centroids:
+            digest.min = data["min"]
+            digest.max = data["max"]
+        return digest
@@ -0,0 +1,290 @@
+import ast
+import json
+import math
+import os
+from functools import lru_cache
+import numpy as np
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# Inputs available to ratio expressions, extracted from the P&L and Balance Sheet
+INPUT_NAMES = [
+    "revenue", "cogs", "gross_profit", "operating_expenses", "operating_profit", "net_profit", "ebitda",
+    "total_current_assets", "total_non_current_assets", "total_assets",
+    "total_current_liabilities", "total_non_current_liabilities", "total_liabilities", "total_equity",
+    "inventory", "receivables", "payables", "cash", "short_term_debt", "interest_expense",
+]
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+_COMPARE_OPS = (ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq)
+_FUNCTIONS = {"abs": "_abs", "min": "_min", "max": "_max"}
+_ARITY = {"abs": 1, "min": 2, "max": 2}  # np.minimum/np.maximum take exactly two operands
+
+
+def safe_div(a, b):
+    return a / b if b != 0 else 0
+
+
+SCALAR_OPS = {
+    "_div": safe_div,
+    "_where": lambda cond, a, b: a if cond else b,
+    "_abs": abs,
+    "_min": min,
+    "_max": max,
+}
+
+
+def nan_safe_div(a, b):
+    """Element-wise division that yields NaN instead of raising or returning inf for a zero denominator."""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return np.divide(a, b, out=np.full(a.shape, np.nan), where=b != 0)
+
+
+VECTOR_OPS = {
+    "_div": nan_safe_div,
+    "_where": np.where,
+    "_abs": np.abs,
+    "_min": np.minimum,
+    "_max": np.maximum,
+}
+
+
+class _Compiler(ast.NodeTransformer):
+    """Validate a ratio expression and lower it onto the evaluation ops.
+
+    Division becomes _div and conditional expressions become _where, so the
+    same compiled code runs on scalars or on NumPy arrays depending on which
+    op implementations are supplied at evaluation time.
+    """
+
+    def __init__(self, known_names: set):
+        self.known_names = known_names
+        self.names = set()
+
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax in ratio expression: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError("Only numeric constants are allowed in ratio expressions")
+        if not math.isfinite(node.value):
+            raise ValueError("Numeric constants in ratio expressions must be finite")
+        return node
+
+    def visit_Name(self, node):
+        if node.id not in self.known_names:
+            raise ValueError(f"Unknown name in ratio expression: {node.id}")
+        self.names.add(node.id)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPS):
+            raise ValueError("Unsupported unary operator in ratio expression")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BIN_OPS):
+            raise ValueError("Only + - * / are allowed in ratio expressions")
+        left, right = self.visit(node.left), self.visit(node.right)
+        if isinstance(node.op, ast.Div):
+            return ast.Call(func=ast.Name(id="_div", ctx=ast.Load()), args=[left, right], keywords=[])
+        node.left, node.right = left, right
+        return node
+
+    def visit_Compare(self, node):
+        if len(node.ops) != 1 or not isinstance(node.ops[0], _COMPARE_OPS):
+            raise ValueError("Only single comparisons are allowed in ratio expressions")
+        node.left = self.visit(node.left)
+        node.comparators = [self.visit(node.comparators[0])]
+        return node
+
+    def visit_IfExp(self, node):
+        args = [self.visit(node.test), self.visit(node.body), self.visit(node.orelse)]
+        return ast.Call(func=ast.Name(id="_where", ctx=ast.Load()), args=args, keywords=[])
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise ValueError("Only abs(), min() and max() may be called in ratio expressions")
+        arity = _ARITY[node.func.id]
+        if len(node.args) != arity:
+            raise ValueError(f"{node.func.id}() takes exactly {arity} argument{'s' if arity > 1 else ''} in ratio expressions")
+        args = [self.visit(a) for a in node.args]
+        return ast.Call(func=ast.Name(id=_FUNCTIONS[node.func.id], ctx=ast.Load()), args=args, keywords=[])
+
+
+def compile_expression(expression: str, known_names: set):
+    """Parse and compile a ratio expression, returning (code object, names used)."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid ratio expression: {e.msg}")
+    compiler = _Compiler(known_names)
+    tree = ast.fix_missing_locations(compiler.visit(tree))
+    return compile(tree, f"<ratio: {expression}>", "eval"), compiler.names
+
+
+def expression_names(expression: str) -> set:
+    """Names referenced by a ratio expression."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError:
+        return set()
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+class CompiledRatio:
+    """A ratio definition with its expression compiled once."""
+    __slots__ = ("key", "category", "name", "formula", "expression", "unit", "benchmark",
+                 "direction", "good", "warning", "code", "names")
+
+    def __init__(self, definition: dict, known_names: set):
+        status = definition.get("status") or {}
+        self.key = definition["key"]
+        self.category = definition["category"]
+        self.name = definition["name"]
+        self.expression = definition["expression"]
+        self.formula = definition.get("formula") or self.expression
+        self.unit = definition.get("unit")
+        self.benchmark = definition.get("benchmark", "")
+        self.direction = status.get("direction", "higher")
+        self.good = status.get("good")
+        self.warning = status.get("warning")
+        if self.direction not in ("higher", "lower"):
+            raise ValueError("Status direction must be 'higher' or 'lower'")
+        self.code, self.names = compile_expression(self.expression, known_names)
+
+    def status(self, value: float) -> str | None:
+        if self.good is None:
+            return None
+        if self.direction == "higher":
+            if value >= self.good:
+                return "good"
+            if self.warning is None or value >= self.warning:
+                return "warning"
+        else:
+            if value <= self.good:
+                return "good"
+            if self.warning is None or value <= self.warning:
+                return "warning"
+        return "danger"
+
+    def status_array(self, values: np.ndarray) -> np.ndarray:
+        """Vectorised status for an array of values; NaN values get no status."""
+        statuses = np.full(values.shape, None, dtype=object)
+        if self.good is None:
+            return statuses
+        if self.direction == "higher":
+            good, warning = values >= self.good, values >= self.warning if self.warning is not None else None
+        else:
+            good, warning = values <= self.good, values <= self.warning if self.warning is not None else None
+        valid = ~np.isnan(values)
+        if warning is None:
+            warning = valid
+        statuses[valid] = np.select(
+            [good[valid], warning[valid]], ["good", "warning"], default="danger"
+        ).astype(object)
+        return statuses
+
+    def to_result(self, value: float) -> dict:
+        result = {"key": self.key, "name": self.name, "value": value}
+        if self.unit:
+            result["unit"] = self.unit
+        result["formula"] = self.formula
+        result["benchmark"] = self.benchmark
+        result["status"] = self.status(value)
+        return result
+
+
+def check_ratio_key(key: str, known_names: set):
+    """Ratio keys become expression names: no clashes, and no "_" prefix reserved for the evaluation ops."""
+    if key.startswith("_"):
+        raise ValueError(f"Ratio keys may not start with an underscore: {key}")
+    if key in known_names:
+        raise ValueError(f"Duplicate ratio or input name: {key}")
+
+
+class RatioEngine:
+    """Evaluates a set of compiled ratio definitions in one pass over an input vector.
+
+    Ratios are evaluated in definition order and each result is added to the
+    namespace, so later ratios (e.g. the cash conversion cycle) can build on
+    earlier ones.
+    """
+
+    def __init__(self, definitions: list[dict], categories: list[dict]):
+        self.categories = {c["key"]: c["title"] for c in categories}
+        self.ratios: list[CompiledRatio] = []
+        known_names = set(INPUT_NAMES)
+        for definition in definitions:
+            check_ratio_key(definition["key"], known_names)
+            self.ratios.append(CompiledRatio(definition, known_names))
+            known_names.add(definition["key"])
+        self.known_names = known_names
+
+    @classmethod
+    def from_file(cls, path: str) -> "RatioEngine":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data["ratios"], data["categories"])
+
+    def extend(self, definitions: list[dict], categories: list[dict] | None = None) -> "RatioEngine":
+        """Return a new engine with extra (e.g. tenant-specific) ratios appended."""
+        engine = RatioEngine.__new__(RatioEngine)
+        engine.categories = {**self.categories, **{c["key"]: c["title"] for c in categories or []}}
+        engine.ratios = list(self.ratios)
+        engine.known_names = set(self.known_names)
+        for definition in definitions:
+            check_ratio_key(definition["key"], engine.known_names)
+            engine.ratios.append(CompiledRatio(definition, engine.known_names))
+            engine.known_names.add(definition["key"])
+        return engine
+
+    def evaluate(self, inputs: dict) -> dict:
+        """Evaluate every ratio, returning results grouped by category."""
+        namespace = {**SCALAR_OPS, **{name: inputs.get(name, 0) for name in INPUT_NAMES}}
+        results = {}
+        for ratio in self.ratios:
+            value = round(float(eval(ratio.code, {"__builtins__": {}}, namespace)), 2)
+            namespace[ratio.key] = value
+            if ratio.category not in results:
+                results[ratio.category] = {
+                    "title": self.categories.get(ratio.category, ratio.category.replace("_", " ").title()),
+                    "ratios": [],
+                }
+            results[ratio.category]["ratios"].append(ratio.to_result(value))
+        return results
+
+
+    def evaluate_columns(self, inputs: dict) -> dict:
+        """Evaluate every ratio over arrays of inputs, one element per company-period.
+
+        Returns {key: values, f"{key}_status": statuses}. Undefined ratios
+        (zero denominators) are NaN rather than 0.
+        """
+        length = len(next(iter(inputs.values()))) if inputs else 0
+        namespace = {**VECTOR_OPS}
+        for name in INPUT_NAMES:
+            namespace[name] = np.asarray(inputs.get(name, np.zeros(length)), dtype=float)
+
+        columns = {}
+        for ratio in self.ratios:
+            values = np.round(np.broadcast_to(
+                np.asarray(eval(ratio.code, {"__builtins__": {}}, namespace), dtype=float), (length,)
+            ), 2)
+            namespace[ratio.key] = values
+            columns[ratio.key] = values
+            columns[f"{ratio.key}_status"] = ratio.status_array(values)
+        return columns
+
+
+@lru_cache()
+def get_ratio_engine() -> RatioEngine:
+    """Built-in ratio definitions, parsed and compiled once per process."""
+    return RatioEngine.from_file(os.path.join(DATA_DIR, "ratio_definitions.json"))
@@ -0,0 +1,273 @@
+import threading
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.account import AccountMapping
+from models.financial_data import TrialBalanceEntry
+from services.cache_service import get_company_version
+from services.master_chart import get_master_chart
+from services.statement_service import period_condition
+
+
+LEVELS = ["root", "category", "sub_category", "fs_line", "master", "source"]
+
+# Categories whose balances are naturally debits; the rest are presented as credits
+DEBIT_CATEGORIES = {"Asset", "Expense"}
+
+
+class RollupNode:
+    """A node in the chart-of-accounts rollup tree with a cached subtotal."""
+    __slots__ = ("id", "key", "label", "level", "parent", "children", "subtotal",
+                 "debit", "credit", "balance", "code")
+
+    def __init__(self, key: str, label: str, level: str, parent: "RollupNode | None" = None, code: str | None = None):
+        self.key = key
+        self.label = label
+        self.level = level
+        self.parent = parent
+        self.children: dict[str, RollupNode] = {}
+        self.subtotal = 0.0
+        self.debit = 0.0
+        self.credit = 0.0
+        self.balance = 0.0
+        self.code = code
+        self.id = f"{parent.id}/{key}" if parent and parent.parent else key if parent else ""
+
+    def child(self, key: str, label: str, level: str, code: str | None = None) -> "RollupNode":
+        if key not in self.children:
+            self.children[key] = RollupNode(key, label, level, self, code)
+        return self.children[key]
+
+    def ancestors(self):
+        node = self.parent
+        while node:
+            yield node
+            node = node.parent
+
+    def is_populated(self) -> bool:
+        """Whether any source account rolls up into this node."""
+        return self.level == "source" or any(c.is_populated() for c in self.children.values())
+
+    def to_dict(self, depth: int | None = None) -> dict:
+        children = [c for c in self.children.values() if c.is_populated()]
+        data = {
+            "id": self.id,
+            "label": self.label,
+            "level": self.level,
+            "subtotal": round(self.subtotal, 2),
+            "has_children": bool(children),
+        }
+        if self.code:
+            data["code"] = self.code
+        if depth is None or depth > 0:
+            data["children"] = [c.to_dict(None if depth is None else depth - 1) for c in children]
+        return data
+
+
+def signed_amount(category: str, debit: float, credit: float, balance: float) -> float:
+    """Source account amount, positive in its category's natural direction."""
+    net_debit = (debit - credit) if (debit or credit) else balance
+    return net_debit if category in DEBIT_CATEGORIES else -net_debit
+
+
+class RollupTree:
+    """IFRS master chart as a category → sub_category → fs_line → master → source tree.
+
+    Each node caches its subtotal. Changing one source account's balance or
+    mapping only walks that account's ancestor path to update subtotals.
+    Changes are made in place under lock, which readers hold while they walk
+    the tree, so a reader never sees a half-applied change.
+    """
+
+    def __init__(self, master_accounts: list):
+        self.lock = threading.RLock()
+        self.root = RollupNode("", "Chart of Accounts", "root")
+        self.masters: dict[int, RollupNode] = {}
+        self.sources: dict[str, RollupNode] = {}
+        self.categories: dict[int, str] = {}
+        for master in sorted(master_accounts, key=lambda m: m.code):
+            category = self.root.child(master.category, master.category, "category")
+            sub_category = category.child(master.sub_category or master.category, master.sub_category or master.category, "sub_category")
+            fs_line = sub_category.child(master.fs_line or master.name, master.fs_line or master.name, "fs_line")
+            self.masters[master.id] = fs_line.child(master.code, master.name, "master", code=master.code)
+            self.categories[master.id] = master.category
+
+    def _add_to_path(self, node: RollupNode, delta: float):
+        node.subtotal += delta
+        for ancestor in node.ancestors():
+            ancestor.subtotal += delta
+
+    def set_account(self, source_code: str, source_name: str, master_account_id: int,
+                    debit: float, credit: float, balance: float):
+        """Insert or update a source account, recomputing only its ancestors."""
+        leaf = self.sources.get(source_code)
+        if leaf and leaf.parent is not self.masters.get(master_account_id):
+            self.remove_account(source_code)
+            leaf = None
+        if leaf is None:
+            master_node = self.masters.get(master_account_id)
+            if master_node is None:
+                return
+            leaf = master_node.child(source_code, source_name, "source", code=source_code)
+            self.sources[source_code] = leaf
+
+        leaf.debit, leaf.credit, leaf.balance = debit, credit, balance
+        new_amount = signed_amount(self.categories[master_account_id], debit, credit, balance)
+        self._add_to_path(leaf, new_amount - leaf.subtotal)
+
+    def remove_account(self, source_code: str):
+        leaf = self.sources.pop(source_code, None)
+        if leaf is None:
+            return
+        self._add_to_path(leaf, -leaf.subtotal)
+        del leaf.parent.children[source_code]
+
+    def move_account(self, source_code: str, master_account_id: int):
+        """Remap a source account to another master account."""
+        leaf = self.sources.get(source_code)
+        if leaf is None:
+            return
+        self.set_account(source_code, leaf.label, master_account_id, leaf.debit, leaf.credit, leaf.balance)
+
+    def find(self, node_id: str) -> RollupNode | None:
+        node = self.root
+        for key in filter(None, node_id.split("/")):
+            node = node.children.get(key)
+            if node is None:
+                return None
+        return node
+
+
+# company_id -> (data version, RollupTree)
+_trees: dict[int, tuple[int, RollupTree]] = {}
+_trees_lock = threading.Lock()
+
+
+def _source_balances(db: Session, company_id: int, source_codes: list[str] | None = None):
+    """Mapped balances per source account for the reporting period, in one grouped query."""
+    query = db.query(
+        TrialBalanceEntry.account_code,
+        AccountMapping.source_name,
+        AccountMapping.master_account_id,
+        func.sum(TrialBalanceEntry.debit),
+        func.sum(TrialBalanceEntry.credit),
+        func.sum(TrialBalanceEntry.balance),
+    ).join(
+        AccountMapping,
+        (AccountMapping.source_code == TrialBalanceEntry.account_code) &
+        (AccountMapping.company_id == TrialBalanceEntry.company_id)
+    ).filter(
+        TrialBalanceEntry.company_id == company_id,
+        period_condition(db, company_id),
+        AccountMapping.is_mapped == True
+    )
+    if source_codes is not None:
+        query = query.filter(TrialBalanceEntry.account_code.in_(source_codes))
+    return query.group_by(
+        TrialBalanceEntry.account_code,
+        AccountMapping.source_name,
+        AccountMapping.master_account_id,
+    ).all()
+
+
+def build_rollup_tree(db: Session, company_id: int) -> RollupTree:
+    """Build a company's rollup tree from source-level mapped balances."""
+    tree = RollupTree(get_master_chart(db).records)
+    for code, name, master_account_id, debit, credit, balance in _source_balances(db, company_id):
+        tree.set_account(code, name, master_account_id, debit or 0.0, credit or 0.0, balance or 0.0)
+    return tree
+
+
+def get_rollup_tree(db: Session, company_id: int) -> RollupTree:
+    """Return the cached rollup tree, rebuilding it if the company's data has changed."""
+    version = get_company_version(db, company_id)
+    cached = _trees.get(company_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    tree = build_rollup_tree(db, company_id)
+    with _trees_lock:
+        _trees[company_id] = (version, tree)
+    return tree
+
+
+def rollup_node(db: Session, company_id: int, node_id: str, depth: int | None = None) -> dict | None:
+    """A node of the company's rollup tree and its descendants down to depth, or None if there is no such node."""
+    tree = get_rollup_tree(db, company_id)
+    with tree.lock:
+        node = tree.find(node_id)
+        return node.to_dict(depth) if node else None
+
+
+def _update_cached_tree(db: Session, company_id: int, from_version: int, update) -> bool:
+    """Apply update(tree) to the cached tree in place and advance its version.
+
+    from_version is the data version read before the change was written. The
+    update is applied only if the cached tree is at that version and the
+    change was the one version bump since; after any concurrent write the
+    cached tree is dropped and rebuilt on demand.
+    """
+    cached = _trees.get(company_id)
+    if not cached or cached[0] != from_version:
+        return False
+    tree = cached[1]
+    with tree.lock:
+        version = get_company_version(db, company_id)
+        with _trees_lock:
+            if _trees.get(company_id) is not cached:
+                return False  # replaced meanwhile by a rebuild or another change
+            if version != from_version + 1:
+                del _trees[company_id]
+                return False
+        update(tree)
+        with _trees_lock:
+            if _trees.get(company_id) is cached:
+                _trees[company_id] = (version, tree)
+    return True
+
+
+def apply_remaps(db: Session, company_id: int, remaps: list[tuple[str, int]], from_version: int):
+    """Move remapped source accounts in the cached tree instead of rebuilding it.
+
+    Each move walks only the old and new ancestor paths of the account.
+    """
+    cached = _trees.get(company_id)
+    if not cached or cached[0] != from_version:
+        return
+    # Accounts mapped for the first time need their balances, loaded before the tree is locked
+    new_codes = [code for code, _ in remaps if code not in cached[1].sources]
+    new_balances = _source_balances(db, company_id, new_codes) if new_codes else []
+
+    def update(tree: RollupTree):
+        for source_code, master_account_id in remaps:
+            if source_code in tree.sources:
+                tree.move_account(source_code, master_account_id)
+        for code, name, master_account_id, debit, credit, balance in new_balances:
+            tree.set_account(code, name, master_account_id, debit or 0.0, credit or 0.0, balance or 0.0)
+
+    _update_cached_tree(db, company_id, from_version, update)
+
+
+def apply_balance_changes(db: Session, company_id: int, from_version: int):
+    """Bring the cached tree up to date after a trial balance upload instead of rebuilding it.
+
+    Balances for the reporting period are reloaded in one grouped query and
+    applied through set_account, so only accounts whose amount or mapping
+    changed walk their ancestor path; accounts no longer reported are removed.
+    """
+    cached = _trees.get(company_id)
+    if not cached or cached[0] != from_version:
+        return
+    rows = _source_balances(db, company_id)
+
+    def update(tree: RollupTree):
+        reported = set()
+        for code, name, master_account_id, debit, credit, balance in rows:
+            reported.add(code)
+            amounts = (debit or 0.0, credit or 0.0, balance or 0.0)
+            leaf = tree.sources.get(code)
+            if leaf is None or leaf.parent is not tree.masters.get(master_account_id) \
+                    or (leaf.debit, leaf.credit, leaf.balance) != amounts:
+                tree.set_account(code, name, master_account_id, *amounts)
+        for code in set(tree.sources) - reported:
+            tree.remove_account(code)
+
+    _update_cached_tree(db, company_id, from_version, update)
@@ -1,81 +1,173 @@
+from datetime import date
 from sqlalchemy.orm import Session
 from models.financial_data import TrialBalanceEntry
-from models.account import AccountMapping, MasterAccount
-
-
-def get_mapped_balances(db: Session, company_id: int) -> dict:
-    """Get trial balance entries mapped to IFRS categories."""
+from models.account import AccountMapping
+from services.fx_service import get_rates, translate_balances, company_currency, reporting_date, latest_period
+from services.cache_service import get_company_version
+from services.master_chart import get_master_chart, ratio_role_index
+
+BALANCE_SHEET_ROLES = ("cash", "receivables", "inventory", "payables", "short_term_debt")
+PROFIT_AND_LOSS_ROLES = ("interest_expense", "depreciation_amortization")
+
+PROFIT_AND_LOSS_BUCKETS = ("revenue", "cogs", "operating_expenses", "other_income", "finance", "tax")
+BALANCE_SHEET_BUCKETS = ("current_assets", "non_current_assets", "current_liabilities", "non_current_liabilities", "equity")
+
+
+# company_id -> (data version, {fs_line: {source_code: source account totals}}), rebuilt on every balance aggregation
+_drilldown_index: dict[int, tuple[int, dict]] = {}
+
+
+def get_drilldown_index(db: Session, company_id: int) -> dict:
+    """Return the fs_line -> source account index, rebuilding it if the company's data has changed."""
+    cached = _drilldown_index.get(company_id)
+    if not cached or cached[0] != get_company_version(db, company_id):
+        get_mapped_balances(db, company_id)
+    return _drilldown_index[company_id][1]
+
+
+def statement_bucket(category: str, sub_category: str | None) -> str | None:
+    """The statement section an IFRS line is reported in (see the *_BUCKETS tuples)."""
+    if category == "Revenue":
+        return "other_income" if sub_category == "Other Income" else "revenue"
+    if category == "Expense":
+        return {"Cost of Sales": "cogs", "Finance Cost": "finance", "Tax": "tax"}.get(sub_category, "operating_expenses")
+    if category == "Asset":
+        return "current_assets" if sub_category == "Current Asset" else "non_current_assets"
+    if category == "Liability":
+        return "current_liabilities" if sub_category == "Current Liability" else "non_current_liabilities"
+    if category == "Equity":
+        return "equity"
+    return None
+
+
+def period_condition(db: Session, company_id: int, period_end: date | None = None):
+    """Filter selecting the trial balance period a company's statements report on.
+
+    Each upload is a trial balance as at its period end, so periods must not
+    be summed: statements use the requested period, else the latest one.
+    Companies that never recorded periods keep using their undated entries.
+    """
+    period_end = period_end or latest_period(db, company_id)
+    if period_end is None:
+        return TrialBalanceEntry.period_end.is_(None)
+    return TrialBalanceEntry.period_end == period_end
+
+
+def get_mapped_balances(db: Session, company_id: int, currency: str | None = None, period_end: date | None = None) -> dict:
+    """Get trial balance entries for one period mapped to IFRS categories, optionally translated into another currency."""
+    version = get_company_version(db, company_id)
+    masters = get_master_chart(db).by_id
     entries = db.query(
-        TrialBalanceEntry, AccountMapping, MasterAccount
+        TrialBalanceEntry, AccountMapping
     ).join(
         AccountMapping,
         (AccountMapping.source_code == TrialBalanceEntry.account_code) &
         (AccountMapping.company_id == TrialBalanceEntry.company_id)
-    ).outerjoin(
-        MasterAccount,
-        MasterAccount.id == AccountMapping.master_account_id
     ).filter(
         TrialBalanceEntry.company_id == company_id,
+        period_condition(db, company_id, period_end),
         AccountMapping.is_mapped == True
     ).all()
 
-    # Aggregate by IFRS line item
+    # Aggregate by IFRS line item, indexing the source accounts behind each line for drill-down
     aggregated = {}
-    for tb, mapping, master in entries:
+    drilldown = {}
+    for tb, mapping in entries:
+        master = masters.get(mapping.master_account_id)
         if not master:
             continue
-        key = master.fs_line or master.name
-        if key not in aggregated:
-            aggregated[key] = {
-                "fs_line": key,
-                "category": master.category,
-                "sub_category": master.sub_category,
-                "normal_balance": master.normal_balance,
+        accumulate_balance(aggregated, master, tb.debit, tb.credit, tb.balance)
+
+        accounts = drilldown.setdefault(master.fs_line or master.name, {})
+        if tb.account_code not in accounts:
+            accounts[tb.account_code] = {
+                "source_code": tb.account_code,
+                "source_name": mapping.source_name or tb.account_name,
+                "master_code": master.code,
+                "master_name": master.name,
                 "debit": 0.0,
                 "credit": 0.0,
                 "balance": 0.0,
             }
-        aggregated[key]["debit"] += tb.debit
-        aggregated[key]["credit"] += tb.credit
-        aggregated[key]["balance"] += tb.balance
+        accounts[tb.account_code]["debit"] += tb.debit or 0.0
+        accounts[tb.account_code]["credit"] += tb.credit or 0.0
+        accounts[tb.account_code]["balance"] += tb.balance or 0.0
+
+    if period_end is None:
+        _drilldown_index[company_id] = (version, drilldown)
+
+    if currency:
+        functional_currency = company_currency(db, company_id)
+        if functional_currency.upper() != currency.upper():
+            closing_rate, average_rate = get_rates(db, functional_currency, currency, reporting_date(db, company_id, period_end), company_id)
+            aggregated = translate_balances(aggregated, closing_rate, average_rate)
 
     return aggregated
 
 
-def generate_profit_and_loss(db: Session, company_id: int) -> dict:
+def accumulate_balance(aggregated: dict, master, debit: float, credit: float, balance: float):
+    """Add one mapped amount to its IFRS line item in an aggregated balances dict.
+
+    Amounts on master accounts with ratio roles are also totalled per role
+    within the line, so ratio inputs never depend on line names.
+    """
+    key = master.fs_line or master.name
+    if key not in aggregated:
+        aggregated[key] = {
+            "fs_line": key,
+            "category": master.category,
+            "sub_category": master.sub_category,
+            "normal_balance": master.normal_balance,
+            "debit": 0.0,
+            "credit": 0.0,
+            "balance": 0.0,
+            "roles": {},
+        }
+    line = aggregated[key]
+    line["debit"] += debit or 0.0
+    line["credit"] += credit or 0.0
+    line["balance"] += balance or 0.0
+
+    for role in ratio_role_index().get(master.code, ()):
+        totals = line["roles"].setdefault(role, {"debit": 0.0, "credit": 0.0, "balance": 0.0})
+        totals["debit"] += debit or 0.0
+        totals["credit"] += credit or 0.0
+        totals["balance"] += balance or 0.0
+
+
+def line_amount(data: dict, normal_balance: str) -> float:
+    """Signed amount of a line (or role total) in its normal balance direction."""
+    if data["debit"] == 0 and data["credit"] == 0:
+        return abs(data["balance"])
+    if normal_balance == "credit":
+        return data["credit"] - data["debit"]
+    return data["debit"] - data["credit"]
+
+
+def role_totals(balances: dict, roles: tuple) -> dict:
+    """Sum the amounts tagged with each ratio role across all lines."""
+    totals = {role: 0.0 for role in roles}
+    for data in balances.values():
+        for role, amounts in data.get("roles", {}).items():
+            if role in totals:
+                totals[role] += line_amount(amounts, data["normal_balance"])
+    return {role: round(total, 2) for role, total in totals.items()}
+
+
+def generate_profit_and_loss(db: Session, company_id: int, currency: str | None = None, period_end: date | None = None) -> dict:
     """Generate Profit & Loss statement from mapped data."""
-    balances = get_mapped_balances(db, company_id)
+    return build_profit_and_loss(get_mapped_balances(db, company_id, currency, period_end))
 
-    revenue_items = []
-    cogs_items = []
-    opex_items = []
-    other_income_items = []
-    finance_items = []
-    tax_items = []
 
+def build_profit_and_loss(balances: dict) -> dict:
+    """Build a Profit & Loss statement from aggregated IFRS balances."""
+    items = {bucket: [] for bucket in PROFIT_AND_LOSS_BUCKETS}
     for key, data in balances.items():
-        amount = abs(data["balance"])
-        if data["normal_balance"] == "credit":
-            amount = data["credit"] - data["debit"] if data["credit"] != 0 or data["debit"] != 0 else abs(data["balance"])
-        else:
-            amount = data["debit"] - data["credit"] if data["debit"] != 0 or data["credit"] != 0 else abs(data["balance"])
-
-        item = {"line": key, "amount": round(amount, 2)}
-
-        if data["category"] == "Revenue":
-            if data["sub_category"] == "Other Income":
-                other_income_items.append(item)
-            else:
-                revenue_items.append(item)
-        elif data["category"] == "Expense":
-            if data["sub_category"] == "Cost of Sales":
-                cogs_items.append(item)
-            elif data["sub_category"] == "Finance Cost":
-                finance_items.append(item)
-            elif data["sub_category"] == "Tax":
-                tax_items.append(item)
-            else:
-                opex_items.append(item)
+        bucket = statement_bucket(data["category"], data["sub_category"])
+        if bucket in items:
+            items[bucket].append({"line": key, "amount": round(line_amount(data, data["normal_balance"]), 2)})
+    revenue_items, cogs_items, opex_items = items["revenue"], items["cogs"], items["operating_expenses"]
+    other_income_items, finance_items, tax_items = items["other_income"], items["finance"], items["tax"]
 
     total_revenue = sum(i["amount"] for i in revenue_items)
     total_cogs = sum(i["amount"] for i in cogs_items)
@@ -87,6 +179,7 @@ def generate_profit_and_loss(db: Session, company_id: int) -> dict:
     profit_before_tax = operating_profit + total_other_income - total_finance
     total_tax = sum(i["amount"] for i in tax_items)
     net_profit = profit_before_tax - total_tax
+    roles = role_totals(balances, PROFIT_AND_LOSS_ROLES)
 
     return {
         "title": "Profit & Loss Statement",
@@ -109,48 +202,27 @@ def generate_profit_and_loss(db: Session, company_id: int) -> dict:
             "operating_expenses": round(total_opex, 2),
             "operating_profit": round(operating_profit, 2),
             "net_profit": round(net_profit, 2),
-            "ebitda": round(operating_profit + sum(
-                i["amount"] for i in opex_items
-                if "depreciation" in i["line"].lower() or "amortization" in i["line"].lower()
-            ), 2),
+            "ebitda": round(operating_profit + roles["depreciation_amortization"], 2),
+            **roles,
         }
     }
 
 
-def generate_balance_sheet(db: Session, company_id: int) -> dict:
+def generate_balance_sheet(db: Session, company_id: int, currency: str | None = None, period_end: date | None = None) -> dict:
     """Generate Balance Sheet from mapped data."""
-    balances = get_mapped_balances(db, company_id)
+    return build_balance_sheet(get_mapped_balances(db, company_id, currency, period_end))
 
-    current_assets = []
-    non_current_assets = []
-    current_liabilities = []
-    non_current_liabilities = []
-    equity_items = []
 
+def build_balance_sheet(balances: dict) -> dict:
+    """Build a Balance Sheet from aggregated IFRS balances."""
+    items = {bucket: [] for bucket in BALANCE_SHEET_BUCKETS}
     for key, data in balances.items():
-        if data["category"] in ["Revenue", "Expense"]:
-            continue  # Skip P&L items
-
-        amount = abs(data["balance"])
-        if data["normal_balance"] == "credit":
-            amount = data["credit"] - data["debit"] if data["credit"] != 0 or data["debit"] != 0 else abs(data["balance"])
-        else:
-            amount = data["debit"] - data["credit"] if data["debit"] != 0 or data["credit"] != 0 else abs(data["balance"])
-
-        item = {"line": key, "amount": round(amount, 2)}
-
-        if data["category"] == "Asset":
-            if data["sub_category"] == "Current Asset":
-                current_assets.append(item)
-            else:
-                non_current_assets.append(item)
-        elif data["category"] == "Liability":
-            if data["sub_category"] == "Current Liability":
-                current_liabilities.append(item)
-            else:
-                non_current_liabilities.append(item)
-        elif data["category"] == "Equity":
-            equity_items.append(item)
+        bucket = statement_bucket(data["category"], data["sub_category"])
+        if bucket in items:  # P&L lines are skipped
+            items[bucket].append({"line": key, "amount": round(line_amount(data, data["normal_balance"]), 2)})
+    current_assets, non_current_assets = items["current_assets"], items["non_current_assets"]
+    current_liabilities, non_current_liabilities = items["current_liabilities"], items["non_current_liabilities"]
+    equity_items = items["equity"]
 
     total_current_assets = sum(i["amount"] for i in current_assets)
     total_non_current_assets = sum(i["amount"] for i in non_current_assets)
@@ -182,21 +254,21 @@ def generate_balance_sheet(db: Session, company_id: int) -> dict:
             "total_non_current_liabilities": round(total_non_current_liabilities, 2),
             "total_liabilities": round(total_liabilities, 2),
             "total_equity": round(total_equity, 2),
+            **role_totals(balances, BALANCE_SHEET_ROLES),
         }
     }
 
 
-def generate_cash_flow(db: Session, company_id: int) -> dict:
+def generate_cash_flow(db: Session, company_id: int, currency: str | None = None, period_end: date | None = None) -> dict:
     """Generate Cash Flow Statement (Indirect Method)."""
-    pnl = generate_profit_and_loss(db, company_id)
-    bs = generate_balance_sheet(db, company_id)
+    balances = get_mapped_balances(db, company_id, currency, period_end)
+    return build_cash_flow(build_profit_and_loss(balances), build_balance_sheet(balances))
+
 
+def build_cash_flow(pnl: dict, bs: dict) -> dict:
+    """Build an indirect-method Cash Flow Statement from a P&L and Balance Sheet."""
     net_profit = pnl["summary"]["net_profit"]
-    depreciation = sum(
-        i["amount"] for section in pnl["sections"]
-        for i in section.get("items", [])
-        if "depreciation" in i["line"].lower() or "amortization" in i["line"].lower()
-    )
+    depreciation = pnl["summary"].get("depreciation_amortization", 0)
 
     # Simplified indirect method cash flow
     operating_activities = [
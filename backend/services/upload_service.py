@@ -1,4 +1,5 @@
 import pandas as pd
+from datetime import date
 from io import BytesIO
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.orm import Session
@@ -138,7 +139,8 @@ def parse_trial_balance(df: pd.DataFrame, col_mapping: dict) -> list[dict]:
     return unique_entries
 
 
-def save_trial_balance_entries(db: Session, entries: list[dict], company_id: int, upload_id: int):
+def save_trial_balance_entries(db: Session, entries: list[dict], company_id: int, upload_id: int,
+                               period_start: date | None = None, period_end: date | None = None):
     """Save parsed trial balance entries to database."""
     for entry in entries:
         db_entry = TrialBalanceEntry(
@@ -149,6 +151,8 @@ def save_trial_balance_entries(db: Session, entries: list[dict], company_id: int
             debit=entry["debit"],
             credit=entry["credit"],
             balance=entry["balance"],
+            period_start=period_start,
+            period_end=period_end,
         )
         db.add(db_entry)
     db.commit()
@@ -0,0 +1,105 @@
+"""Shared fixtures: the app runs against a throwaway SQLite database with AI, scheduled benchmark
+rebuilds and commentary pre-generation off, so tests need no network or background work."""
+import io
+import itertools
+import os
+import sys
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="cfo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["AI_API_KEY"] = ""
+os.environ["PEER_BENCHMARK_REFRESH_HOURS"] = "0"
+os.environ["COMMENTARY_PREGEN_WORKERS"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+TRIAL_BALANCE = [
+    ("1000", "Cash in Bank", 500000, 0), ("1200", "Accounts Receivable", 150000, 0),
+    ("1500", "Inventory", 100000, 0), ("2000", "Accounts Payable", 0, 80000),
+    ("2500", "Long Term Debt", 0, 200000), ("3000", "Share Capital", 0, 300000),
+    ("4000", "Sales Revenue", 0, 500000), ("5000", "Cost of Goods Sold", 200000, 0),
+    ("6000", "Salaries Expense", 100000, 0), ("6100", "Rent Expense", 30000, 0),
+    ("6200", "Depreciation Expense", 20000, 0), ("6300", "Interest Expense", 5000, 0),
+]
+
+_emails = itertools.count(1)
+
+
+def trial_balance_file(rows) -> io.BytesIO:
+    frame = pd.DataFrame([{"Account Code": c, "Account Name": n, "Debit": d, "Credit": cr} for c, n, d, cr in rows])
+    buffer = io.BytesIO()
+    frame.to_excel(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture(scope="session")
+def client():
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    """A session on the test database; depends on client so the app's models and tables exist."""
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def upload_tb(client):
+    """Upload a trial balance for a user (optionally for a period) and auto-map it."""
+    def upload(headers, rows=TRIAL_BALANCE, period_end=None):
+        data = {"period_end": str(period_end)} if period_end else {}
+        response = client.post(
+            "/api/upload/trial-balance", headers=headers, data=data,
+            files={"file": ("tb.xlsx", trial_balance_file(rows), "application/octet-stream")},
+        )
+        assert response.status_code == 200, response.text
+        response = client.post("/api/mapping/auto-map", headers=headers)
+        assert response.status_code == 200, response.text
+    return upload
+
+
+@pytest.fixture
+def make_company(client, upload_tb):
+    """Register a user with a company and return (auth headers, company id); uploads rows unless rows=None."""
+    def make(name="Test Co", rows=TRIAL_BALANCE, currency="AED", industry="Technology", period_end=None):
+        email = f"user{next(_emails)}@example.com"
+        response = client.post("/api/auth/register", json={"email": email, "password": "password123", "full_name": "Test"})
+        assert response.status_code == 200, response.text
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = client.post("/api/company/", headers=headers, json={"name": name, "currency": currency, "industry": industry})
+        assert response.status_code == 200, response.text
+        if rows is not None:
+            upload_tb(headers, rows, period_end)
+        return headers, response.json()["id"]
+    return make
+
+
+@pytest.fixture
+def mock_llm(monkeypatch):
+    """Answer provider calls in-process from benchmarks.mock_llm (no delay); returns its request stats."""
+    import httpx
+    from benchmarks import mock_llm as provider
+    from config import get_settings
+    from services import llm_client
+
+    monkeypatch.setattr(get_settings(), "AI_API_KEY", "test")
+    monkeypatch.setattr(provider, "LATENCY_SECONDS", 0.0)
+    monkeypatch.setattr(provider, "stats", dict.fromkeys(provider.stats, 0))
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=provider.app), base_url="http://mock-llm",
+    ))
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+    monkeypatch.setattr(get_settings(), "AI_API_URL", "http://mock-llm/v1/chat/completions")
+    return provider
@@ -0,0 +1,16 @@
+"""Accuracy parity of TF-IDF candidate retrieval (AccountMatcher) with the exhaustive scan it replaced."""
+import pytest
+from benchmarks.mapping_benchmark import MAX_METRIC_DROP, MAX_WORSE_RATE, check_parity, parity
+from benchmarks.mapping_corpus import generate_corpus, load_seed
+
+
+@pytest.mark.parametrize("corpus", [
+    pytest.param(load_seed(), id="labeled"),
+    pytest.param(generate_corpus(1000, seed=42), id="noisy-1000"),
+])
+def test_retrieval_matches_exhaustive_accuracy(corpus):
+    result = parity(corpus)
+
+    assert result["worse_rate"] <= MAX_WORSE_RATE, check_parity(result)
+    assert result["precision_delta"] >= -MAX_METRIC_DROP, check_parity(result)
+    assert result["recall_delta"] >= -MAX_METRIC_DROP, check_parity(result)
@@ -0,0 +1,50 @@
+"""Batch manual mapping: all-or-nothing, scoped to the caller's company."""
+from tests.conftest import TRIAL_BALANCE
+
+
+def master_id(client, code):
+    return next(m["id"] for m in client.get("/api/mapping/master-accounts").json() if m["code"] == code)
+
+
+def mappings_by_code(client, headers):
+    return {m["source_code"]: m for m in client.get("/api/mapping/", headers=headers).json()}
+
+
+def batch_map(client, headers, pairs):
+    return client.post("/api/mapping/manual-map/batch", headers=headers,
+                       json={"mappings": [{"mapping_id": m, "master_account_id": a} for m, a in pairs]})
+
+
+def test_batch_maps_every_account_and_updates_statements(client, make_company):
+    headers, _ = make_company("Batch Map Co")
+    before = mappings_by_code(client, headers)
+    rent, salaries = before["6100"]["id"], before["6000"]["id"]
+    finance_costs, cost_of_sales = master_id(client, "9010"), master_id(client, "7000")
+
+    # A repeated mapping keeps its last master
+    response = batch_map(client, headers, [(rent, cost_of_sales), (salaries, cost_of_sales), (rent, finance_costs)])
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == 2
+
+    after = mappings_by_code(client, headers)
+    assert (after["6100"]["master_code"], after["6100"]["mapped_by"]) == ("9010", "manual")
+    assert (after["6000"]["master_code"], after["6000"]["mapped_by"]) == ("7000", "manual")
+    summary = client.get("/api/statements/profit-loss", headers=headers).json()["summary"]
+    assert summary["cogs"] == 200000 + 100000
+    assert summary["interest_expense"] == 5000 + 30000
+
+
+def test_failed_batch_changes_nothing(client, make_company):
+    headers, _ = make_company("Batch Owner")
+    other_headers, _ = make_company("Batch Other")
+    before = mappings_by_code(client, headers)
+    other_mapping = mappings_by_code(client, other_headers)["1000"]["id"]
+    cash = master_id(client, "1000")
+
+    assert batch_map(client, headers, [(before["6100"]["id"], cash), (other_mapping, cash)]).status_code == 404
+    assert batch_map(client, headers, [(before["6100"]["id"], cash), (before["6000"]["id"], 999999)]).status_code == 400
+    assert batch_map(client, headers, [(before["6100"]["id"], cash)] * 5001).status_code == 400
+
+    assert mappings_by_code(client, headers) == before
+    assert mappings_by_code(client, other_headers)["1000"]["mapped_by"] != "manual"
+    assert len(before) == len(TRIAL_BALANCE)
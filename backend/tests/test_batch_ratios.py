@@ -0,0 +1,47 @@
+"""Batch ratios: one columnar row per (company, period), matching the per-company ratios."""
+import math
+from datetime import date
+from tests.conftest import TRIAL_BALANCE
+
+JUNE, DECEMBER = date(2025, 6, 30), date(2025, 12, 31)
+# December sells twice as much at the same cost base, so its ratios differ from June's
+DECEMBER_TRIAL_BALANCE = [
+    (code, name, debit, credit * 2 if code == "4000" else credit) for code, name, debit, credit in TRIAL_BALANCE
+]
+
+
+def batch(client, headers, **params):
+    response = client.get("/api/ratios/batch", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_one_row_per_period_matching_company_ratios(client, make_company, upload_tb):
+    headers, company_id = make_company("Batch Co", period_end=JUNE)
+    upload_tb(headers, DECEMBER_TRIAL_BALANCE, period_end=DECEMBER)
+
+    result = batch(client, headers, include_inputs=True)
+
+    columns = result["columns"]
+    assert result["row_count"] == 2
+    assert columns["company_id"] == [company_id, company_id]
+    assert columns["period_end"] == [str(JUNE), str(DECEMBER)]
+    assert columns["revenue"] == [500000, 1000000]
+
+    # The latest period is what GET /api/ratios reports; an undefined ratio is null in the batch and 0 there
+    ratios = client.get("/api/ratios/", headers=headers).json()
+    for category in ratios.values():
+        for ratio in category["ratios"]:
+            value = columns[ratio["key"]][-1]
+            assert math.isclose(value if value is not None else 0, ratio["value"], abs_tol=0.01), ratio["key"]
+            assert columns[f"{ratio['key']}_status"][-1] == ratio["status"], ratio["key"]
+
+
+def test_period_range_filters_rows(client, make_company, upload_tb):
+    headers, _ = make_company("Batch Range Co", period_end=JUNE)
+    upload_tb(headers, DECEMBER_TRIAL_BALANCE, period_end=DECEMBER)
+
+    result = batch(client, headers, period_from=str(date(2025, 7, 1)))
+
+    assert result["row_count"] == 1
+    assert result["columns"]["period_end"] == [str(DECEMBER)]
@@ -0,0 +1,35 @@
+"""Peer benchmarks: who is in each distribution, and manual rebuild throttling."""
+import pytest
+from sqlalchemy import func
+from models.financial_data import TrialBalanceEntry
+from tests.conftest import TRIAL_BALANCE
+from services.benchmark_service import ALL_INDUSTRIES, RebuildThrottled, get_peer_digests, rebuild_peer_benchmarks, request_peer_benchmark_rebuild
+
+
+def scaled(factor):
+    return [(code, name, debit * factor, credit) for code, name, debit, credit in TRIAL_BALANCE]
+
+
+def test_companies_without_industry_are_in_the_all_industry_distribution(db, make_company):
+    for factor in (1, 2, 3):
+        make_company(f"No Industry {factor}", rows=scaled(factor), industry=None)
+    make_company("Retailer", industry="Retail")
+
+    rebuild_peer_benchmarks(db)
+    digests = get_peer_digests(db)
+
+    companies_with_data = db.query(func.count(func.distinct(TrialBalanceEntry.company_id))).scalar()
+    _, everyone = digests[(ALL_INDUSTRIES, "current_ratio")]
+    per_industry = sum(count for (group, key), (_, count) in digests.items() if key == "current_ratio" and group != ALL_INDUSTRIES)
+    assert everyone == companies_with_data
+    assert everyone - per_industry >= 3  # the companies without an industry
+    assert ("", "current_ratio") not in digests
+
+
+def test_manual_rebuild_is_throttled(db):
+    rebuild_peer_benchmarks(db)
+
+    with pytest.raises(RebuildThrottled) as throttled:
+        request_peer_benchmark_rebuild(db)
+
+    assert throttled.value.retry_after > 0
@@ -0,0 +1,80 @@
+"""Blocking work from async endpoints runs on the bounded worker pool, off the event loop."""
+import asyncio
+import threading
+import time
+import pytest
+from services import blocking
+from services.blocking import run_blocking
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A fresh worker pool of the given size, shut down afterwards."""
+    def make(workers):
+        monkeypatch.setattr(blocking.settings, "BLOCKING_WORKERS", workers)
+        blocking.shutdown_blocking_executor()
+    yield make
+    blocking.shutdown_blocking_executor()
+
+
+def test_loop_keeps_running_while_work_blocks(pool):
+    pool(2)
+    running = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+        return n * 2, threading.current_thread().name
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(run_blocking(work, n) for n in range(6)))
+        task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(main())
+    assert [value for value, _ in results] == [0, 2, 4, 6, 8, 10]
+    assert all(name.startswith("blocking") for _, name in results)
+    assert running["max"] == 2
+    assert ticks >= 10  # ~0.15s of blocking work while the loop ticked every 5ms
+
+
+def test_errors_propagate_to_the_caller(pool):
+    pool(1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(run_blocking(fail))
+
+
+def test_pdf_is_rendered_on_the_worker_pool(client, make_company, monkeypatch):
+    from routers import export
+    headers, _ = make_company("Export Co")
+    rendered_on = []
+    original = export.generate_pdf_report
+
+    def render(*args, **kwargs):
+        rendered_on.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(export, "generate_pdf_report", render)
+
+    response = client.get("/api/export/pdf", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert rendered_on and rendered_on[0].startswith("blocking")
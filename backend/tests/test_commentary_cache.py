@@ -0,0 +1,57 @@
+"""Commentary cache: identical financials are answered without another provider call."""
+from datetime import date, datetime, timedelta, timezone
+from models.commentary import CommentaryCache
+from services import commentary_cache
+from services.commentary_cache import commentary_cache_key, get_cached_commentary, store_commentary
+from tests.conftest import TRIAL_BALANCE
+
+
+def commentary(client, headers, **params):
+    response = client.get("/api/ai/commentary", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_unchanged_financials_reuse_the_cached_answer(client, make_company, upload_tb, mock_llm):
+    headers, _ = make_company("Commentary Co", period_end=date(2025, 6, 30))
+
+    assert commentary(client, headers) == mock_llm.COMMENTARY
+    assert mock_llm.stats["requests"] == 1
+    assert commentary(client, headers) == mock_llm.COMMENTARY
+    assert mock_llm.stats["requests"] == 1
+
+    commentary(client, headers, refresh=True)
+    assert mock_llm.stats["requests"] == 2
+
+    upload_tb(headers, [row if row[0] != "4000" else ("4000", "Sales Revenue", 0, 650000) for row in TRIAL_BALANCE],
+              period_end=date(2025, 12, 31))
+    commentary(client, headers)
+    assert mock_llm.stats["requests"] == 3
+
+
+def test_key_covers_model_and_prompt_version():
+    key = commentary_cache_key("context", "model-a", "2")
+    assert key == commentary_cache_key("context", "model-a", "2")
+    assert len({key, commentary_cache_key("context", "model-b", "2"), commentary_cache_key("context", "model-a", "3"),
+                commentary_cache_key("context 2", "model-a", "2")}) == 4
+
+
+def test_expired_and_least_recently_used_entries_are_evicted(db, make_company, monkeypatch):
+    _, company_id = make_company("Eviction Co", rows=None)
+    db.query(CommentaryCache).delete()
+    db.commit()
+    monkeypatch.setattr(commentary_cache.settings, "COMMENTARY_CACHE_MAX_ENTRIES", 2)
+
+    store_commentary(db, "a", company_id, "m", "1", {"n": "a"})
+    store_commentary(db, "b", company_id, "m", "1", {"n": "b"})
+    assert get_cached_commentary(db, "a") == {"n": "a"}  # "a" is now more recently used than "b"
+    store_commentary(db, "c", company_id, "m", "1", {"n": "c"})
+
+    assert get_cached_commentary(db, "b") is None
+    assert get_cached_commentary(db, "a") == {"n": "a"}
+
+    db.query(CommentaryCache).filter(CommentaryCache.cache_key == "c").update(
+        {"created_at": datetime.now(timezone.utc) - timedelta(hours=commentary_cache.settings.COMMENTARY_CACHE_TTL_HOURS + 1)}
+    )
+    db.commit()
+    assert get_cached_commentary(db, "c") is None
@@ -0,0 +1,63 @@
+"""Commentary pre-generation: data changes queue one background generation per company."""
+import asyncio
+import pytest
+from models.commentary import CommentaryCache
+from services import commentary_pregen
+from services.commentary_pregen import (
+    get_pregeneration_status, request_pregeneration, start_pregeneration_workers, stop_pregeneration_workers,
+)
+
+UNMAPPABLE = [(f"Z{i}", f"Qxzv Wrpl {i}", 100, 0) for i in range(10)]
+
+
+@pytest.fixture
+def pregen_settings(monkeypatch):
+    monkeypatch.setattr(commentary_pregen.settings, "COMMENTARY_PREGEN_WORKERS", 1)
+    monkeypatch.setattr(commentary_pregen.settings, "COMMENTARY_PREGEN_DELAY_SECONDS", 0.05)
+
+
+async def wait_until(condition, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_burst_of_changes_generates_once(db, make_company, mock_llm, pregen_settings):
+    _, company_id = make_company("Pregen Co")
+    before = get_pregeneration_status()
+
+    async def main():
+        start_pregeneration_workers()
+        try:
+            assert all(request_pregeneration(db, company_id) for _ in range(3))
+            await wait_until(lambda: get_pregeneration_status()["completed"] > before["completed"])
+        finally:
+            await stop_pregeneration_workers()
+
+    asyncio.run(main())
+
+    after = get_pregeneration_status()
+    assert after["enqueued"] - before["enqueued"] == 1
+    assert after["deduplicated"] - before["deduplicated"] == 2
+    assert mock_llm.stats["requests"] == 1
+    assert db.query(CommentaryCache).filter(CommentaryCache.company_id == company_id).count() == 1
+
+
+def test_nothing_is_queued_without_workers_key_or_mappings(db, make_company, mock_llm, pregen_settings, monkeypatch):
+    _, mapped_id = make_company("Pregen Mapped Co")
+    _, unmapped_id = make_company("Pregen Unmapped Co", rows=UNMAPPABLE)
+
+    assert not request_pregeneration(db, mapped_id)  # no workers running
+
+    async def main():
+        start_pregeneration_workers()
+        try:
+            assert not request_pregeneration(db, unmapped_id)
+            monkeypatch.setattr(commentary_pregen.settings, "AI_API_KEY", "")
+            assert not request_pregeneration(db, mapped_id)
+        finally:
+            await stop_pregeneration_workers()
+
+    asyncio.run(main())
+    assert mock_llm.stats["requests"] == 0
@@ -0,0 +1,65 @@
+"""Section-wise commentary: focused prompts run concurrently and a slow section falls back on its own."""
+import asyncio
+import json
+import httpx
+import pytest
+from benchmarks.mock_llm import COMMENTARY
+from services import ai_service, llm_client
+from services.ai_service import COMMENTARY_SECTIONS
+
+
+@pytest.fixture
+def sections_provider(monkeypatch):
+    """Provider answering every section prompt at once, except prompts for the fields in slow."""
+    calls = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "slow": set()}
+
+    async def handle(request):
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        calls["requests"] += 1
+        calls["in_flight"] += 1
+        calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        try:
+            await asyncio.sleep(1.0 if any(f'"{field}"' in prompt for field in calls["slow"]) else 0.05)
+        finally:
+            calls["in_flight"] -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(COMMENTARY)}}]})
+
+    monkeypatch.setattr(ai_service.settings, "AI_API_KEY", "test")
+    monkeypatch.setattr(ai_service.settings, "AI_COMMENTARY_MODE", "sections")
+    monkeypatch.setattr(ai_service.settings, "AI_SECTION_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+    monkeypatch.setattr(llm_client, "_semaphore", None)
+    return calls
+
+
+def commentary(client, headers):
+    response = client.get("/api/ai/commentary", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_sections_run_concurrently_and_are_cached(client, make_company, sections_provider):
+    headers, _ = make_company("Sections Co")
+
+    assert commentary(client, headers) == COMMENTARY
+    assert sections_provider["requests"] == len(COMMENTARY_SECTIONS)
+    assert sections_provider["max_in_flight"] == len(COMMENTARY_SECTIONS)
+
+    assert commentary(client, headers) == COMMENTARY
+    assert sections_provider["requests"] == len(COMMENTARY_SECTIONS)
+
+
+def test_slow_section_falls_back_alone_and_is_retried(client, make_company, sections_provider):
+    headers, _ = make_company("Slow Section Co")
+    sections_provider["slow"] = {"cash_flow_analysis"}
+
+    result = commentary(client, headers)
+
+    assert result["cash_flow_analysis"] != COMMENTARY["cash_flow_analysis"]  # rule-based text
+    assert {k: v for k, v in result.items() if k != "cash_flow_analysis"} == \
+        {k: v for k, v in COMMENTARY.items() if k != "cash_flow_analysis"}
+
+    # Partly rule-based commentary is not cached, so the next request asks again
+    sections_provider["slow"] = set()
+    assert commentary(client, headers) == COMMENTARY
+    assert sections_provider["requests"] == 2 * len(COMMENTARY_SECTIONS)
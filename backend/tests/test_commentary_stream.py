@@ -0,0 +1,77 @@
+"""Streamed commentary: sections are released as their JSON closes, over server-sent events."""
+import json
+import random
+import pytest
+from services.json_stream import JsonSectionParser
+
+DOCUMENT = {
+    "summary": "Margins held; \"cash\" is {fine}.\nNext line",
+    "score": -12.5e2,
+    "flags": ["a", {"nested": [1, 2, {"deep": True}]}],
+    "empty": {},
+    "ok": True,
+    "missing": None,
+    "last": 7,
+}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_parser_matches_json_loads_for_any_chunking(seed):
+    rng = random.Random(seed)
+    text = "```json\n" + json.dumps(DOCUMENT, indent=rng.choice([None, 2])) + "\n```"
+    parser, released = JsonSectionParser(), []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        released.extend(parser.feed(text[position:position + size]))
+        position += size
+
+    assert parser.complete
+    assert parser.sections == DOCUMENT
+    assert released == list(DOCUMENT.items())
+
+
+def test_section_is_released_before_the_rest_arrives():
+    parser = JsonSectionParser()
+    assert parser.feed('{"summary": "Margins') == []
+    assert parser.feed(' held", "flags": [') == [("summary", "Margins held")]
+    assert not parser.complete
+
+
+def stream_events(client, headers, **params):
+    with client.stream("GET", "/api/ai/commentary/stream", headers=headers, params=params) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_sections_then_replays_from_cache(client, make_company, mock_llm):
+    headers, _ = make_company("Stream Co")
+
+    events = stream_events(client, headers)
+    assert events[0] == ("start", {})
+    assert events[-1] == ("done", {"source": "ai"})
+    assert {e[1]["key"]: e[1]["value"] for e in events[1:-1]} == mock_llm.COMMENTARY
+
+    events = stream_events(client, headers)
+    assert events[-1] == ("done", {"source": "cache"})
+    assert {e[1]["key"]: e[1]["value"] for e in events[1:-1]} == mock_llm.COMMENTARY
+    assert mock_llm.stats["requests"] == 1
+
+
+def test_failed_stream_falls_back_to_rule_based_sections(client, make_company, mock_llm, monkeypatch):
+    from services import llm_client
+    headers, _ = make_company("Stream Failure Co")
+    monkeypatch.setattr(mock_llm, "FAILURE_RATE", 1.0)
+    monkeypatch.setattr(llm_client.settings, "AI_RETRY_MAX_SECONDS", 0.0)
+
+    events = stream_events(client, headers)
+
+    assert events[-1] == ("done", {"source": "default"})
+    sections = {e[1]["key"] for e in events[1:-1]}
+    assert set(mock_llm.COMMENTARY) <= sections
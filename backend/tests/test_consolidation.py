@@ -0,0 +1,76 @@
+"""Group consolidation: consent to consolidate, one reporting period for every entity."""
+from datetime import date
+
+
+def join_group(client, parent, subsidiary, ownership_pct=100.0):
+    (parent_headers, parent_id), (subsidiary_headers, subsidiary_id) = parent, subsidiary
+    response = client.post("/api/consolidation/grants", headers=subsidiary_headers, json={"parent_company_id": parent_id})
+    assert response.status_code == 200, response.text
+    response = client.post("/api/consolidation/members", headers=parent_headers,
+                           json={"subsidiary_company_id": subsidiary_id, "ownership_pct": ownership_pct})
+    assert response.status_code == 200, response.text
+
+
+def consolidated(client, headers, **params):
+    response = client.get("/api/consolidation/statements", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_subsidiary_must_grant_access(client, make_company):
+    parent_headers, _ = make_company("Parent")
+    _, subsidiary_id = make_company("Subsidiary")
+
+    response = client.post("/api/consolidation/members", headers=parent_headers, json={"subsidiary_company_id": subsidiary_id})
+
+    assert response.status_code == 403
+
+
+def test_revoking_grant_removes_subsidiary(client, make_company):
+    parent, subsidiary = make_company("Parent"), make_company("Subsidiary")
+    join_group(client, parent, subsidiary)
+    assert consolidated(client, parent[0])["entity_count"] == 2
+
+    assert client.delete(f"/api/consolidation/grants/{parent[1]}", headers=subsidiary[0]).status_code == 200
+
+    assert consolidated(client, parent[0])["entity_count"] == 1
+
+
+def test_entities_are_consolidated_on_the_parents_period(client, make_company, upload_tb):
+    june, january = date(2025, 6, 30), date(2025, 1, 31)
+    parent = make_company("Parent", period_end=june)
+    subsidiary = make_company("Subsidiary", period_end=january)
+    join_group(client, parent, subsidiary)
+
+    group = consolidated(client, parent[0])
+
+    assert group["period_end"] == "2025-06-30"
+    assert [e["company_id"] for e in group["entities"]] == [parent[1]]
+    assert [e["company_id"] for e in group["excluded_entities"]] == [subsidiary[1]]
+    assert group["profit_loss"]["summary"]["revenue"] == 500000
+
+    upload_tb(subsidiary[0], period_end=june)
+    group = consolidated(client, parent[0])
+
+    assert group["excluded_entities"] == []
+    assert group["profit_loss"]["summary"]["revenue"] == 1000000
+    january_group = consolidated(client, parent[0], period_end="2025-01-31")
+    assert [e["company_id"] for e in january_group["excluded_entities"]] == [parent[1]]
+    assert january_group["profit_loss"]["summary"]["revenue"] == 500000
+
+
+def test_partly_owned_subsidiary_is_consolidated_in_full_with_nci(client, make_company):
+    parent, subsidiary = make_company("Parent"), make_company("Subsidiary")
+    join_group(client, parent, subsidiary, ownership_pct=60)
+    single = client.get("/api/statements/profit-loss", headers=subsidiary[0]).json()["summary"]
+
+    group = consolidated(client, parent[0])
+    pnl, bs = group["profit_loss"]["summary"], group["balance_sheet"]["summary"]
+
+    assert group["method"] == "full"
+    assert pnl["revenue"] == 2 * single["revenue"]
+    assert pnl["profit_attributable_to_nci"] == round(0.4 * single["net_profit"], 2)
+    assert pnl["profit_attributable_to_owners"] == round(pnl["net_profit"] - pnl["profit_attributable_to_nci"], 2)
+    assert bs["non_controlling_interests"] == 0.4 * 300000  # the subsidiary's share capital
+    assert bs["total_equity"] == 2 * 300000
+    assert bs["equity_attributable_to_owners"] == 600000 - 120000
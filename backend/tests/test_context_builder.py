@@ -0,0 +1,48 @@
+"""Compact AI context: always the summary, then the most material rows that fit the token budget."""
+import pytest
+from services.context_builder import STATUS_PRIORITY, build_compact_context, count_tokens
+
+
+def table_rows(text, name):
+    """Data rows of one rendered table (after its heading and column line), without the omission note."""
+    if f"## {name}\n" not in text:
+        return []
+    body = text.split(f"## {name}\n", 1)[1].split("\n## ", 1)[0]
+    return [line for line in body.strip().splitlines()[1:] if not line.startswith("(+")]
+
+
+@pytest.fixture
+def company(make_company):
+    return make_company("Context Co")[1]
+
+
+def test_context_fits_the_budget_and_keeps_the_summary(db, company):
+    minimal = build_compact_context(db, company, "Context Co", 0)
+    full = build_compact_context(db, company, "Context Co", 100000)
+    assert full.omitted == {}
+    assert set(minimal.omitted) == {"ratios", "line_items"}
+
+    for budget in (minimal.tokens, minimal.tokens + 60, minimal.tokens + 200, full.tokens - 1, full.tokens):
+        context = build_compact_context(db, company, "Context Co", budget)
+        assert context.tokens <= budget
+        assert context.tokens == count_tokens(context.text)
+        assert table_rows(context.text, "summary") == table_rows(full.text, "summary")
+        for name in ("ratios", "line_items"):
+            kept = table_rows(context.text, name)
+            assert kept == table_rows(full.text, name)[:len(kept)]  # a prefix: most material first
+            assert len(kept) + context.omitted.get(name, 0) == len(table_rows(full.text, name))
+            if context.omitted.get(name) and kept:
+                assert f"(+{context.omitted[name]} less material rows omitted)" in context.text
+
+
+def test_off_benchmark_ratios_come_first(db, company):
+    statuses = [row.split("|")[-1] for row in table_rows(build_compact_context(db, company, "Context Co", 100000).text, "ratios")]
+    ranks = [STATUS_PRIORITY.get(status, 3) for status in statuses]
+    assert ranks == sorted(ranks)
+
+
+def test_token_count_is_stable_and_monotonic():
+    assert count_tokens("") == 0
+    text = "revenue|500000\nnet_profit|145000\n"
+    assert count_tokens(text) == count_tokens(text) > 0
+    assert count_tokens(text + text) > count_tokens(text)
@@ -0,0 +1,69 @@
+"""Statement drill-down: source accounts behind a line, and keyset-paged ledger lines."""
+from datetime import date
+from models.account import AccountMapping, MasterAccount
+from models.financial_data import GeneralLedgerEntry
+from models.upload import Upload
+from tests.conftest import TRIAL_BALANCE
+
+
+def fs_line_of(db, company_id, source_code):
+    master = db.query(MasterAccount).join(AccountMapping, AccountMapping.master_account_id == MasterAccount.id).filter(
+        AccountMapping.company_id == company_id, AccountMapping.source_code == source_code,
+    ).one()
+    return master.fs_line or master.name
+
+
+def line_accounts(client, headers, fs_line):
+    response = client.get("/api/statements/drilldown", headers=headers, params={"fs_line": fs_line})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_line_lists_its_source_accounts_and_follows_new_uploads(client, db, make_company, upload_tb):
+    headers, company_id = make_company("Drill Co", period_end=date(2025, 6, 30))
+    fs_line = fs_line_of(db, company_id, "1000")
+
+    result = line_accounts(client, headers, fs_line)
+    assert "1000" in [a["source_code"] for a in result["accounts"]]
+    assert result["total_balance"] == sum(a["balance"] for a in result["accounts"])
+
+    upload_tb(headers, [row if row[0] != "1000" else ("1000", "Cash in Bank", 650000, 0) for row in TRIAL_BALANCE],
+              period_end=date(2025, 12, 31))
+    cash = next(a for a in line_accounts(client, headers, fs_line)["accounts"] if a["source_code"] == "1000")
+    assert cash["balance"] == 650000
+
+    response = client.get("/api/statements/drilldown", headers=headers, params={"fs_line": "No Such Line"})
+    assert response.status_code == 404
+
+
+def test_ledger_pages_in_date_order(client, db, make_company):
+    headers, company_id = make_company("Ledger Co")
+    upload = Upload(company_id=company_id, filename="gl.xlsx", file_type="general_ledger", file_path="", status="completed")
+    db.add(upload)
+    db.flush()
+    days = [date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 2), date(2025, 1, 5)]
+    db.add_all([
+        GeneralLedgerEntry(company_id=company_id, upload_id=upload.id, date=day, account_code="1000",
+                           description=f"line {i}", debit=100.0 * (i + 1), credit=0.0, balance=100.0 * (i + 1))
+        for i, day in enumerate(days)
+    ])
+    db.commit()
+
+    pages, cursor = [], None
+    while True:
+        params = {"account_code": "1000", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/statements/drilldown/ledger", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append(page["lines"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    lines = [line for page in pages for line in page]
+    assert [(line["date"], line["id"]) for line in lines] == sorted((line["date"], line["id"]) for line in lines)
+    assert [line["date"] for line in lines] == sorted(str(day) for day in days)
+
+    response = client.get("/api/statements/drilldown/ledger", headers=headers, params={"account_code": "1000", "cursor": "nope"})
+    assert response.status_code == 400
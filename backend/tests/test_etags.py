@@ -0,0 +1,44 @@
+"""Conditional GETs: report endpoints answer 304 until the data behind them changes."""
+from datetime import date
+import pytest
+
+REPORTS = ["/api/statements/profit-loss", "/api/ratios/", "/api/dashboard/"]
+
+
+def get(client, path, headers, etag=None, **params):
+    return client.get(path, headers={**headers, **({"If-None-Match": etag} if etag else {})}, params=params)
+
+
+@pytest.mark.parametrize("path", REPORTS)
+def test_unchanged_report_is_not_modified(client, make_company, path):
+    headers, _ = make_company("ETag Co")
+    first = get(client, path, headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = get(client, path, headers, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    assert get(client, path, headers, f'"other", W/{etag}').status_code == 304
+
+
+def test_new_upload_changes_etag(client, make_company, upload_tb):
+    headers, _ = make_company("ETag Upload Co", period_end=date(2025, 6, 30))
+    etag = get(client, REPORTS[0], headers).headers["ETag"]
+
+    upload_tb(headers, period_end=date(2025, 12, 31))
+
+    response = get(client, REPORTS[0], headers, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_depends_on_query_and_company(client, make_company):
+    headers, _ = make_company("ETag A")
+    other_headers, _ = make_company("ETag B")
+    etag = get(client, REPORTS[0], headers).headers["ETag"]
+
+    assert get(client, REPORTS[0], headers, etag, period_end="2025-06-30").status_code == 200
+    assert get(client, REPORTS[0], other_headers, etag).status_code == 200
@@ -0,0 +1,75 @@
+"""FX rates: per-company scoping, version-keyed rate cache, and the translation reserve."""
+from datetime import date
+import pytest
+from models.fx_rate import FxRate
+from services.cache_service import FX_SCOPE, bump_version, get_versions
+from services.fx_service import _net_amounts, get_rates, translate_balances, upsert_rate
+
+AS_OF = date(2025, 6, 30)
+
+
+@pytest.fixture
+def shared_pair(db):
+    """A currency pair only this test uses, removed afterwards."""
+    yield "QQQ", "ZZZ"
+    db.query(FxRate).filter(FxRate.from_currency == "QQQ").delete()
+    db.commit()
+
+
+def test_shared_rate_write_bumps_the_fx_version(db, shared_pair):
+    version = get_versions(db, [FX_SCOPE])[FX_SCOPE]
+
+    upsert_rate(db, None, *shared_pair, AS_OF, 3.6, 3.5)
+
+    assert get_versions(db, [FX_SCOPE])[FX_SCOPE] == version + 1
+
+
+def test_cached_rates_follow_writes_from_other_workers(db, shared_pair):
+    upsert_rate(db, None, *shared_pair, AS_OF, 3.6, 3.5)
+    assert get_rates(db, *shared_pair, AS_OF) == (3.6, 3.5)
+
+    # Another worker's write reaches this one only through the table and the version bump
+    db.query(FxRate).filter(FxRate.from_currency == "QQQ").update({FxRate.closing_rate: 3.7})
+    db.commit()
+    assert get_rates(db, *shared_pair, AS_OF) == (3.6, 3.5)
+    bump_version(db, FX_SCOPE)
+
+    assert get_rates(db, *shared_pair, AS_OF) == (3.7, 3.5)
+
+
+def test_shared_rate_changes_report_etags(client, make_company, db, shared_pair):
+    headers, _ = make_company()
+    before = client.get("/api/statements/profit-loss", headers=headers).headers["etag"]
+
+    upsert_rate(db, None, *shared_pair, AS_OF, 1.5, 1.4)
+
+    assert client.get("/api/statements/profit-loss", headers=headers).headers["etag"] != before
+
+
+def test_company_rates_are_private_and_override_shared_ones(client, make_company, db, shared_pair):
+    (owner, owner_id), (other, other_id) = make_company(rows=None), make_company(rows=None)
+    upsert_rate(db, None, *shared_pair, AS_OF, 2.0, 2.0)
+    response = client.post("/api/fx/rates", headers=owner, json={
+        "from_currency": "QQQ", "to_currency": "ZZZ", "rate_date": str(AS_OF), "closing_rate": 4.0, "average_rate": 4.0,
+    })
+    assert response.status_code == 200, response.text
+
+    visible = client.get("/api/fx/rates", headers=other, params={"from_currency": "QQQ"}).json()
+    assert [(r["closing_rate"], r["shared"]) for r in visible] == [(2.0, True)]
+    assert get_rates(db, *shared_pair, AS_OF, owner_id) == (4.0, 4.0)
+    assert get_rates(db, *shared_pair, AS_OF, other_id) == (2.0, 2.0)
+
+
+def test_translation_reserve_keeps_the_trial_balance_balanced():
+    balances = {
+        "Cash": {"category": "Asset", "sub_category": "Current Asset", "normal_balance": "debit", "debit": 1000.0, "credit": 0.0, "balance": 1000.0},
+        "Share Capital": {"category": "Equity", "sub_category": "Equity", "normal_balance": "credit", "debit": 0.0, "credit": 600.0, "balance": -600.0},
+        "Revenue": {"category": "Revenue", "sub_category": "Revenue", "normal_balance": "credit", "debit": 0.0, "credit": 700.0, "balance": -700.0},
+        "Salaries": {"category": "Expense", "sub_category": "Operating Expense", "normal_balance": "debit", "debit": 300.0, "credit": 0.0, "balance": 300.0},
+    }
+
+    translated = translate_balances(balances, closing_rate=2.0, average_rate=1.5)
+
+    net = sum(float(_net_amounts(line["debit"], line["credit"], line["balance"])) for line in translated.values())
+    assert net == pytest.approx(0.0)
+    assert "Foreign Currency Translation Reserve" in translated
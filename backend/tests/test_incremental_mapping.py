@@ -0,0 +1,48 @@
+"""Incremental auto-mapping: re-runs only process new and still-unmapped source accounts."""
+from datetime import date
+from sqlalchemy import inspect, text
+from database import engine, ensure_indexes
+from tests.conftest import TRIAL_BALANCE, trial_balance_file
+
+UNMATCHABLE = ("8999", "Zqxv Qwpl", 10, 0)
+
+
+def auto_map(client, headers):
+    response = client.post("/api/mapping/auto-map", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_rerun_processes_only_new_and_unmapped_accounts(client, make_company):
+    headers, _ = make_company("Incremental Co", rows=TRIAL_BALANCE + [UNMATCHABLE], period_end=date(2025, 6, 30))
+    mappings = {m["source_code"]: m for m in client.get("/api/mapping/", headers=headers).json()}
+    assert not mappings["8999"]["is_mapped"]
+    finance_costs = next(m["id"] for m in client.get("/api/mapping/master-accounts").json() if m["code"] == "9010")
+    response = client.post("/api/mapping/manual-map", headers=headers,
+                           json={"mapping_id": mappings["6100"]["id"], "master_account_id": finance_costs})
+    assert response.status_code == 200, response.text
+
+    rerun = auto_map(client, headers)
+    assert [r["source_code"] for r in rerun["results"]] == ["8999"]
+
+    rows = TRIAL_BALANCE + [UNMATCHABLE, ("6400", "Marketing Expense", 12000, 0)]
+    response = client.post("/api/upload/trial-balance", headers=headers, data={"period_end": "2025-12-31"},
+                           files={"file": ("tb.xlsx", trial_balance_file(rows), "application/octet-stream")})
+    assert response.status_code == 200, response.text
+    result = auto_map(client, headers)
+
+    assert sorted(r["source_code"] for r in result["results"]) == ["6400", "8999"]
+    assert result["total"] == len(rows)
+    mappings = {m["source_code"]: m for m in client.get("/api/mapping/", headers=headers).json()}
+    assert (mappings["6100"]["master_code"], mappings["6100"]["mapped_by"]) == ("9010", "manual")
+    assert mappings["6400"]["is_mapped"]
+
+
+def test_missing_indexes_are_built_on_existing_tables(client):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_tb_company_account"))
+    assert "ix_tb_company_account" not in {i["name"] for i in inspect(engine).get_indexes("trial_balance_entries")}
+
+    ensure_indexes()
+
+    assert "ix_tb_company_account" in {i["name"] for i in inspect(engine).get_indexes("trial_balance_entries")}
@@ -0,0 +1,35 @@
+"""Aho-Corasick keyword automaton: same matches as scanning for every keyword."""
+import random
+from benchmarks.mapping_corpus import generate_corpus
+from services.keyword_automaton import KeywordAutomaton
+from services.mapping_service import KEYWORD_AUTOMATON, TYPE_TO_CATEGORY
+
+
+def brute_force(keywords, text):
+    return sorted(
+        (index, start)
+        for index, keyword in enumerate(keywords)
+        for start in range(len(text) - len(keyword) + 1)
+        if text.startswith(keyword, start)
+    )
+
+
+def test_overlapping_keywords_are_all_found():
+    keywords = ["he", "she", "his", "hers", "e", "ushe"]
+    automaton = KeywordAutomaton(keywords)
+
+    assert sorted(automaton.find_all("ushers")) == brute_force(keywords, "ushers")
+    assert automaton.find_all("") == []
+
+    rng = random.Random(5)
+    for _ in range(200):
+        text = "".join(rng.choice("ehirsu ") for _ in range(rng.randint(0, 30)))
+        assert sorted(automaton.find_all(text)) == brute_force(keywords, text), text
+
+
+def test_type_keywords_match_a_substring_scan():
+    keywords = list(TYPE_TO_CATEGORY)
+    for account in generate_corpus(2000, seed=11):
+        for text in (account.name.lower().strip(), (account.source_type or "").lower().strip()):
+            expected = {i for i, keyword in enumerate(keywords) if keyword in text}
+            assert KEYWORD_AUTOMATON.matched(text) == expected, text
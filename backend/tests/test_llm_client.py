@@ -0,0 +1,106 @@
+"""Pooled LLM client: retries, error surfacing, the concurrency limit and per-call timeouts."""
+import asyncio
+import time
+import httpx
+import pytest
+from services import llm_client
+from services.llm_client import LLMError, get_llm_metrics, post_completion
+
+BODY = {"model": "test", "messages": [{"role": "user", "content": "hi"}]}
+COMPLETION = {"choices": [{"message": {"content": "ok"}}]}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Route provider calls to a handler(request, attempt) -> httpx.Response (sync or async)."""
+    def install(handler, max_concurrency=8):
+        attempts = []
+
+        async def dispatch(request):
+            attempts.append(request)
+            result = handler(request, len(attempts))
+            return await result if asyncio.iscoroutine(result) else result
+
+        monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(dispatch)))
+        monkeypatch.setattr(llm_client, "_semaphore", asyncio.Semaphore(max_concurrency))
+        return attempts
+
+    monkeypatch.setattr(llm_client.settings, "AI_RETRY_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(llm_client.settings, "AI_RETRY_MAX_SECONDS", 0.0)
+    monkeypatch.setattr(llm_client.settings, "AI_MAX_RETRIES", 3)
+    return install
+
+
+def test_retryable_statuses_are_retried(provider):
+    responses = [httpx.Response(503), httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json=COMPLETION)]
+    attempts = provider(lambda request, attempt: responses[attempt - 1])
+    before = get_llm_metrics()
+
+    assert asyncio.run(post_completion(BODY)) == COMPLETION
+
+    after = get_llm_metrics()
+    assert len(attempts) == 3
+    assert after["retries"] - before["retries"] == 2
+    assert after["succeeded"] - before["succeeded"] == 1
+    assert after["errors"]["status:503"] - before["errors"].get("status:503", 0) == 1
+
+
+def test_client_errors_fail_fast_and_persistent_failures_give_up(provider):
+    attempts = provider(lambda request, attempt: httpx.Response(400))
+    with pytest.raises(LLMError):
+        asyncio.run(post_completion(BODY))
+    assert len(attempts) == 1
+
+    attempts = provider(lambda request, attempt: httpx.Response(502))
+    with pytest.raises(LLMError):
+        asyncio.run(post_completion(BODY))
+    assert len(attempts) == 4
+
+    def refuse(request, attempt):
+        raise httpx.ConnectError("refused", request=request)
+    attempts = provider(refuse)
+    with pytest.raises(LLMError):
+        asyncio.run(post_completion(BODY))
+    assert len(attempts) == 4
+
+
+def test_in_flight_calls_never_exceed_the_limit(provider):
+    in_flight = {"now": 0, "max": 0}
+
+    async def slow(request, attempt):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json=COMPLETION)
+    provider(slow, max_concurrency=2)
+
+    async def burst():
+        return await asyncio.gather(*(post_completion(BODY) for _ in range(8)))
+
+    assert asyncio.run(burst()) == [COMPLETION] * 8
+    assert in_flight["max"] == 2
+
+
+def test_timeout_starts_once_a_slot_is_held(provider):
+    async def answer(request, attempt):
+        await asyncio.sleep(0.3 if attempt == 1 else 0.05)
+        return httpx.Response(200, json=COMPLETION)
+    provider(answer, max_concurrency=1)
+
+    async def queued():
+        first = asyncio.create_task(post_completion(BODY, timeout=1))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        second = await post_completion(BODY, timeout=0.2)  # waits ~0.3s for the slot, then answers in 0.05s
+        return await first, second, time.perf_counter() - start
+
+    first, second, waited = asyncio.run(queued())
+    assert first == second == COMPLETION
+    assert waited > 0.2
+
+    provider(answer, max_concurrency=1)
+    before = get_llm_metrics()["errors"].get("timeout", 0)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(post_completion(BODY, timeout=0.1))
+    assert get_llm_metrics()["errors"]["timeout"] == before + 1
@@ -0,0 +1,38 @@
+"""Mapping benchmark corpus and scoring."""
+from benchmarks.mapping_benchmark import chart_records, score
+from benchmarks.mapping_corpus import generate_corpus, load_seed
+
+
+def test_labels_are_master_codes_and_corpus_is_reproducible():
+    codes = {m.code for m in chart_records()}
+    seed = load_seed()
+    assert {a.expected_code for a in seed} - {None} <= codes
+    assert {a.group for a in seed} == {"english", "gcc", "erp", "unmappable"}
+    assert all(a.expected_code is None for a in seed if a.group == "unmappable")
+
+    corpus = generate_corpus(len(seed) + 500, seed=1)
+    assert len(corpus) == len(seed) + 500
+    assert len({a.code for a in corpus}) == len(corpus)
+    assert corpus[:len(seed)] == seed and all(a.noisy for a in corpus[len(seed):])
+    assert generate_corpus(len(seed) + 500, seed=1) == corpus
+    assert generate_corpus(len(seed) + 500, seed=2) != corpus
+
+
+def test_score_counts_precision_recall_and_calibration():
+    masters = chart_records()
+    by_code = {m.code: m.id for m in masters}
+    codes_by_id = {m.id: m.code for m in masters}
+    corpus = load_seed()
+    mappable = [a for a in corpus if a.expected_code]
+    wrong = mappable[0]
+
+    matches = {a.code: (by_code[a.expected_code], 0.99) if a.expected_code else (None, 0.0) for a in corpus}
+    matches[wrong.code] = (next(i for c, i in by_code.items() if c != wrong.expected_code), 0.99)
+    result = score(corpus, matches, codes_by_id)
+
+    assert result["auto_mapped"] == len(mappable)
+    assert result["precision"] == round((len(mappable) - 1) / len(mappable), 4)
+    assert result["recall"] == round((len(mappable) - 1) / len(mappable), 4)
+    top = result["calibration"][-1]
+    assert (top["count"], top["accuracy"]) == (len(mappable), round((len(mappable) - 1) / len(mappable), 4))
+    assert result["groups"]["unmappable"]["auto_mapped"] == 0
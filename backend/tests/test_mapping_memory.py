@@ -0,0 +1,93 @@
+"""Cross-company mapping memory: company scoping, consensus before recall, atomic votes and retraction."""
+import itertools
+import pytest
+from database import SessionLocal
+from models.account import MappingMemory, MappingMemoryCompany
+from services.mapping_service import memory_key, record_mapping_votes
+from tests.conftest import TRIAL_BALANCE
+
+_names = itertools.count(1)
+
+
+@pytest.fixture
+def account_name():
+    """A source account name no other test uses, so the shared memory starts empty for it."""
+    return f"Zorblax Widget Fund {next(_names)}"
+
+
+def master_id(client, code):
+    return next(m["id"] for m in client.get("/api/mapping/master-accounts").json() if m["code"] == code)
+
+
+def mapping_for(client, headers, code="7000"):
+    return next(m for m in client.get("/api/mapping/", headers=headers).json() if m["source_code"] == code)
+
+
+def map_manually(client, headers, master):
+    mapping = mapping_for(client, headers)
+    response = client.post("/api/mapping/manual-map", headers=headers, json={"mapping_id": mapping["id"], "master_account_id": master})
+    assert response.status_code == 200, response.text
+
+
+def test_manual_mapping_is_scoped_to_the_callers_company(client, make_company, account_name):
+    rows = TRIAL_BALANCE + [("7000", account_name, 1000, 0)]
+    owner, _ = make_company(rows=rows)
+    other, _ = make_company(rows=rows)
+    mapping = mapping_for(client, owner)
+
+    response = client.post("/api/mapping/manual-map", headers=other, json={"mapping_id": mapping["id"], "master_account_id": master_id(client, "1000")})
+    assert response.status_code == 404
+    response = client.post("/api/mapping/manual-map", headers=owner, json={"mapping_id": mapping["id"], "master_account_id": 999999})
+    assert response.status_code == 400
+
+
+def test_memory_needs_votes_from_several_companies(client, make_company, account_name):
+    rows = TRIAL_BALANCE + [("7000", account_name, 1000, 0)]
+    cash = master_id(client, "1000")
+    first, _ = make_company(rows=rows)
+    for _ in range(5):
+        map_manually(client, first, cash)
+
+    newcomer, _ = make_company(rows=rows)
+    assert mapping_for(client, newcomer)["mapped_by"] != "memory"
+
+    for _ in range(2):
+        headers, _ = make_company(rows=rows)
+        map_manually(client, headers, cash)
+    newcomer, _ = make_company(rows=rows)
+    assert mapping_for(client, newcomer)["mapped_by"] == "memory"
+    assert mapping_for(client, newcomer)["master_code"] == "1000"
+
+
+def test_remapping_retracts_the_previous_vote(client, db, make_company, account_name):
+    rows = TRIAL_BALANCE + [("7000", account_name, 1000, 0)]
+    cash, receivables = master_id(client, "1000"), master_id(client, "1100")
+    voters = [make_company(rows=rows)[0] for _ in range(3)]
+    for headers in voters:
+        map_manually(client, headers, cash)
+
+    map_manually(client, voters[0], receivables)
+
+    name_key, type_key = memory_key(account_name, "")
+    entries = {m.master_account_id: m for m in db.query(MappingMemory).filter(MappingMemory.name_key == name_key, MappingMemory.type_key == type_key)}
+    companies = {master: db.query(MappingMemoryCompany).filter(MappingMemoryCompany.memory_id == m.id).count() for master, m in entries.items()}
+    assert (entries[cash].votes, companies[cash]) == (2, 2)
+    assert (entries[receivables].votes, companies[receivables]) == (1, 1)
+    newcomer, _ = make_company(rows=rows)
+    assert mapping_for(client, newcomer)["mapped_by"] != "memory"
+
+
+def test_votes_upsert_into_one_entry_per_master(make_company, account_name):
+    _, company_id = make_company(rows=None)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        for session in (first, second):
+            record_mapping_votes(session, company_id, [(account_name, None, 1), (account_name.upper(), None, 1)])
+            session.commit()
+
+        entries = first.query(MappingMemory).filter(MappingMemory.name_key == memory_key(account_name, None)[0]).all()
+        assert [entry.votes for entry in entries] == [4]
+        assert first.query(MappingMemoryCompany).filter(MappingMemoryCompany.memory_id == entries[0].id).count() == 1
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,44 @@
+"""Process-wide master chart: shared immutable records, rebuilt only when its version moves."""
+import dataclasses
+import pytest
+from models.account import MasterAccount
+from services.cache_service import MASTER_CHART_SCOPE, bump_version
+from services.master_chart import get_master_chart
+
+
+def test_chart_is_shared_and_immutable(db):
+    chart = get_master_chart(db)
+
+    assert get_master_chart(db) is chart
+    assert chart.by_code["1000"] is chart.by_id[chart.by_code["1000"].id]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        chart.records[0].name = "Renamed"
+    with pytest.raises(TypeError):
+        chart.by_code["1000"] = None
+
+
+def test_chart_rebuilds_after_version_bump(client, db):
+    chart = get_master_chart(db)
+    response = client.get("/api/mapping/master-accounts")
+    assert response.headers["ETag"] == chart.etag
+    assert client.get("/api/mapping/master-accounts", headers={"If-None-Match": chart.etag}).status_code == 304
+
+    master = MasterAccount(code="99990", name="Test Suspense Account", category="Asset", sub_category="Current Asset")
+    db.add(master)
+    db.commit()
+    try:
+        assert get_master_chart(db) is chart  # not visible until the chart version moves
+        bump_version(db, MASTER_CHART_SCOPE)
+
+        rebuilt = get_master_chart(db)
+        assert rebuilt is not chart
+        assert rebuilt.by_code["99990"].name == "Test Suspense Account"
+        response = client.get("/api/mapping/master-accounts", headers={"If-None-Match": chart.etag})
+        assert response.status_code == 200
+        assert "99990" in [m["code"] for m in response.json()]
+    finally:
+        db.delete(master)
+        db.commit()
+        bump_version(db, MASTER_CHART_SCOPE)
+
+    assert "99990" not in get_master_chart(db).by_code
@@ -0,0 +1,25 @@
+"""Process-pool auto-mapping returns exactly what in-process matching does."""
+from benchmarks.mapping_benchmark import chart_records
+from benchmarks.mapping_corpus import generate_corpus
+from services import mapping_service
+from services.mapping_service import get_auto_map_progress, match_accounts, shutdown_mapping_pool
+
+
+def test_pool_matches_in_process_matching(monkeypatch):
+    masters = chart_records()
+    accounts = [(a.code, a.name, a.source_type) for a in generate_corpus(400, seed=3)]
+
+    monkeypatch.setattr(mapping_service.settings, "AUTO_MAP_WORKERS", 2)
+    monkeypatch.setattr(mapping_service.settings, "AUTO_MAP_PARALLEL_THRESHOLD", len(accounts) + 1)
+    in_process = match_accounts(-1, accounts, masters)
+    assert get_auto_map_progress(-1)["workers"] == 1
+
+    monkeypatch.setattr(mapping_service.settings, "AUTO_MAP_PARALLEL_THRESHOLD", len(accounts))
+    try:
+        parallel = match_accounts(-2, accounts, masters)
+    finally:
+        shutdown_mapping_pool()
+
+    assert parallel == in_process
+    progress = get_auto_map_progress(-2)
+    assert (progress["status"], progress["workers"], progress["processed"]) == ("completed", 2, len(accounts))
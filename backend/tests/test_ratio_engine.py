@@ -0,0 +1,69 @@
+"""Compiled ratio engine: safe expressions, scalar/vector agreement and custom ratios."""
+import math
+import random
+import pytest
+from services.ratio_engine import INPUT_NAMES, compile_expression, get_ratio_engine
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "revenue.real",
+    "revenue ** 2",
+    "revenue[0]",
+    "unknown_input / revenue",
+    "min(revenue)",
+    "round(revenue)",
+    "1e400 * revenue",
+    "'text'",
+    "0 < revenue < 1",
+    "revenue +",
+])
+def test_unsafe_or_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression, set(INPUT_NAMES))
+
+
+def test_scalar_and_column_evaluation_agree():
+    engine = get_ratio_engine()
+    rng = random.Random(7)
+    samples = [{name: rng.choice([0.0] + [rng.uniform(-1e6, 1e6)] * 5) for name in INPUT_NAMES} for _ in range(50)]
+
+    columns = engine.evaluate_columns({name: [s[name] for s in samples] for name in INPUT_NAMES})
+
+    compared = 0
+    for i, sample in enumerate(samples):
+        for category in engine.evaluate(sample).values():
+            for ratio in category["ratios"]:
+                value = columns[ratio["key"]][i]
+                # Undefined ratios (zero denominators, and ratios built on them) are NaN in the batch
+                if math.isnan(value):
+                    continue
+                compared += 1
+                assert math.isclose(value, ratio["value"], rel_tol=1e-9, abs_tol=0.01), ratio["key"]
+                assert columns[f"{ratio['key']}_status"][i] == ratio["status"], ratio["key"]
+    assert compared > len(samples) * len(engine.ratios) / 2
+
+
+def custom_ratio(client, headers, key, expression, **fields):
+    return client.post("/api/ratios/custom", headers=headers, json={"key": key, "name": key.title(), "expression": expression, **fields})
+
+
+def test_custom_ratios_are_validated_evaluated_and_protected(client, make_company):
+    headers, _ = make_company("Custom Ratio Co")
+
+    assert custom_ratio(client, headers, "rent_cover", "revenue / 0 + __import__('os')").status_code == 400
+    response = custom_ratio(client, headers, "double_margin", "gross_profit / revenue * 2",
+                            direction="higher", good_threshold=1.0, warning_threshold=0.5)
+    assert response.status_code == 200, response.text
+    dependent = custom_ratio(client, headers, "half_double_margin", "double_margin / 2")
+    assert dependent.status_code == 200, dependent.text
+
+    ratios = {r["key"]: r for r in client.get("/api/ratios/", headers=headers).json()["custom"]["ratios"]}
+    # Revenue 500k less cost of sales 200k
+    assert ratios["double_margin"]["value"] == 1.2
+    assert ratios["double_margin"]["status"] == "good"
+    assert ratios["half_double_margin"]["value"] == 0.6
+
+    assert client.delete(f"/api/ratios/custom/{response.json()['ratio_id']}", headers=headers).status_code == 400
+    assert client.delete(f"/api/ratios/custom/{dependent.json()['ratio_id']}", headers=headers).status_code == 200
+    assert client.delete(f"/api/ratios/custom/{response.json()['ratio_id']}", headers=headers).status_code == 200
@@ -0,0 +1,59 @@
+"""Ratio inputs come from master account roles, not from statement line names."""
+import pandas as pd
+import pytest
+from benchmarks.mapping_benchmark import chart_records
+from services.batch_ratio_service import ratio_input_arrays, statement_lines
+from services.ratio_service import ratio_inputs
+from services.statement_service import accumulate_balance, build_balance_sheet, build_profit_and_loss
+
+# (master code, debit, credit): each finance-cost, payables and other-income line mixes accounts with and without a role
+BALANCES = [
+    ("1000", 40000, 0), ("1020", 60000, 0),    # cash
+    ("1110", 30000, 0), ("1500", 7000, 0),     # receivables; VAT receivable is not
+    ("1210", 25000, 0),                        # inventory
+    ("3000", 0, 18000), ("3020", 0, 2000),     # payables
+    ("3100", 0, 9000), ("3110", 0, 4000),      # tax payables are not
+    ("3200", 0, 50000),                        # short-term debt
+    ("4000", 0, 300000), ("6510", 0, 3000), ("6530", 0, 1500),
+    ("5000", 120000, 0), ("8200", 15000, 0),   # depreciation
+    ("9010", 6000, 0),                         # interest expense
+    ("9020", 800, 0), ("9030", 1200, 0),       # bank charges and FX losses are not
+]
+EXPECTED = {
+    "cash": 100000, "receivables": 30000, "inventory": 25000, "payables": 20000,
+    "short_term_debt": 50000, "interest_expense": 6000,
+}
+
+
+@pytest.fixture(scope="module")
+def masters():
+    return {m.code: m for m in chart_records()}
+
+
+def test_company_inputs_use_account_roles(masters):
+    balances = {}
+    for code, debit, credit in BALANCES:
+        accumulate_balance(balances, masters[code], debit, credit, debit - credit)
+
+    pnl = build_profit_and_loss(balances)
+    inputs = ratio_inputs(pnl, build_balance_sheet(balances))
+
+    assert {name: inputs[name] for name in EXPECTED} == EXPECTED
+    assert inputs["ebitda"] == pytest.approx(inputs["operating_profit"] + 15000)
+
+
+def test_batch_inputs_match_company_inputs(masters):
+    balances = {}
+    for code, debit, credit in BALANCES:
+        accumulate_balance(balances, masters[code], debit, credit, debit - credit)
+    expected = ratio_inputs(build_profit_and_loss(balances), build_balance_sheet(balances))
+
+    df = pd.DataFrame([
+        {"company_id": 1, "period_end": None, "master_account_id": masters[code].id,
+         "debit": float(debit), "credit": float(credit), "balance": float(debit - credit)}
+        for code, debit, credit in BALANCES
+    ])
+    line_of_master, lines = statement_lines(list(masters.values()))
+    _, inputs = ratio_input_arrays(df, line_of_master, lines)
+
+    assert {name: values[0] for name, values in inputs.items()} == pytest.approx(expected)
@@ -0,0 +1,65 @@
+"""Rollup tree: remaps and uploads update the cached tree in place along ancestor paths."""
+from datetime import date
+from services import rollup_service
+from services.cache_service import bump_company_version, get_company_version
+from services.rollup_service import apply_remaps, build_rollup_tree, get_rollup_tree
+from tests.conftest import TRIAL_BALANCE
+
+
+def cached_tree(company_id):
+    return rollup_service._trees.get(company_id)
+
+
+def master_id(client, code):
+    return next(m["id"] for m in client.get("/api/mapping/master-accounts").json() if m["code"] == code)
+
+
+def test_manual_remap_moves_the_account_in_the_cached_tree(client, db, make_company):
+    headers, company_id = make_company()
+    tree = get_rollup_tree(db, company_id)
+    mapping = next(m for m in client.get("/api/mapping/", headers=headers).json() if m["source_code"] == "1200")
+
+    response = client.post("/api/mapping/manual-map", headers=headers,
+                           json={"mapping_id": mapping["id"], "master_account_id": master_id(client, "1130")})
+    assert response.status_code == 200, response.text
+
+    version, current = cached_tree(company_id)
+    assert current is tree  # updated in place, not copied or rebuilt
+    assert version == get_company_version(db, company_id)
+    assert current.sources["1200"].parent is current.masters[master_id(client, "1130")]
+    assert current.root.to_dict() == build_rollup_tree(db, company_id).root.to_dict()
+
+
+def test_upload_applies_balance_changes_to_the_cached_tree(client, db, make_company, upload_tb):
+    june = date(2025, 6, 30)
+    headers, company_id = make_company(period_end=june)
+    tree = get_rollup_tree(db, company_id)
+
+    changed = [(code, name, debit * 2 if code == "1000" else debit, credit) for code, name, debit, credit in TRIAL_BALANCE[:-1]]
+    upload_tb(headers, changed, period_end=date(2025, 7, 31))
+
+    version, current = cached_tree(company_id)
+    assert current is tree  # the upload and the auto-map that follows both update it in place
+    assert version == get_company_version(db, company_id)
+    assert current.sources["1000"].subtotal == 1000000
+    assert "6300" not in current.sources  # not in the new period
+    assert current.root.to_dict() == build_rollup_tree(db, company_id).root.to_dict()
+    tree_response = client.get("/api/statements/tree", headers=headers, params={"depth": 1}).json()
+    assert tree_response == build_rollup_tree(db, company_id).root.to_dict(1)
+
+
+def test_concurrent_write_drops_the_cached_tree(db, make_company):
+    _, company_id = make_company()
+    get_rollup_tree(db, company_id)
+    stale_version = get_company_version(db, company_id) - 1
+
+    apply_remaps(db, company_id, [("1200", 1)], stale_version)
+
+    assert cached_tree(company_id)[0] == get_company_version(db, company_id)  # untouched: not this change's version
+
+    version = get_company_version(db, company_id)
+    bump_company_version(db, company_id)
+    bump_company_version(db, company_id)  # someone else wrote too
+    apply_remaps(db, company_id, [("1200", 1)], version)
+
+    assert cached_tree(company_id) is None
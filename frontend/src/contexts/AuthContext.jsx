@@ -1,5 +1,5 @@
 import { createContext, useContext, useState, useEffect } from 'react';
-import api from '../lib/api';
+import api, { clearEtagCache } from '../lib/api';
 
 const AuthContext = createContext(null);
 
@@ -45,6 +45,7 @@ export function AuthProvider({ children }) {
     const logout = () => {
         localStorage.removeItem('token');
         localStorage.removeItem('user');
+        clearEtagCache();
         setUser(null);
     };
 
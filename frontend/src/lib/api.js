@@ -6,27 +6,90 @@ const API_URL = BASE.endsWith('/api') ? BASE : `${BASE}/api`;
 const api = axios.create({
   baseURL: API_URL,
   headers: { 'Content-Type': 'application/json' },
+  // 304 Not Modified is answered from the ETag cache below
+  validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
 });
 
+// ETag cache for report endpoints: request key -> { etag, data }
+const etagCache = new Map();
+const cacheKey = (config) => `${config.url}?${JSON.stringify(config.params || {})}`;
+
+export const clearEtagCache = () => etagCache.clear();
+
 // Auth interceptor
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+
+  // Send validators so unchanged reports come back as an empty 304
+  if ((config.method || 'get').toLowerCase() === 'get') {
+    const cached = etagCache.get(cacheKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
+  }
   return config;
 });
 
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const key = cacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      return { ...response, status: 200, data: cached ? cached.data : response.data };
+    }
+    const etag = response.headers?.etag;
+    if (etag && (response.config.method || 'get').toLowerCase() === 'get') {
+      etagCache.set(key, { etag, data: response.data });
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
       localStorage.removeItem('user');
+      etagCache.clear();
       window.location.href = '/login';
     }
     return Promise.reject(error);
   }
 );
 
+// Read a server-sent-event stream (GET with the auth header, which EventSource can't send),
+// calling onEvent(event, data) for each message. Resolves when the stream ends.
+export async function streamEvents(path, params, onEvent, signal) {
+  const query = new URLSearchParams(params || {}).toString();
+  const token = localStorage.getItem('token');
+  const res = await fetch(`${API_URL}${path}${query ? `?${query}` : ''}`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    throw new Error(`Stream request failed with status ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      const data = [];
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join('\n')));
+    }
+  }
+}
+
 export default api;
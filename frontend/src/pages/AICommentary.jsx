@@ -1,20 +1,59 @@
-import { useState, useEffect } from 'react';
-import api from '../lib/api';
+import { useState, useEffect, useRef } from 'react';
+import api, { streamEvents } from '../lib/api';
 import { Brain, AlertTriangle, Lightbulb, Shield, RefreshCw } from 'lucide-react';
 
 export default function AICommentary() {
     const [commentary, setCommentary] = useState(null);
-    const [loading, setLoading] = useState(true);
+    const [loading, setLoading] = useState(true);  // until the first section arrives
+    const [streaming, setStreaming] = useState(false);
+    const [error, setError] = useState('');
+    const controllerRef = useRef(null);
 
-    const loadCommentary = () => {
+    // Sections are rendered as the server finishes each one. The plain endpoint is only the
+    // fallback when the stream fails before any section arrived: it would run the LLM again,
+    // so a stream that breaks midway keeps its sections and reports the error instead.
+    const loadCommentary = (refresh = false) => {
+        controllerRef.current?.abort();
+        const controller = new AbortController();
+        controllerRef.current = controller;
+        const params = refresh ? { refresh: true } : {};
+        let received = 0;
+        setCommentary(null);
+        setError('');
         setLoading(true);
-        api.get('/ai/commentary')
-            .then(res => setCommentary(res.data))
-            .catch(() => { })
-            .finally(() => setLoading(false));
+        setStreaming(true);
+        streamEvents('/ai/commentary/stream', params, (event, data) => {
+            if (event === 'section') {
+                received += 1;
+                setCommentary(prev => ({ ...prev, [data.key]: data.value }));
+                setLoading(false);
+            }
+        }, controller.signal)
+            .catch(() => {
+                if (controller.signal.aborted) return;
+                if (received > 0) {
+                    setError('The analysis was interrupted; some sections are missing. Regenerate to try again.');
+                    return;
+                }
+                return api.get('/ai/commentary', { params })
+                    .then(res => setCommentary(res.data))
+                    .catch(() => { });
+            })
+            .finally(() => {
+                if (controllerRef.current !== controller) return;
+                setLoading(false);
+                setStreaming(false);
+            });
     };
 
-    useEffect(() => { loadCommentary(); }, []);
+    useEffect(() => {
+        loadCommentary();
+        return () => controllerRef.current?.abort();
+    }, []);
+
+    const pending = (value) => value === undefined && streaming && (
+        <div className="commentary-text" style={{ color: 'var(--text-muted)' }}>Writing…</div>
+    );
 
     if (loading) return (
         <div style={{ textAlign: 'center', padding: 60 }}>
@@ -43,21 +82,26 @@ export default function AICommentary() {
             </div>
 
             <div style={{ display: 'flex', gap: 12, marginBottom: 24, alignItems: 'center' }}>
-                <div className={`health-overall ${healthClass}`}>
-                    <Shield size={14} />
-                    Financial Health: {commentary.overall_health?.toUpperCase()}
-                </div>
-                <button className="btn btn-secondary btn-sm" onClick={loadCommentary} style={{ marginLeft: 'auto' }}>
+                {commentary.overall_health && (
+                    <div className={`health-overall ${healthClass}`}>
+                        <Shield size={14} />
+                        Financial Health: {commentary.overall_health.toUpperCase()}
+                    </div>
+                )}
+                <button className="btn btn-secondary btn-sm" onClick={() => loadCommentary(true)} disabled={streaming} style={{ marginLeft: 'auto' }}>
                     <RefreshCw size={14} /> Regenerate
                 </button>
             </div>
 
+            {error && <div className="error-message" style={{ marginBottom: 24 }}>{error}</div>}
+
             {/* Executive Summary */}
             <div className="card commentary-section">
                 <h3>📋 Executive Summary</h3>
                 <div className="commentary-text" style={{ whiteSpace: 'pre-wrap' }}>
                     {commentary.executive_summary}
                 </div>
+                {pending(commentary.executive_summary)}
             </div>
 
             <div className="grid-2">
@@ -65,12 +109,14 @@ export default function AICommentary() {
                 <div className="card commentary-section">
                     <h3>📊 Revenue & Margin Analysis</h3>
                     <div className="commentary-text">{commentary.revenue_analysis}</div>
+                    {pending(commentary.revenue_analysis)}
                 </div>
 
                 {/* Cash Flow */}
                 <div className="card commentary-section">
                     <h3>💰 Cash Flow Analysis</h3>
                     <div className="commentary-text">{commentary.cash_flow_analysis}</div>
+                    {pending(commentary.cash_flow_analysis)}
                 </div>
             </div>
 
@@ -78,6 +124,7 @@ export default function AICommentary() {
             <div className="card commentary-section" style={{ marginTop: 24 }}>
                 <h3>⚙️ Working Capital Commentary</h3>
                 <div className="commentary-text">{commentary.working_capital_commentary}</div>
+                {pending(commentary.working_capital_commentary)}
             </div>
 
             <div className="grid-2" style={{ marginTop: 24 }}>
@@ -89,6 +136,7 @@ export default function AICommentary() {
                             <li key={i}><AlertTriangle size={14} style={{ marginRight: 8, verticalAlign: -2 }} />{flag}</li>
                         ))}
                     </ul>
+                    {pending(commentary.risk_flags)}
                 </div>
 
                 {/* Covenant Warnings */}
@@ -101,6 +149,7 @@ export default function AICommentary() {
                             </li>
                         ))}
                     </ul>
+                    {pending(commentary.covenant_warnings)}
                 </div>
             </div>
 
@@ -112,6 +161,7 @@ export default function AICommentary() {
                         <li key={i}><Lightbulb size={14} style={{ marginRight: 8, verticalAlign: -2 }} />{obs}</li>
                     ))}
                 </ul>
+                {pending(commentary.strategic_observations)}
             </div>
         </>
     );
@@ -9,6 +9,8 @@ export default function Mapping() {
     const [loading, setLoading] = useState(true);
     const [autoMapping, setAutoMapping] = useState(false);
     const [filter, setFilter] = useState('all'); // all, mapped, unmapped
+    const [pending, setPending] = useState({}); // mapping id -> master account id, saved as one batch
+    const [saving, setSaving] = useState(false);
 
     useEffect(() => { loadData(); }, []);
 
@@ -40,19 +42,31 @@ export default function Mapping() {
         }
     };
 
-    const manualMap = async (mappingId, masterAccountId) => {
+    const manualMap = (mappingId, masterAccountId) => {
+        setPending(prev => ({ ...prev, [mappingId]: parseInt(masterAccountId) }));
+    };
+
+    const savePending = async () => {
+        setSaving(true);
         try {
-            await api.post('/mapping/manual-map', {
-                mapping_id: mappingId,
-                master_account_id: parseInt(masterAccountId),
+            const res = await api.post('/mapping/manual-map/batch', {
+                mappings: Object.entries(pending).map(([mappingId, masterAccountId]) => ({
+                    mapping_id: parseInt(mappingId),
+                    master_account_id: masterAccountId,
+                })),
             });
-            toast.success('Account mapped successfully');
+            toast.success(`${res.data.updated} account${res.data.updated === 1 ? '' : 's'} mapped successfully`);
+            setPending({});
             loadData();
         } catch (err) {
-            toast.error('Mapping failed');
+            toast.error(err.response?.data?.detail || 'Mapping failed');
+        } finally {
+            setSaving(false);
         }
     };
 
+    const pendingCount = Object.keys(pending).length;
+
     const filtered = mappings.filter(m => {
         if (filter === 'mapped') return m.is_mapped;
         if (filter === 'unmapped') return !m.is_mapped;
@@ -77,6 +91,16 @@ export default function Mapping() {
                     {autoMapping ? 'Auto-mapping...' : 'Run Auto-Mapping'}
                 </button>
 
+                {pendingCount > 0 && (
+                    <>
+                        <button className="btn btn-primary" onClick={savePending} disabled={saving}>
+                            <Check size={16} />
+                            {saving ? 'Saving...' : `Save ${pendingCount} change${pendingCount === 1 ? '' : 's'}`}
+                        </button>
+                        <button className="btn btn-secondary" onClick={() => setPending({})} disabled={saving}>Discard</button>
+                    </>
+                )}
+
                 <div style={{ display: 'flex', gap: 8 }}>
                     <span className="badge badge-success">✓ {mappedCount} Mapped</span>
                     <span className="badge badge-warning">⚠ {unmappedCount} Unmapped</span>
@@ -128,7 +152,7 @@ export default function Mapping() {
                                         ) : (
                                             <select
                                                 className="mapping-select"
-                                                defaultValue=""
+                                                value={pending[m.id] ?? ''}
                                                 onChange={(e) => manualMap(m.id, e.target.value)}
                                             >
                                                 <option value="" disabled>Select IFRS account...</option>
@@ -145,7 +169,7 @@ export default function Mapping() {
                                         {m.is_mapped && (
                                             <select
                                                 className="mapping-select"
-                                                value={masterAccounts.find(ma => ma.code === m.master_code)?.id || ''}
+                                                value={pending[m.id] ?? masterAccounts.find(ma => ma.code === m.master_code)?.id ?? ''}
                                                 onChange={(e) => manualMap(m.id, e.target.value)}
                                                 style={{ minWidth: 160 }}
                                             >
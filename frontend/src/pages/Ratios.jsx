@@ -100,6 +100,9 @@ export default function Ratios() {
                                     <div className="ratio-name">{r.name}</div>
                                     <div style={{ fontSize: 11, color: 'var(--text-muted)', marginTop: 2 }}>
                                         Benchmark: {r.benchmark}
+                                        {r.peer_percentile != null && (
+                                            <> · P{Math.round(r.peer_percentile)} of {r.peer_count} {r.peer_group === 'all' ? 'companies' : `${r.peer_group} peers`}</>
+                                        )}
                                     </div>
                                 </div>
                                 <div style={{ display: 'flex', alignItems: 'center' }}>